@@ -0,0 +1,110 @@
+"""Benchmark: streaming leaderboard ingestion + indexed matching vs list(DictReader) + substring scan
+
+Builds a synthetic Kaggle leaderboard zip and reports wall time and peak Python memory.
+Run from the repo root:  python benchmarks/bench_leaderboard.py [rows] [--legacy-scan]
+(the legacy participant x row x column scan takes minutes at 100k rows, so it is opt-in)
+"""
+import csv
+import io
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from leaderboard import match_leaderboard
+
+HEADER = ["Rank", "TeamId", "TeamName", "LastSubmissionDate", "Score", "SubmissionCount", "TeamMemberUserNames"]
+
+def random_handle(rng):
+    return ''.join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(rng.randint(5, 14)))
+
+def build_leaderboard_zip(path, rows, seed=7):
+    """Write a zip shaped like Kaggle's download; returns every team's member list"""
+    rng = random.Random(seed)
+    teams = []
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for rank in range(1, rows + 1):
+        members = [random_handle(rng) for _ in range(1 if rng.random() < 0.8 else rng.randint(2, 4))]
+        teams.append(members)
+        writer.writerow([
+            rank, 1000000 + rank, members[0] if len(members) == 1 else f"team {random_handle(rng)}",
+            "2026-10-01 12:00:00", f"{1 - rank / (rows * 1.5):.5f}", rng.randint(1, 40), ",".join(members),
+        ])
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("competition-publicleaderboard.csv", buffer.getvalue())
+    return teams
+
+def build_participants(teams, count=500, seed=11):
+    """Mostly exact usernames, plus typos and people who never submitted"""
+    rng = random.Random(seed)
+    participants = {}
+    for user_id in range(count):
+        roll = rng.random()
+        if roll < 0.85:
+            handle = rng.choice(rng.choice(teams))
+        elif roll < 0.92:
+            handle = rng.choice(teams)[0]
+            handle = handle[:-1] + ('x' if handle[-1] != 'x' else 'y')  # One-character typo
+        else:
+            handle = random_handle(rng)
+        participants[user_id] = {"name": f"user{user_id}", "kaggle_id": handle}
+    return participants
+
+def legacy_ingest(zip_path):
+    with zipfile.ZipFile(zip_path, 'r') as archive:
+        with archive.open(archive.namelist()[0]) as csv_file:
+            return list(csv.DictReader(io.TextIOWrapper(csv_file, encoding='utf-8')))
+
+def legacy_scan(board, participants):
+    found = 0
+    for user_data in participants.values():
+        kaggle_id = user_data.get("kaggle_id", "").lower()
+        for entry in board:
+            if any(kaggle_id in str(value).lower() for value in entry.values()):
+                found += 1
+                break
+    return found
+
+def measure(func, *args, memory=True):
+    """Time one run, then trace peak memory in a second run (tracemalloc skews timings)"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if memory:
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+def main():
+    rows = int(next((arg for arg in sys.argv[1:] if arg.isdigit()), 100000))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        zip_path = os.path.join(tmp_dir, "competition.zip")
+        teams = build_leaderboard_zip(zip_path, rows)
+        participants = build_participants(teams)
+        print(f"Leaderboard: {rows} rows ({os.path.getsize(zip_path) / 1e6:.1f} MB zipped), {len(participants)} participants")
+
+        board, elapsed, peak = measure(legacy_ingest, zip_path)
+        print(f"list(DictReader)        : {elapsed * 1000:8.0f} ms  peak {peak:7.1f} MB")
+        if '--legacy-scan' in sys.argv:
+            found, elapsed, _ = measure(legacy_scan, board, participants, memory=False)
+            print(f"legacy substring scan   : {elapsed * 1000:8.0f} ms  ({found} matched)")
+        del board
+
+        (scores, misses, scanned), elapsed, peak = measure(match_leaderboard, zip_path, participants)
+        fuzzy = sum(1 for s in scores if s["matched"] == "fuzzy")
+        print(f"streamed + matched      : {elapsed * 1000:8.0f} ms  peak {peak:7.1f} MB  "
+              f"({len(scores)} matched, {fuzzy} fuzzy, {len(misses)} missing, {scanned} rows)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Micro-benchmark: compiled matcher vs the old per-word regex loop
+
+Run from the repo root:  python benchmarks/bench_matcher.py
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moderation import BAD_WORDS, get_matcher, normalize_text
+
+CLEAN_MESSAGES = [
+    "has anyone tried gradient boosting on the titanic dataset?",
+    "my submission scored 0.78 on the public leaderboard, not bad for a first try",
+    "lol same, the validation split was way off",
+    "can someone explain why my lightgbm model overfits so fast",
+    "good morning everyone! contest starts in 2 hours",
+    "check the pinned message for the competition link",
+    "I think feature engineering matters more than the model here",
+    "thanks for the help yesterday, the cross validation trick worked",
+    "what's the deadline for the weekly contest?",
+    "the class imbalance is brutal, try stratified k-fold",
+    "https://www.kaggle.com/code/someone/eda-notebook is a great starting point",
+    "ok brb dinner",
+]
+
+DIRTY_MESSAGES = [
+    "this model is sh1t honestly",
+    "what the fuck is this leaderboard",
+    "you absolute piece of shit",
+    "stop being a d!ck about it",
+    "holy shit I ranked 3rd",
+]
+
+def legacy_contains_bad_word(text):
+    normalized = normalize_text(text)
+    for bad_word in BAD_WORDS:
+        pattern = r'\b' + re.escape(bad_word) + r'\b'
+        if re.search(pattern, normalized):
+            return True
+    return False
+
+def matcher_contains_bad_word(text):
+    return get_matcher(BAD_WORDS).search(normalize_text(text)) is not None
+
+def build_corpus(size=5000, dirty_ratio=0.02, seed=42):
+    """Mostly clean chat with the occasional violation, like a real channel"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        pool = DIRTY_MESSAGES if rng.random() < dirty_ratio else CLEAN_MESSAGES
+        corpus.append(rng.choice(pool))
+    return corpus
+
+def main():
+    corpus = build_corpus()
+
+    # Both implementations must agree before timing means anything
+    mismatches = [m for m in corpus if legacy_contains_bad_word(m) != matcher_contains_bad_word(m)]
+    if mismatches:
+        print(f"Mismatch on {len(mismatches)} messages, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+
+    normalize_only = min(timeit.repeat(lambda: [normalize_text(m) for m in corpus], number=1, repeat=5))
+    legacy = min(timeit.repeat(lambda: [legacy_contains_bad_word(m) for m in corpus], number=1, repeat=5))
+    matcher = min(timeit.repeat(lambda: [matcher_contains_bad_word(m) for m in corpus], number=1, repeat=5))
+
+    per_msg = lambda total: total / len(corpus) * 1e6
+    print(f"Corpus: {len(corpus)} messages, {len(BAD_WORDS)} bad words")
+    print(f"normalize_text only : {per_msg(normalize_only):8.2f} us/msg")
+    print(f"legacy per-word loop: {per_msg(legacy):8.2f} us/msg")
+    print(f"compiled matcher    : {per_msg(matcher):8.2f} us/msg")
+    print(f"speedup             : {legacy / matcher:8.1f}x")
+
+if __name__ == '__main__':
+    main()
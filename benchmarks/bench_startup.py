@@ -0,0 +1,74 @@
+"""Benchmark: bot startup time (import breakdown and time until the bot would connect)
+
+Runs bot.py under `python -X importtime` with discord's Client.run patched out, so it
+loads everything and stops right before connecting to Discord. Reports the slowest top-level
+imports, the import/data-load phases, and what importing the Kaggle SDK eagerly would
+add (it is now imported lazily, after on_ready). Time to on_ready itself is printed by
+the bot on every start and shown in /serverstats.
+Run from the repo root:  python benchmarks/bench_startup.py [runs]
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs bot.py as __main__ without connecting; discord is imported up front to patch it, so its
+# import time is measured here and added to the bot's own phases
+DRIVER = """
+import time
+began = time.perf_counter()
+import runpy, sys
+import discord
+discord.Client.run = lambda self, *args, **kwargs: None
+before_bot = time.perf_counter() - began
+sys.path.insert(0, {root!r})
+timings = runpy.run_path({bot!r}, run_name='__main__')['startup_timings']
+print(f"STARTUP imports={{before_bot + timings['imports']:.4f}} loaded={{before_bot + timings['loaded']:.4f}}")
+"""
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def run_importtime(args, cwd, env=None, check=True):
+    """Run python -X importtime; returns (stdout, {top-level module: cumulative seconds})"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0 and check:
+        sys.exit(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(3)) == 1:  # Depth 0: imported directly, not as a dependency
+            modules[match.group(4)] = modules.get(match.group(4), 0) + int(match.group(2)) / 1e6
+    return proc.stdout, modules
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    driver = DRIVER.format(root=ROOT, bot=os.path.join(ROOT, "bot.py"))
+    phases = {"imports": [], "loaded": []}
+    imports = None
+    with tempfile.TemporaryDirectory() as tmp_dir:  # Fresh bot.db and caches each run
+        for _ in range(runs):
+            stdout, imports = run_importtime(["-c", driver], tmp_dir)
+            timings = dict(re.findall(r"(\w+)=([\d.]+)", stdout.split("STARTUP", 1)[-1]))
+            for phase in phases:
+                phases[phase].append(float(timings[phase]))
+
+    print(f"Startup over {runs} runs (median):")
+    for phase, values in phases.items():
+        print(f"  {phase:<8} {statistics.median(values) * 1000:8.0f} ms   (min {min(values) * 1000:.0f} ms)")
+
+    print("\nSlowest top-level imports (last run, cumulative):")
+    for module, seconds in sorted(imports.items(), key=lambda item: -item[1])[:15]:
+        print(f"  {module:<40} {seconds * 1000:8.1f} ms")
+
+    # The kaggle package authenticates on import, so without credentials this measures up to the failure
+    _, kaggle = run_importtime(["-c", "import kaggle.api.kaggle_api_extended"], ROOT, check=False)
+    print(f"\nKaggle SDK import (now deferred until after on_ready): {sum(seconds for module, seconds in kaggle.items() if module.startswith('kaggle')) * 1000:.0f} ms")
+    if any(module.startswith('kaggle') for module in imports):
+        print("  WARNING: kaggle was imported during startup")
+
+if __name__ == '__main__':
+    main()
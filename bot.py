@@ -1,3 +1,6 @@
+import time
+STARTUP_BEGAN = time.perf_counter()  # Startup timing, see startup_timings
+
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
@@ -5,10 +8,23 @@ import logging
 from dotenv import load_dotenv
 import os
 from collections import defaultdict
-from datetime import datetime, timedelta
-import json
+from datetime import datetime, timedelta, timezone
 import asyncio
-import re
+
+from moderation import (
+    BAD_WORDS, normalize_text, VerdictCache, WordFilterManager, ModerationQueue, FloodDetector,
+    SpamFingerprinter, WarningLedger, FLOOD_OK, FLOOD_CHANNEL, FLOOD_ESCALATE
+)
+from storage import Storage
+from scheduler import Scheduler
+from kaggle_client import KaggleClient, KaggleUnavailable
+from leaderboard import LeaderboardCache
+from competitions import Competition, CompetitionRegistry, FetchScheduler, CompetitionCatalog, slug
+from score_history import ScoreHistory
+from profile_stats import ProfileStatsCache
+from dm_fanout import DMFanout
+from roles import RoleReconciler
+from polls import Poll, PollRegistry
 
 # Load environment variables FIRST
 load_dotenv()
@@ -16,11 +32,26 @@ load_dotenv()
 # Set Kaggle credentials in environment BEFORE importing KaggleApi
 os.environ['KAGGLE_USERNAME'] = os.getenv('KAGGLE_USERNAME', '')
 os.environ['KAGGLE_KEY'] = os.getenv('KAGGLE_KEY', '')
+startup_timings = {"imports": time.perf_counter() - STARTUP_BEGAN}  # Seconds since process start per phase
 
-# NOW import and initialize Kaggle API
-from kaggle.api.kaggle_api_extended import KaggleApi
-kaggle_api = KaggleApi()
-kaggle_api.authenticate()
+def create_kaggle_api():
+    """Import and authenticate the Kaggle SDK (blocking; runs on the Kaggle client's threads)"""
+    # Importing the kaggle package already authenticates; both stay off the startup path
+    from kaggle.api.kaggle_api_extended import KaggleApi
+    api = KaggleApi()
+    api.authenticate()
+    return api
+
+kaggle_client = KaggleClient(  # All Kaggle calls go through this (off the event loop, with timeouts/retries)
+    create_kaggle_api,
+    max_concurrency=int(os.getenv('KAGGLE_CONCURRENCY', '4')),
+    timeout=float(os.getenv('KAGGLE_TIMEOUT', '30'))
+)
+leaderboard_cache = LeaderboardCache(  # Downloaded leaderboards, reused for LEADERBOARD_CACHE_TTL seconds
+    kaggle_client,
+    cache_dir=os.getenv('LEADERBOARD_CACHE_DIR', 'leaderboard_cache'),
+    ttl=float(os.getenv('LEADERBOARD_CACHE_TTL', '300'))
+)
 
 token = os.getenv('DISCORD_TOKEN')
 WARNING_CHANNEL_ID = int(os.getenv('WARNING_CHANNEL_ID', '0'))  # Set this in .env
@@ -29,114 +60,118 @@ STATS_CHANNEL_ID = int(os.getenv('STATS_CHANNEL_ID', '0'))  # Set this in .env f
 
 # Setup logging
 handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
+logger = logging.getLogger('bot')  # Moderation tracing; off unless a handler is configured for 'bot'
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
-intents.reactions = True
+intents.reactions = False  # Poll registration uses buttons, so reaction events aren't needed
 
 bot = commands.Bot(command_prefix='/', intents=intents, help_command=None)  # Slash commands only
 
 # Data storage (in production, use a database)
 user_activity = defaultdict(lambda: {"messages": 0, "last_seen": None})
-kaggle_ids = {}  # Permanent storage: {user_id: {"name": str, "kaggle_id": str, "registered_at": str}}
-contest_participants = {}  # Temporary contest data: {user_id: {"name": str, "kaggle_id": str, "score": float, "confirmed": bool}}
-active_poll_message_id = None  # Track the current active poll
-poll_expiry_time = None  # Track when the poll expires
-pending_registrations = {}  # Track users waiting to provide Kaggle ID {user_id: dm_message}
-active_competition = None  # Track current Kaggle competition ID
-competition_end_time = None  # Track when competition ends
-kaggle_stats_cache = {}  # Cache Kaggle stats {user_id: {stats, last_updated}}
-contest_scores = defaultdict(dict)  # Track contest scores {contest_name: {user_id: score}}
-bad_word_warnings = defaultdict(lambda: {"count": 0, "messages": [], "timeouts": 0})  # Track bad word usage and timeouts
-
-# Bad words list (customize as needed)
-BAD_WORDS = [
-    # Profanity (strong language)
-    'shit', 'fuck', 'bitch', 'bastard', 'piss',
-    'cock', 'dick', 'pussy', 'cunt', 'twat', 'bollocks', 'wanker', 'asshole',
-    'motherfucker', 'fuckface', 'shithead', 'dickhead', 'dumbass', 'jackass',
-    'bullshit', 'horseshit', 'bitchass', 'dipshit', 'shitty', 'fucking',
-    'fucked', 'fucker', 'fucks', 'arse', 'arsehole',
-    'son of a bitch', 'piece of shit', 'full of shit', 'eat shit', 'holy shit',
-
-    # Slurs and hate speech (racial/ethnic)
-    'nigger', 'nigga', 'chink', 'gook', 'spic', 'kike', 'wetback', 'beaner',
-    'towelhead', 'raghead', 'cracker', 'honky', 'paki', 'jap', 'injun',
-
-    # Sexual/inappropriate
-    'porn', 'hentai', 'rape', 'whore', 'slut', 'hoe',
-    'milf', 'dildo', 'boobs', 'tits', 'titties', 'penis', 'vagina',
-
-    # Homophobic/transphobic
-    'fag', 'faggot', 'dyke', 'tranny', 'shemale',
-
-    # Ableist
-    'retard', 'retarded', 'downy', 'spaz', 'cripple', 'midget',
-
-    # Other offensive or harmful
-    'nazi', 'hitler', 'pedo', 'pedophile', 'kill yourself', 'kys',
-    'nsfw'
-]
+storage = Storage(  # Permanent Kaggle IDs and contest participants (SQLite, write-behind)
+    os.getenv('DATABASE_PATH', 'bot.db'),
+    flush_interval=float(os.getenv('STORAGE_FLUSH_SECONDS', '2'))
+)
+scheduler = Scheduler(storage)  # Poll expiry, deadline reminders and other timed jobs (survive restarts)
+polls = PollRegistry(storage)  # Contest polls (several can run at once), each with its own registrations and expiry
+POLL_PENDING_TTL = int(os.getenv('POLL_PENDING_TTL', '900'))  # Seconds an unsubmitted Kaggle ID form stays pending
+competitions = CompetitionRegistry(storage)  # Tracked Kaggle competitions, each with its own participants/deadline/channel
+fetch_scheduler = FetchScheduler(  # One Kaggle download budget shared by all competitions
+    budget=int(os.getenv('KAGGLE_FETCH_BUDGET', '30')),
+    per_seconds=3600
+)
+competition_catalog = CompetitionCatalog(  # Kaggle competition metadata (deadline, reward, team limits) by ref
+    kaggle_client, storage,
+    pages=int(os.getenv('COMPETITION_CATALOG_PAGES', '5'))
+)
+COMPETITION_CATALOG_TTL = int(os.getenv('COMPETITION_CATALOG_TTL', '1800'))  # Full re-list interval
+LEADERBOARD_POLL_DEFAULT = int(os.getenv('LEADERBOARD_POLL_SECONDS', '1800'))  # Far from (or without) a deadline
+COMPETITION_REMINDERS = [("24 hours", timedelta(hours=24)), ("1 hour", timedelta(hours=1))]  # Before the deadline
+kaggle_stats_cache = ProfileStatsCache(  # Kaggle profile stats by username; lookups never wait on the API
+    kaggle_client,
+    max_entries=int(os.getenv('KAGGLE_PROFILE_CACHE_SIZE', '1000')),
+    ttl=float(os.getenv('KAGGLE_PROFILE_TTL', '21600')),
+    batch_size=int(os.getenv('KAGGLE_PROFILE_BATCH', '3'))
+)
+PROFILE_REFRESH_SECONDS = 10  # One refresh batch per tick
+contest_scores = ScoreHistory(os.getenv('SCORE_HISTORY_DIR', 'score_history'))  # Every fetched snapshot, per competition
+WINNER_ROLE_MODE = os.getenv('WINNER_ROLE_MODE', 'shared')  # shared: one role | competition: one per competition | rank: 🥇🥈🥉 roles
+WINNER_COUNT = 3  # Top N participants hold the winner role(s)
+role_reconciler = RoleReconciler(  # Winner roles: only the diff against current holders is applied
+    concurrency=int(os.getenv('ROLE_CONCURRENCY', '3')),
+    rate=float(os.getenv('ROLE_RATE', '2'))
+)
+dm_fanout = DMFanout(  # Bulk DMs (competition announcements): concurrent, paced, closed DMs remembered
+    storage,
+    concurrency=int(os.getenv('DM_CONCURRENCY', '5')),
+    rate=float(os.getenv('DM_RATE', '5'))
+)
 
 # Bad word detection settings
-BAD_WORD_THRESHOLD = 15  # Number of violations before warning admin
+BAD_WORD_THRESHOLD = 15  # Violation score before warning admin (score halves every WARNING_HALF_LIFE_HOURS)
 BAD_WORD_WHITELIST = [int(id.strip()) for id in os.getenv('BAD_WORD_WHITELIST', '').split(',') if id.strip()]  # Channels to skip bad word detection
+# The three settings above are defaults; each guild can override them at runtime (see /filterword)
+warning_ledger = WarningLedger(
+    'warning_ledger.jsonl',
+    half_life_hours=float(os.getenv('WARNING_HALF_LIFE_HOURS', '24'))
+)  # Persistent, time-decayed bad word warnings
+verdict_cache = VerdictCache(max_size=int(os.getenv('VERDICT_CACHE_SIZE', '4096')))  # Reuse verdicts for repeated/spammed text
+word_filters = WordFilterManager(
+    'word_filters.json', BAD_WORDS, BAD_WORD_WHITELIST, BAD_WORD_THRESHOLD,
+    on_retire=verdict_cache.discard_matcher
+)  # Per-guild word lists, hot-reloaded from word_filters.json
+moderation_queue = ModerationQueue(
+    max_pending=int(os.getenv('MODERATION_QUEUE_SIZE', '1000')),
+    workers=int(os.getenv('MODERATION_WORKERS', '2'))
+)  # Deletions and warnings are worked off the event handlers
 
-def normalize_text(text):
-    """Remove special characters and normalize text for bad word detection"""
-    # Convert to lowercase
-    normalized = text.lower()
-    # Replace common character substitutions
-    char_map = {
-        '@': 'a', '4': 'a', 
-        '3': 'e', 
-        '1': 'i', '!': 'i',
-        '0': 'o',
-        '$': 's', '5': 's',
-        '7': 't',
-        '8': 'b'
-    }
-    for char, replacement in char_map.items():
-        normalized = normalized.replace(char, replacement)
-    
-    # Remove all remaining special characters and numbers
-    normalized = re.sub(r'[^a-z\s]', '', normalized)
-    # Remove extra spaces
-    normalized = ' '.join(normalized.split())
-    return normalized
+# Flood detection settings (defaults: 4 messages per 3 seconds per user, 30 per 5 seconds per channel)
+FLOOD_USER_LIMIT = (int(os.getenv('FLOOD_USER_MESSAGES', '4')), float(os.getenv('FLOOD_USER_SECONDS', '3')))
+FLOOD_CHANNEL_LIMIT = (int(os.getenv('FLOOD_CHANNEL_MESSAGES', '30')), float(os.getenv('FLOOD_CHANNEL_SECONDS', '5')))
+FLOOD_TIMEOUT = timedelta(minutes=5)  # Timeout after repeatedly flooding
+flood_detector = FloodDetector(user_limit=FLOOD_USER_LIMIT, channel_limit=FLOOD_CHANNEL_LIMIT)
 
-def contains_bad_word(text):
-    """Check if text contains bad words, accounting for simple variations only"""
-    # First normalize the text (handles @, $, 3, etc. substitutions)
-    normalized = normalize_text(text)
-    
-    # Check normalized version with word boundaries
-    # This catches: fuck, sh1t, @ss, fvck, etc.
-    for bad_word in BAD_WORDS:
-        pattern = r'\b' + re.escape(bad_word) + r'\b'
-        if re.search(pattern, normalized):
-            return True
-    
-    # That's it! Simple and reliable.
-    # Won't catch f**k or f***k, but those are self-censored anyway.
-    # Won't catch "2000" or normal messages either!
-    
-    return False
+# Near-duplicate spam settings (flag 3+ accounts posting near-identical text within 60 seconds)
+spam_fingerprinter = SpamFingerprinter(
+    window=float(os.getenv('SPAM_WINDOW_SECONDS', '60')),
+    min_authors=int(os.getenv('SPAM_MIN_AUTHORS', '3')),
+    max_entries=int(os.getenv('SPAM_INDEX_SIZE', '5000'))
+)
 
 # ===== EVENT HANDLERS =====
 
-async def handle_bad_word_warning(author, warning_channel):
+async def timeout_member(author, duration, reason, warning_channel, channel_notice, dm_notice):
+    """Time out a member and tell both the moderators and the member. Returns True on success"""
+    try:
+        await author.timeout(duration, reason=reason)
+    except Exception as e:
+        print(f"Error timing out user: {e}")
+        return False
+    
+    try:
+        if warning_channel:
+            await warning_channel.send(channel_notice)
+    except Exception as e:
+        print(f"Error posting timeout notice: {e}")
+    try:
+        await author.send(dm_notice)
+    except:
+        pass
+    return True
+
+async def handle_bad_word_warning(author, warning_channel, recent_violations, score, threshold):
     """Handle bad word warning notifications asynchronously"""
-    user_data = bad_word_warnings[author.id]
+    recent_violations = recent_violations[-3:]
     
     # DM user
     try:
-        recent_messages = user_data["messages"][-3:]
-        messages_list = "\n".join([f"  • {msg_data['content']}" for msg_data in recent_messages])
+        messages_list = "\n".join([f"  • {violation.content}" for violation in recent_violations])
         
         await author.send(
             f"⚠️ **Official Warning - Language Violation**\n\n"
-            f"You have reached the inappropriate language threshold (**{BAD_WORD_THRESHOLD} violations**).\n\n"
+            f"You have reached the inappropriate language threshold (**{threshold} violations**).\n\n"
             f"**Recent flagged messages:**\n{messages_list}\n\n"
             f"Please review our server rules and maintain respectful communication.\n"
             f"**Note:** Accumulating 3 warnings will result in a 6-hour timeout.\n\n"
@@ -150,50 +185,151 @@ async def handle_bad_word_warning(author, warning_channel):
     if warning_channel:
         embed = discord.Embed(
             title="⚠️ Bad Word Threshold Reached",
-            description=f"**User:** {author.mention} ({author.name})\n**Violations:** {user_data['count']}",
+            description=f"**User:** {author.mention} ({author.name})\n**Violations:** {score:.0f}",
             color=0xff0000,
             timestamp=datetime.now()
         )
-        recent_msgs = user_data["messages"][-3:]
-        for i, msg_data in enumerate(recent_msgs, 1):
+        for i, violation in enumerate(recent_violations, 1):
             embed.add_field(
-                name=f"Message {i} - #{msg_data['channel']}",
-                value=f"```{msg_data['content']}```",
+                name=f"Message {i} - #{violation.channel}",
+                value=f"```{violation.content}```",
                 inline=False
             )
-        embed.set_footer(text=f"Total violations: {user_data['count']}")
+        record = warning_ledger.get(author.id)
+        embed.set_footer(text=f"Lifetime violations: {record.total if record else 0}")
         await warning_channel.send(embed=embed)
     
     # Apply timeout if 3 warnings
-    bad_word_warnings[author.id]["timeouts"] += 1
-    if bad_word_warnings[author.id]["timeouts"] >= 3:
-        try:
-            await author.timeout(timedelta(hours=6), reason="Exceeded bad word warnings 3 times")
-            if warning_channel:
-                await warning_channel.send(
-                    f"🔇 **{author.mention} has been timed out for 6 hours** (3 warnings reached)"
-                )
-            try:
-                await author.send(
-                    f"🔇 **You have been timed out for 6 hours**\n\n"
-                    f"You received 3 warnings for inappropriate language.\n"
-                    f"Please review the server rules."
-                )
-            except:
-                pass
-            bad_word_warnings[author.id]["timeouts"] = 0
-        except Exception as e:
-            print(f"Error timing out user: {e}")
+    if warning_ledger.add_timeout_strike(author.id) >= 3:
+        timed_out = await timeout_member(
+            author, timedelta(hours=6), "Exceeded bad word warnings 3 times", warning_channel,
+            f"🔇 **{author.mention} has been timed out for 6 hours** (3 warnings reached)",
+            "🔇 **You have been timed out for 6 hours**\n\n"
+            "You received 3 warnings for inappropriate language.\n"
+            "Please review the server rules."
+        )
+        if timed_out:
+            warning_ledger.reset_timeout_strikes(author.id)
+
+async def moderate_message(message):
+    """Delete a server message containing bad words and track the violation. Returns True if deleted"""
+    if isinstance(message.channel, discord.DMChannel) or not message.content or not message.content.strip():
+        return False
+    # Skip bad word detection for whitelisted channels (e.g., music channels)
+    word_filter = word_filters.for_guild(message.guild.id)
+    if message.channel.id in word_filter.whitelist:
+        return False
+    
+    matched_word = verdict_cache.lookup(message.content, word_filter.matcher)
+    if not matched_word:
+        return False
     
-    # Reset count after warning
-    bad_word_warnings[author.id]["count"] = 0
-    bad_word_warnings[author.id]["messages"] = []
+    # Queue for deletion (coalesced into bulk deletes per channel during raids)
+    logger.debug("Bad word %r detected from %s: %r", matched_word, message.author.name, message.content[:50])
+    await moderation_queue.delete(message)
+    await record_violation(message)
+    return True
+
+async def record_violation(message):
+    """Track a removed message against its author and queue a warning once the threshold is hit"""
+    author_id = message.author.id
+    score = warning_ledger.add_violation(author_id, message.content, message.channel.name)
+
+    # Handle warnings (queued behind pending deletions). Reset right away so a burst
+    # of violations only produces one warning.
+    threshold = word_filters.for_guild(message.guild.id).threshold
+    if score >= threshold:
+        recent_violations = warning_ledger.get(author_id).recent()
+        warning_ledger.reset_score(author_id)
+        await moderation_queue.submit(
+            handle_bad_word_warning, message.author, bot.get_channel(WARNING_CHANNEL_ID), recent_violations, score, threshold
+        )
+
+async def check_spam_cluster(message):
+    """Remove near-identical messages posted by several accounts (raids). Returns True if removed"""
+    if isinstance(message.channel, discord.DMChannel) or message.author.bot or not message.content:
+        return False
+    if message.channel.id in word_filters.for_guild(message.guild.id).whitelist:
+        return False
+    
+    flagged = spam_fingerprinter.check(normalize_text(message.content), message.author.id, message)
+    if not flagged:
+        return False
+    
+    logger.debug("Spam cluster match from %s: %r (%d message(s))", message.author.name, message.content[:50], len(flagged))
+    for spam_message in flagged:
+        await moderation_queue.delete(spam_message)
+        await record_violation(spam_message)
+    
+    # More than one message means the cluster was just detected; report it once
+    if len(flagged) > 1:
+        await moderation_queue.submit(report_spam_cluster, flagged, bot.get_channel(WARNING_CHANNEL_ID))
+    return True
+
+async def report_spam_cluster(messages, warning_channel):
+    """Tell moderators about a newly detected cluster of near-identical messages"""
+    if not warning_channel:
+        return
+    authors = {message.author.id: message.author for message in messages}
+    channels = {message.channel.id: message.channel for message in messages}
+    embed = discord.Embed(
+        title="🚨 Coordinated Spam Detected",
+        description=f"**{len(messages)}** near-identical messages from **{len(authors)}** accounts were removed.",
+        color=0xff0000,
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="Accounts", value=", ".join(a.mention for a in list(authors.values())[:15]), inline=False)
+    embed.add_field(name="Channels", value=", ".join(c.mention for c in channels.values()), inline=False)
+    embed.add_field(name="Sample", value=f"```{messages[-1].content[:300]}```", inline=False)
+    await warning_channel.send(embed=embed)
+
+async def handle_flood(message, verdict):
+    """Deal with a message the flood detector flagged"""
+    if verdict == FLOOD_CHANNEL:
+        # Channel-wide raid: keep filtering bad words but skip activity and command processing
+        await moderate_message(message)
+        return
+    
+    # The author is over their own rate: drop the message
+    await moderation_queue.delete(message)
+    if verdict == FLOOD_ESCALATE:
+        logger.debug("Flood escalation for %s in #%s", message.author.name, message.channel.name)
+        minutes = int(FLOOD_TIMEOUT.total_seconds() // 60)
+        await moderation_queue.submit(
+            timeout_member, message.author, FLOOD_TIMEOUT, "Message flood", bot.get_channel(WARNING_CHANNEL_ID),
+            f"🔇 **{message.author.mention} has been timed out for {minutes} minutes** (flooding #{message.channel.name})",
+            f"🔇 **You have been timed out for {minutes} minutes**\n\n"
+            f"You were sending messages too fast.\n"
+            f"Please review the server rules."
+        )
 
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user}")
     print("AI Olympiad Bot is ready!")
     print(f"Serving {len(bot.guilds)} guild(s)")
+    if "ready" not in startup_timings:
+        startup_timings["ready"] = time.perf_counter() - STARTUP_BEGAN
+        print(f"Startup: imports {startup_timings['imports']:.2f}s, data loaded {startup_timings['loaded']:.2f}s, "
+              f"ready {startup_timings['ready']:.2f}s")
+    
+    # Import/authenticate Kaggle in the background; commands that need it wait for it or report its state
+    kaggle_client.warm()
+    
+    # Start moderation workers (also started lazily by the first queued action)
+    moderation_queue.start()
+    
+    # Reload scheduled jobs; anything that came due while offline runs right away
+    await scheduler.start()
+    
+    # Poll buttons keep working across restarts: one view handles every poll message
+    bot.add_view(PollView())
+    await attach_poll_views()
+    
+    # Load per-guild word filters and keep watching the config file
+    await word_filters.reload_if_changed()
+    if not watch_word_filters.is_running():
+        watch_word_filters.start()
     
     # Sync slash commands
     try:
@@ -205,6 +341,14 @@ async def on_ready():
     # Start background tasks to keep bot active
     if not daily_stats_update.is_running():
         daily_stats_update.start()
+    if not leaderboard_poller.is_running():
+        leaderboard_poller.start()
+    if not refresh_kaggle_profiles.is_running():
+        refresh_kaggle_profiles.start()
+    if not refresh_competition_catalog.is_running():
+        refresh_competition_catalog.start()
+    if not prune_poll_signups.is_running():
+        prune_poll_signups.start()
     
 @bot.event
 async def on_member_join(member):
@@ -235,161 +379,26 @@ async def on_message(message):
     if message.author == bot.user:
         return
     
+    # FLOOD CHECK: over-limit traffic is dropped before moderation, activity and commands
+    # (bots, webhooks and whitelisted channels are exempt, as in the spam check)
+    if (message.guild is not None and not message.author.bot and message.webhook_id is None
+            and message.channel.id not in word_filters.for_guild(message.guild.id).whitelist):
+        flood_verdict = flood_detector.check(message.author.id, message.channel.id)
+        if flood_verdict != FLOOD_OK:
+            await handle_flood(message, flood_verdict)
+            return
+    
     # PRIORITY CHECK: Bad words first - instant deletion for server messages with text
-    if not isinstance(message.channel, discord.DMChannel) and message.content and message.content.strip():
-        # Skip bad word detection for whitelisted channels (e.g., music channels)
-        if message.channel.id not in BAD_WORD_WHITELIST:
-            if contains_bad_word(message.content):
-                # Delete instantly
-                print(f"DEBUG: Bad word detected from {message.author.name}: '{message.content[:50]}'")
-                await message.delete()
-                
-                # Track violation
-                bad_word_warnings[message.author.id]["count"] += 1
-                bad_word_warnings[message.author.id]["messages"].append({
-                    "content": message.content,
-                    "channel": message.channel.name,
-                    "timestamp": datetime.now().isoformat()
-                })
-
-                # Handle warnings (async, doesn't slow down deletion)
-                if bad_word_warnings[message.author.id]["count"] >= BAD_WORD_THRESHOLD:
-                    asyncio.create_task(handle_bad_word_warning(message.author, bot.get_channel(WARNING_CHANNEL_ID)))
-
-                return  # Stop processing
-    
-    # Check if this is a DM response for Kaggle ID registration
+    if await moderate_message(message):
+        return  # Stop processing
+    
+    # SPAM CHECK: the same message pushed by several accounts
+    if await check_spam_cluster(message):
+        return
+    
+    # A DM means the user can be reached by DM again
     if isinstance(message.channel, discord.DMChannel):
-        user_id = message.author.id
-        
-        # Check if user is in pending registrations and poll hasn't expired
-        global poll_expiry_time
-        if user_id in pending_registrations:
-            if poll_expiry_time and datetime.now() < poll_expiry_time:
-                pending_data = pending_registrations[user_id]
-                user_response = message.content.strip()
-                
-                # Check if user already had Kaggle ID (just confirming)
-                if pending_data.get("has_kaggle_id"):
-                    # User already has Kaggle ID, check for Yes/No confirmation
-                    if user_response.lower() in ['yes', 'y', 'yeah', 'yep', 'sure', 'ok', 'okay']:
-                        # Confirm registration with existing Kaggle ID from permanent storage
-                        kaggle_id = kaggle_ids[user_id]["kaggle_id"]
-                        contest_participants[user_id] = {
-                            "name": message.author.name,
-                            "kaggle_id": kaggle_id,
-                            "registered_at": datetime.now().isoformat(),
-                            "confirmed": True
-                        }
-                        
-                        await message.author.send(
-                            f"✅ **Registration Confirmed!**\n\n"
-                            f"Kaggle ID: **{kaggle_id}**\n"
-                            f"You'll receive the competition link once registration closes!\n"
-                            f"Good luck in the contest! 🚀"
-                        )
-                        
-                        # Remove from pending
-                        del pending_registrations[user_id]
-                        save_participants()
-                        return
-                        
-                    elif user_response.lower() in ['no', 'n', 'nope', 'cancel', 'nah']:
-                        # User declined participation
-                        await message.author.send("❌ Registration cancelled. You can react again if you change your mind!")
-                        del pending_registrations[user_id]
-                        return
-                        
-                    else:
-                        # Invalid response
-                        await message.author.send("Please reply with **Yes** to confirm or **No** to cancel.")
-                        return
-                
-                else:
-                    # User doesn't have Kaggle ID yet
-                    # Check if they already said Yes and provided Kaggle ID
-                    if "temp_kaggle_id" in pending_data:
-                        # They already provided Kaggle ID, save it and confirm
-                        kaggle_id = pending_data["temp_kaggle_id"]
-                        contest_participants[user_id] = {
-                            "name": message.author.name,
-                            "kaggle_id": kaggle_id,
-                            "registered_at": datetime.now().isoformat(),
-                            "confirmed": True
-                        }
-                        
-                        await message.author.send(
-                            f"✅ **Registration Confirmed!**\n\n"
-                            f"Kaggle ID: **{kaggle_id}**\n"
-                            f"Your Kaggle ID has been saved for future contests.\n\n"
-                            f"You'll receive the competition link once registration closes!\n\n"
-                            f"💡 **Tip:** Use `!my_kaggle <new_id>` anytime to update your Kaggle ID.\n\n"
-                            f"Good luck in the contest! 🚀"
-                        )
-                        
-                        # Remove from pending
-                        del pending_registrations[user_id]
-                        save_participants()
-                        return
-                    
-                    elif "waiting_for_kaggle_id" in pending_data:
-                        # They said Yes, now they're providing Kaggle ID
-                        kaggle_id = user_response
-                        
-                        # Save the Kaggle ID and mark as registered
-                        pending_registrations[user_id]["temp_kaggle_id"] = kaggle_id
-                        
-                        contest_participants[user_id] = {
-                            "name": message.author.name,
-                            "kaggle_id": kaggle_id,
-                            "registered_at": datetime.now().isoformat(),
-                            "confirmed": True
-                        }
-                        
-                        await message.author.send(
-                            f"✅ **Registration Confirmed!**\n\n"
-                            f"Kaggle ID: **{kaggle_id}**\n"
-                            f"Your Kaggle ID has been saved for future contests.\n\n"
-                            f"You'll receive the competition link once registration closes!\n\n"
-                            f"💡 **Tip:** Use `!my_kaggle <new_id>` anytime to update your Kaggle ID.\n\n"
-                            f"Good luck in the contest! 🚀"
-                        )
-                        
-                        # Remove from pending
-                        del pending_registrations[user_id]
-                        save_participants()
-                        return
-                    
-                    else:
-                        # First response - asking if they want to participate
-                        if user_response.lower() in ['yes', 'y', 'yeah', 'yep', 'sure', 'ok', 'okay']:
-                            # They said yes, now ask for Kaggle ID
-                            pending_registrations[user_id]["waiting_for_kaggle_id"] = True
-                            
-                            await message.author.send(
-                                f"Great! 🎉\n\n"
-                                f"Please reply with your **Kaggle ID** (username).\n\n"
-                                f"**Format:** Just type your Kaggle username (e.g., johndoe123)\n"
-                                f"Example: If your profile is kaggle.com/johndoe123, reply with: johndoe123"
-                            )
-                            return
-                            
-                        elif user_response.lower() in ['no', 'n', 'nope', 'cancel', 'nah']:
-                            # User declined participation
-                            await message.author.send("❌ Registration cancelled. You can react again if you change your mind!")
-                            del pending_registrations[user_id]
-                            return
-                            
-                        else:
-                            # Invalid response
-                            await message.author.send("Please reply with **Yes** to participate or **No** to cancel.")
-                            return
-                
-            else:
-                await message.author.send("⏰ Sorry, the contest poll has expired. Registration is closed.")
-                if user_id in pending_registrations:
-                    del pending_registrations[user_id]
-                return
+        dm_fanout.reopen(message.author.id)
     
     # Track user activity
     user_activity[message.author.id]["messages"] += 1
@@ -398,101 +407,163 @@ async def on_message(message):
     await bot.process_commands(message)
 
 @bot.event
-async def on_reaction_add(reaction, user):
-    # Check if this is a contest poll reaction
-    if user.bot:
+async def on_raw_message_edit(payload):
+    """Re-check edited messages so editing in a bad word isn't a bypass (works for uncached messages too)"""
+    content = payload.data.get("content")
+    if payload.guild_id is None or not content or not content.strip():
+        return  # DMs and embed-only updates
+    word_filter = word_filters.for_guild(payload.guild_id)
+    if payload.channel_id in word_filter.whitelist:
+        return
+    author = payload.data.get("author")
+    if not author or author.get("bot"):
         return
     
-    message = reaction.message
-    global active_poll_message_id, poll_expiry_time, pending_registrations
-    
-    # Check if this message is the active contest poll
-    if message.embeds and len(message.embeds) > 0:
-        embed = message.embeds[0]
-        if embed.title and "Contest Poll" in embed.title and message.id == active_poll_message_id:
-            # Check if poll hasn't expired
-            if poll_expiry_time and datetime.now() >= poll_expiry_time:
-                try:
-                    await user.send("⏰ Sorry, the contest poll has expired. Registration is closed.")
-                except:
-                    pass
-                return
-            
-            # Check if user already confirmed registration for this poll
-            if user.id in contest_participants and contest_participants[user.id].get("confirmed"):
-                try:
-                    kaggle_id = contest_participants[user.id]["kaggle_id"]
-                    await user.send(f"✅ You're already registered with Kaggle ID: **{kaggle_id}**")
-                except:
-                    pass
-                return
-            
-            # Check if user has Kaggle ID already set in permanent storage
-            has_kaggle_id = user.id in kaggle_ids
-            
-            # Send DM asking for participation (no timeout, poll expiry handles it)
-            try:
-                if has_kaggle_id:
-                    # User already has Kaggle ID, just ask for confirmation
-                    kaggle_id = kaggle_ids[user.id]["kaggle_id"]
-                    await user.send(
-                        f"Hi {user.name}! 👋\n\n"
-                        f"Thanks for your interest in our weekly contest!\n\n"
-                        f"**Your Kaggle ID:** {kaggle_id}\n\n"
-                        f"Are you ready to participate?\n"
-                        f"Reply with **Yes** to confirm or **No** to cancel.\n\n"
-                        f"⏰ You can register until the poll expires."
-                    )
-                    # Mark as pending with existing Kaggle ID
-                    pending_registrations[user.id] = {"has_kaggle_id": True, "timestamp": datetime.now()}
-                else:
-                    # User doesn't have Kaggle ID - ask if they want to participate first
-                    await user.send(
-                        f"Hi {user.name}! 👋\n\n"
-                        f"Thanks for your interest in our weekly contest!\n\n"
-                        f"Would you like to participate?\n"
-                        f"Reply with **Yes** to continue or **No** to cancel.\n\n"
-                        f"⏰ You can register until the poll expires."
-                    )
-                    # Mark as pending without Kaggle ID
-                    pending_registrations[user.id] = {"has_kaggle_id": False, "timestamp": datetime.now()}
-                
-            except Exception as e:
-                print(f"Error sending DM to user: {e}")
+    # Cheap cached verdict first; only fetch the message when there is something to delete
+    if not verdict_cache.lookup(content, word_filter.matcher):
+        return
+    
+    channel = bot.get_channel(payload.channel_id)
+    if channel is None:
+        return
+    try:
+        message = await channel.fetch_message(payload.message_id)
+    except discord.HTTPException:
+        return  # Already deleted
+    await moderate_message(message)
 
-@bot.event
-async def on_reaction_remove(reaction, user):
-    """Handle when someone removes their reaction from the poll"""
-    if user.bot:
+# ===== CONTEST POLL REGISTRATION =====
+
+class KaggleIdModal(discord.ui.Modal, title="Join the contest"):
+    """Kaggle ID form opened by a poll's Join button; submitting it registers the user"""
+    
+    kaggle_id = discord.ui.TextInput(label="Kaggle ID (username)", placeholder="e.g. johndoe123", max_length=64)
+    
+    def __init__(self, message_id, default=None):
+        super().__init__(timeout=POLL_PENDING_TTL)
+        self.message_id = message_id  # Looked up again on submit: the poll may have closed or been cleared
+        self.kaggle_id.default = default
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        poll = open_poll(self.message_id)
+        if poll is None:
+            await interaction.response.send_message("⏰ Sorry, the contest poll has closed.", ephemeral=True)
+            return
+        await register_poll_participant(interaction, poll, self.kaggle_id.value.strip())
+
+class PollView(discord.ui.View):
+    """Join/Leave buttons for contest polls
+
+    One instance serves every poll: the buttons have fixed custom IDs and the poll is
+    found from the clicked message, so the view is simply re-added on startup.
+    """
+    
+    def __init__(self):
+        super().__init__(timeout=None)
+    
+    @discord.ui.button(label="Join", emoji="👍", style=discord.ButtonStyle.success, custom_id="contest_poll:join")
+    async def join(self, interaction: discord.Interaction, button: discord.ui.Button):
+        poll = open_poll(interaction.message.id)
+        if poll is None:
+            await interaction.response.send_message("⏰ Sorry, the contest poll has expired. Registration is closed.", ephemeral=True)
+            return
+        
+        # Prefill with the ID they're registered with, else their saved Kaggle ID if it's in memory
+        # (a modal has to be the first response, so there's no time to read storage)
+        user_id = interaction.user.id
+        if user_id in poll.participants:
+            default = poll.participants[user_id]["kaggle_id"]
+        else:
+            kaggle_record = storage.peek_kaggle_id(user_id)
+            default = kaggle_record["kaggle_id"] if kaggle_record else None
+        
+        poll.pending[user_id] = {"timestamp": datetime.now(timezone.utc).isoformat()}
+        polls.save(poll)
+        await interaction.response.send_modal(KaggleIdModal(poll.message_id, default))
+    
+    @discord.ui.button(label="Leave", style=discord.ButtonStyle.secondary, custom_id="contest_poll:leave")
+    async def leave(self, interaction: discord.Interaction, button: discord.ui.Button):
+        poll = open_poll(interaction.message.id)
+        if poll is None:
+            await interaction.response.send_message("⏰ Sorry, the contest poll has expired. Registration is closed.", ephemeral=True)
+            return
+        
+        user_id = interaction.user.id
+        if user_id not in poll.participants:
+            await interaction.response.send_message("You're not registered for this contest.", ephemeral=True)
+            return
+        
+        kaggle_id = poll.participants.pop(user_id)["kaggle_id"]
+        save_participant(poll, user_id)
+        await interaction.response.send_message(
+            f"❌ You've been removed from the contest. Your Kaggle ID **{kaggle_id}** has been unregistered.",
+            ephemeral=True
+        )
+        print(f"Removed {interaction.user.name} from contest participants")
+
+def open_poll(message_id):
+    """The poll posted as this message if it still takes registrations, else None"""
+    if message_id not in polls.active_ids:
+        return None
+    poll = polls.get(message_id)
+    return poll if poll.is_open() else None
+
+async def register_poll_participant(interaction, poll, kaggle_id):
+    """Register the user from a submitted Kaggle ID form, saving the ID for future contests"""
+    user = interaction.user
+    poll.pending.pop(user.id, None)
+    polls.save(poll)
+    if not kaggle_id:
+        await interaction.response.send_message("❌ Please enter your Kaggle username.", ephemeral=True)
         return
     
-    message = reaction.message
-    global active_poll_message_id, poll_expiry_time, pending_registrations, contest_participants
-    
-    # Check if this is the active contest poll
-    if message.embeds and len(message.embeds) > 0:
-        embed = message.embeds[0]
-        if embed.title and "Contest Poll" in embed.title and message.id == active_poll_message_id:
-            # Remove from participants if registered
-            if user.id in contest_participants:
-                kaggle_id = contest_participants[user.id]["kaggle_id"]
-                del contest_participants[user.id]
-                save_participants()
-                
-                try:
-                    await user.send(f"❌ You've been removed from the contest. Your Kaggle ID **{kaggle_id}** has been unregistered.")
-                except:
-                    pass
-                
-                print(f"Removed {user.name} from contest participants")
-            
-            # Remove from pending registrations
-            if user.id in pending_registrations:
-                del pending_registrations[user.id]
-                try:
-                    await user.send("❌ Registration cancelled. You can react again if you change your mind!")
-                except:
-                    pass
+    await interaction.response.defer(ephemeral=True)  # Acknowledge before reading storage
+    kaggle_record = await storage.get_kaggle_id(user.id)
+    if open_poll(poll.message_id) is not poll:
+        # Closed or cleared while we read storage; don't write it back
+        await interaction.followup.send("⏰ Sorry, the contest poll has closed.", ephemeral=True)
+        return
+    if kaggle_record is None:
+        storage.upsert_kaggle_id(user.id, {
+            "name": user.name,
+            "kaggle_id": kaggle_id,
+            "registered_at": datetime.now().isoformat()
+        })
+    elif kaggle_record["kaggle_id"] != kaggle_id:
+        kaggle_record["kaggle_id"] = kaggle_id
+        kaggle_record["updated_at"] = datetime.now().isoformat()
+        storage.upsert_kaggle_id(user.id, kaggle_record)
+        update_participant_kaggle_id(user.id, kaggle_id)  # Other open polls they joined
+    
+    poll.participants[user.id] = {
+        "name": user.name,
+        "kaggle_id": kaggle_id,
+        "registered_at": datetime.now().isoformat()
+    }
+    save_participant(poll, user.id)
+    await interaction.followup.send(
+        f"✅ **Registration Confirmed!**\n\n"
+        f"Kaggle ID: **{kaggle_id}**\n"
+        f"You'll receive the competition link once registration closes!\n\n"
+        f"💡 **Tip:** Click **Join** again or use `/setkaggle` to change your Kaggle ID.\n\n"
+        f"Good luck in the contest! 🚀",
+        ephemeral=True
+    )
+
+async def attach_poll_views():
+    """Give open polls posted before the Join/Leave buttons existed their buttons"""
+    for message_id in list(polls.active_ids):
+        poll = polls.get(message_id)
+        if poll.channel_id is None:
+            continue  # Posted before polls recorded their channel
+        try:
+            channel = bot.get_channel(poll.channel_id) or await bot.fetch_channel(poll.channel_id)
+            message = await channel.fetch_message(message_id)
+            if not message.components:
+                await message.edit(view=PollView())
+                print(f"Added Join/Leave buttons to poll {message_id}")
+        except discord.HTTPException as e:
+            print(f"Error adding buttons to poll {message_id}: {e}")
 
 # ===== ERROR HANDLERS =====
 
@@ -532,17 +603,73 @@ async def on_command_error(ctx, error):
 
 # ===== SLASH COMMANDS =====
 
-# Helper function for poll expiry
-async def expire_poll(poll_message, duration_hours):
-    await asyncio.sleep(duration_hours * 3600)
-    global active_poll_message_id, poll_expiry_time, pending_registrations
+# Scheduled jobs
+
+@scheduler.job('expire_poll')
+async def expire_poll(payload):
+    """Close registration for a contest poll (safe to re-run: a closed poll is skipped)"""
+    poll = polls.get(payload["message_id"])
+    if poll is None or poll.closed_at:
+        return  # Poll was cleared or already closed meanwhile
+    # Announce before marking it closed, so a failed send is retried instead of silently skipped
     embed = discord.Embed(
         title='⏰ Contest Poll Closed',
-        description=f'Registration closed! Total: **{len(contest_participants)}**',
+        description=f'Registration closed! Total: **{len(poll.participants)}**',
         color=0xff9900
     )
-    await poll_message.channel.send(embed=embed)
-    pending_registrations = {}
+    try:
+        channel = bot.get_channel(payload["channel_id"]) or await bot.fetch_channel(payload["channel_id"])
+        await channel.send(embed=embed)
+    except (discord.NotFound, discord.Forbidden) as e:
+        print(f"Couldn't announce that poll {poll.message_id} closed: {e}")  # Retrying won't help
+    polls.close(poll)
+
+@scheduler.job('competition_reminder')
+async def competition_reminder(payload):
+    """Post a reminder that a tracked competition is about to end (only reads state, so safe to re-run)"""
+    competition = competitions.get(payload["competition"])
+    if competition is None or not competition.end_time or competition.end_time.timestamp() != payload["deadline"]:
+        return  # Removed, or the deadline moved (a new reminder was scheduled for that)
+    channel = bot.get_channel(competition.channel_id or LEADERBOARD_CHANNEL_ID)
+    if not channel:
+        return
+    embed = discord.Embed(
+        title=f"⏰ {payload['remaining']} left!",
+        description=f"**{payload['competition']}** closes <t:{int(payload['deadline'])}:R>.\n"
+                    f"[Make your final submissions](https://www.kaggle.com/c/{payload['competition']})",
+        color=0xff9900
+    )
+    await channel.send(embed=embed)
+
+def schedule_competition_reminders(competition, cancel=False):
+    """(Re)schedule deadline reminders for a competition, or drop them"""
+    for label, before in COMPETITION_REMINDERS:
+        key = f"competition-reminder-{competition.ref}-{label}"
+        remind_at = competition.end_time - before if competition.end_time else None
+        if not cancel and remind_at and remind_at > datetime.now(timezone.utc):
+            scheduler.schedule(key, 'competition_reminder', remind_at, {
+                "competition": competition.ref,
+                "remaining": label,
+                "deadline": competition.end_time.timestamp()
+            })
+        else:
+            scheduler.cancel(key)
+
+async def competition_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest tracked competitions (served from the registry's in-memory index)"""
+    return [app_commands.Choice(name=ref, value=ref) for ref in competitions.search(current)]
+
+async def kaggle_competition_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest tracked competitions first, then Kaggle competitions from the in-memory catalog"""
+    refs = competitions.search(current, limit=5)
+    choices = [app_commands.Choice(name=ref, value=ref) for ref in refs]
+    for metadata in competition_catalog.search(current, limit=25):
+        if len(choices) >= 25:
+            break
+        if metadata["ref"] not in refs:
+            label = f"{metadata['ref']} — {metadata['title']}" if metadata["title"] else metadata["ref"]
+            choices.append(app_commands.Choice(name=label[:100], value=metadata["ref"]))
+    return choices
 
 # User Commands
 
@@ -566,7 +693,9 @@ async def slash_help(interaction: discord.Interaction):
               "`/help` - Show this help message\n"
               "`/activity` - Check your activity stats\n"
               "`/setkaggle` - Set your Kaggle ID\n"
-              "`/mykaggle` - View your Kaggle ID",
+              "`/mykaggle` - View your Kaggle ID\n"
+              "`/progression` - Score/rank history in a competition\n"
+              "`/movers` - Biggest rank changes lately",
         inline=False
     )
     
@@ -574,13 +703,19 @@ async def slash_help(interaction: discord.Interaction):
         embed.add_field(
             name="Admin Commands",
             value="`/createcontest` - Create contest poll\n"
-                  "`/setcompetition` - Set Kaggle competition\n"
+                  "`/setcompetition` - Track a Kaggle competition\n"
+                  "`/competitions` - List tracked competitions\n"
+                  "`/removecompetition` - Stop tracking a competition\n"
                   "`/leaderboard` - Show live leaderboard\n"
                   "`/participants` - Show contest participants\n"
                   "`/clearparticipants` - Clear participant list\n"
                   "`/serverstats` - Show server statistics\n"
                   "`/checkwarnings` - Check bad word warnings\n"
-                  "`/clearwarnings` - Clear user warnings",
+                  "`/clearwarnings` - Clear user warnings\n"
+                  "`/filterword` - Add/remove a filtered word\n"
+                  "`/filterchannel` - Skip/check a channel\n"
+                  "`/filterthreshold` - Set warning threshold\n"
+                  "`/filterstats` - Moderation filter stats",
             inline=False
         )
     
@@ -621,16 +756,15 @@ async def slash_activity(interaction: discord.Interaction):
 @app_commands.describe(kaggle_id="Your Kaggle username")
 async def slash_setkaggle(interaction: discord.Interaction, kaggle_id: str):
     user_id = interaction.user.id
+    kaggle_record = await storage.get_kaggle_id(user_id)
     
-    if user_id in kaggle_ids:
-        old_id = kaggle_ids[user_id]["kaggle_id"]
-        kaggle_ids[user_id]["kaggle_id"] = kaggle_id
-        kaggle_ids[user_id]["updated_at"] = datetime.now().isoformat()
-        save_kaggle_ids()
+    if kaggle_record:
+        old_id = kaggle_record["kaggle_id"]
+        kaggle_record["kaggle_id"] = kaggle_id
+        kaggle_record["updated_at"] = datetime.now().isoformat()
+        storage.upsert_kaggle_id(user_id, kaggle_record)
         
-        if user_id in contest_participants:
-            contest_participants[user_id]["kaggle_id"] = kaggle_id
-            save_participants()
+        update_participant_kaggle_id(user_id, kaggle_id)
         
         await interaction.response.send_message(
             f"✅ **Kaggle ID Updated!**\n\n"
@@ -639,16 +773,13 @@ async def slash_setkaggle(interaction: discord.Interaction, kaggle_id: str):
             ephemeral=True
         )
     else:
-        kaggle_ids[user_id] = {
+        storage.upsert_kaggle_id(user_id, {
             "name": interaction.user.name,
             "kaggle_id": kaggle_id,
             "registered_at": datetime.now().isoformat()
-        }
-        save_kaggle_ids()
+        })
         
-        if user_id in contest_participants:
-            contest_participants[user_id]["kaggle_id"] = kaggle_id
-            save_participants()
+        update_participant_kaggle_id(user_id, kaggle_id)
         
         await interaction.response.send_message(
             f"✅ **Kaggle ID Saved!**\n\n"
@@ -657,19 +788,24 @@ async def slash_setkaggle(interaction: discord.Interaction, kaggle_id: str):
             ephemeral=True
         )
 
-@bot.tree.command(name="mykaggle", description="View your saved Kaggle ID")
+@bot.tree.command(name="mykaggle", description="View your saved Kaggle ID and profile stats")
 async def slash_mykaggle(interaction: discord.Interaction):
-    user_id = interaction.user.id
+    kaggle_record = await storage.get_kaggle_id(interaction.user.id)
     
-    if user_id in kaggle_ids:
-        kaggle_id = kaggle_ids[user_id]["kaggle_id"]
-        await interaction.response.send_message(
-            f"**Your Kaggle Profile:**\n"
-            f"ID: **{kaggle_id}**\n"
-            f"Profile: https://www.kaggle.com/{kaggle_id}\n\n"
-            f"💡 Use `/setkaggle` to update",
-            ephemeral=True
-        )
+    if kaggle_record:
+        kaggle_id = kaggle_record["kaggle_id"]
+        # Answer from the cache right away; a missing profile is fetched in the background and edited in
+        stats, age = kaggle_stats_cache.peek(kaggle_id)
+        waiter = kaggle_stats_cache.wait(kaggle_id) if stats is None else None
+        await interaction.response.send_message(embed=build_kaggle_profile_embed(kaggle_id, stats, age), ephemeral=True)
+        if waiter is not None:
+            try:
+                stats = await asyncio.wait_for(waiter, timeout=60)
+            except asyncio.TimeoutError:
+                stats = None
+            await interaction.edit_original_response(
+                embed=build_kaggle_profile_embed(kaggle_id, stats, 0.0, unavailable=stats is None)
+            )
     else:
         await interaction.response.send_message(
             f"❌ **No Kaggle ID Found**\n\n"
@@ -678,6 +814,39 @@ async def slash_mykaggle(interaction: discord.Interaction):
             ephemeral=True
         )
 
+def build_kaggle_profile_embed(kaggle_id, stats, age, unavailable=False):
+    """Embed for /mykaggle from cached profile stats (stats may be None while loading)"""
+    embed = discord.Embed(
+        title="📝 Your Kaggle Profile",
+        description=f"ID: **{kaggle_id}**\nProfile: https://www.kaggle.com/{kaggle_id}",
+        color=0x20beff
+    )
+    if stats:
+        embed.add_field(
+            name="📓 Notebooks",
+            value=f"**{stats['notebooks']}{'+' if stats['notebooks_capped'] else ''}** public • {stats['notebook_votes']} votes",
+            inline=True
+        )
+        embed.add_field(
+            name="🗂️ Datasets",
+            value=f"**{stats['datasets']}** public • {stats['dataset_votes']} votes • {stats['dataset_downloads']} downloads",
+            inline=True
+        )
+    elif unavailable:
+        embed.add_field(name="📊 Stats", value="Couldn't load stats from Kaggle right now.", inline=False)
+    else:
+        embed.add_field(name="📊 Stats", value="⏳ Fetching from Kaggle...", inline=False)
+    footer = "💡 Use /setkaggle to update"
+    if stats and age is not None:
+        footer += f" • Stats updated {format_age(age)}"
+    embed.set_footer(text=footer)
+    return embed
+
+def format_profile_stats(stats):
+    """Compact one-line profile stats for leaderboard entries"""
+    return (f"📓 {stats['notebooks']}{'+' if stats['notebooks_capped'] else ''} notebooks "
+            f"({stats['notebook_votes']} votes) • 🗂️ {stats['datasets']} datasets")
+
 # Admin Commands
 
 @bot.tree.command(name="createcontest", description="[ADMIN] Create a contest poll")
@@ -687,14 +856,9 @@ async def slash_createcontest(interaction: discord.Interaction, duration_hours:
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
-    global active_poll_message_id, poll_expiry_time, pending_registrations, contest_participants
-    
-    contest_participants = {}
-    pending_registrations = {}
-    save_participants()
-    
-    poll_expiry_time = datetime.now() + timedelta(hours=duration_hours)
-    expiry_str = poll_expiry_time.strftime("%Y-%m-%d %H:%M:%S")
+    # Earlier polls keep running alongside this one until they expire
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=duration_hours)
+    expiry_str = expires_at.astimezone().strftime("%Y-%m-%d %H:%M:%S")
     
     embed = discord.Embed(
         title="📊 Contest Poll - Weekly AI Competition",
@@ -704,7 +868,7 @@ async def slash_createcontest(interaction: discord.Interaction, duration_hours:
     )
     embed.add_field(
         name="How to Participate",
-        value="React with 👍 to join!\nYou'll receive a DM for your Kaggle ID.",
+        value="Click **Join** and enter your Kaggle ID!\nClick **Leave** to withdraw.",
         inline=False
     )
     embed.add_field(
@@ -714,12 +878,20 @@ async def slash_createcontest(interaction: discord.Interaction, duration_hours:
     )
     embed.set_footer(text="AI Olympiad Community")
     
-    await interaction.response.send_message(embed=embed)
+    await interaction.response.send_message(embed=embed, view=PollView())
     poll_message = await interaction.original_response()
-    await poll_message.add_reaction("👍")
     
-    active_poll_message_id = poll_message.id
-    asyncio.create_task(expire_poll(poll_message, duration_hours))
+    polls.add(Poll(
+        poll_message.id,
+        channel_id=poll_message.channel.id,
+        guild_id=interaction.guild_id,
+        question=question,
+        expires_at=expires_at
+    ))
+    scheduler.schedule(f'poll-expiry-{poll_message.id}', 'expire_poll', expires_at, {
+        "channel_id": poll_message.channel.id,
+        "message_id": poll_message.id
+    })
 
 @bot.tree.command(name="participants", description="[ADMIN] Show contest participants")
 async def slash_participants(interaction: discord.Interaction):
@@ -727,17 +899,19 @@ async def slash_participants(interaction: discord.Interaction):
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
-    if not contest_participants:
+    poll = polls.latest()
+    if poll is None or not poll.participants:
         await interaction.response.send_message("No participants yet!", ephemeral=True)
         return
     
     embed = discord.Embed(
         title="🏆 Contest Participants",
+        description=poll.question,
         color=0x0099ff,
         timestamp=datetime.now()
     )
     
-    for user_id, data in contest_participants.items():
+    for user_id, data in poll.participants.items():
         kaggle_url = f"https://www.kaggle.com/{data['kaggle_id']}"
         embed.add_field(
             name=data['name'],
@@ -745,7 +919,7 @@ async def slash_participants(interaction: discord.Interaction):
             inline=False
         )
     
-    embed.set_footer(text=f"Total: {len(contest_participants)}")
+    embed.set_footer(text=f"Total: {len(poll.participants)}" + (f" • {len(polls)} polls, showing the latest" if len(polls) > 1 else ""))
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="clearparticipants", description="[ADMIN] Clear all participants")
@@ -754,12 +928,9 @@ async def slash_clearparticipants(interaction: discord.Interaction):
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
-    global contest_participants, active_poll_message_id, poll_expiry_time, pending_registrations
-    contest_participants = {}
-    active_poll_message_id = None
-    poll_expiry_time = None
-    pending_registrations = {}
-    save_participants()
+    for poll in polls:
+        polls.remove(poll.message_id)
+        scheduler.cancel(f'poll-expiry-{poll.message_id}')
     await interaction.response.send_message("✅ Cleared!", ephemeral=True)
 
 @bot.tree.command(name="serverstats", description="[ADMIN] Show server statistics")
@@ -779,6 +950,106 @@ async def slash_serverstats(interaction: discord.Interaction):
     embed.add_field(name="Active Users", value=str(active_users), inline=True)
     embed.add_field(name="Messages Tracked", value=str(total_messages), inline=True)
     
+    db = storage.stats()
+    embed.add_field(
+        name="💾 Storage",
+        value=f"Pending rows: {db['pending']} • Flushes: {db['flushes']}\n"
+              f"Mutations: {db['mutations']} → rows written: {db['rows_written']} "
+              f"({db['writes_saved']} coalesced)\n"
+              f"Flush avg/max: {db['flush_avg_ms']:.1f}/{db['flush_max_ms']:.1f} ms",
+        inline=False
+    )
+    poll_stats = polls.stats()
+    embed.add_field(
+        name="🗳️ Polls",
+        value=f"Active: {poll_stats['active']} of {poll_stats['polls']} • Registered: {poll_stats['participants']} • "
+              f"Pending: {poll_stats['pending']}",
+        inline=False
+    )
+    jobs = scheduler.stats()
+    next_job = f"{jobs['next_in'] / 60:.0f} min" if jobs['next_in'] is not None else "none"
+    embed.add_field(
+        name="⏲️ Scheduler",
+        value=f"Scheduled: {jobs['scheduled']} • Next in: {next_job}\n"
+              f"Ran: {jobs['ran']} • Failed: {jobs['failed']} • Caught up after restart: {jobs['caught_up']}",
+        inline=False
+    )
+    lb = leaderboard_cache.stats()
+    embed.add_field(
+        name="📦 Leaderboard Cache",
+        value=f"Hits: {lb['hits']} • Shared: {lb['shared']} • Downloads: {lb['downloads']} "
+              f"({lb['unchanged']} unchanged) • Parses: {lb['parses']}",
+        inline=False
+    )
+    profiles = kaggle_stats_cache.stats()
+    embed.add_field(
+        name="👤 Kaggle Profiles",
+        value=f"Cached: {profiles['entries']}/{profiles['capacity']} • Queued: {profiles['queued']}\n"
+              f"Hits: {profiles['hits']} • Stale: {profiles['stale']} • Misses: {profiles['misses']} • "
+              f"Refreshed: {profiles['refreshed']} ({profiles['errors']} errors) • Evicted: {profiles['evicted']}",
+        inline=False
+    )
+    history = contest_scores.stats()
+    embed.add_field(
+        name="📈 Score History",
+        value=f"Snapshots: {history['snapshots']} ({history['rows']} rows) • "
+              f"Appended: {history['appended']} • Unchanged/repeat: {history['skipped']}",
+        inline=False
+    )
+    role_stats = role_reconciler.stats()
+    embed.add_field(
+        name="🏆 Winner Roles",
+        value=f"Mode: {WINNER_ROLE_MODE} • Role calls: {role_stats['calls']} ({role_stats['failures']} failed) • "
+              f"Unchanged runs: {role_stats['noops']}",
+        inline=False
+    )
+    dms = dm_fanout.stats()
+    embed.add_field(
+        name="📨 DM Fan-out",
+        value=f"Sent: {dms['sent']} • Failed: {dms['failed']} • Rate limited: {dms['rate_limited']} • "
+              f"Closed DMs skipped: {dms['closed']}",
+        inline=False
+    )
+    catalog = competition_catalog.stats()
+    embed.add_field(
+        name="🗂️ Competition Catalog",
+        value=f"Competitions: {catalog['competitions']} • Refreshed: "
+              f"{format_age(catalog['age']) if catalog['age'] is not None else 'never'} ({catalog['refreshes']} refreshes)\n"
+              f"Lookups from memory: {catalog['hits']} • API searches: {catalog['searches']} ({catalog['errors']} failed)",
+        inline=False
+    )
+    budget = fetch_scheduler.stats()
+    embed.add_field(
+        name="🏁 Competitions",
+        value=f"Tracked: {len(competitions)} • Fetch budget: {budget['tokens']:.0f}/{budget['capacity']:.0f}\n"
+              f"Scheduled fetches: {budget['fetches']} • Deferred (over budget): {budget['deferred']}",
+        inline=False
+    )
+    kaggle_calls = kaggle_client.stats()
+    health = kaggle_client.health()
+    status = {"ready": "🟢 Ready", "connecting": "🟡 Connecting", "failed": "🔴 Unavailable", "cold": "⚪ Not started"}
+    health_line = status[health["state"]]
+    if health["init_seconds"] is not None:
+        health_line += f" (init {health['init_seconds']:.2f}s)"
+    health_line += f" • In flight: {health['in_flight']} ({health['abandoned']} abandoned, still running)"
+    if health["error"]:
+        health_line += f"\n`{health['error'][:200]}`"
+    embed.add_field(
+        name="🌐 Kaggle API",
+        value="\n".join([health_line] + [
+            f"`{name}`: {c['calls']} calls • p50 {c['p50']:.2f}s • p95 {c['p95']:.2f}s • max {c['max']:.2f}s • "
+            f"{c['errors']} errors, {c['timeouts']} timeouts, {c['retries']} retries"
+            for name, c in kaggle_calls.items()
+        ]),
+        inline=False
+    )
+    embed.add_field(
+        name="🚀 Startup",
+        value=f"Imports: {startup_timings['imports']:.2f}s • Data loaded: {startup_timings['loaded']:.2f}s • "
+              f"Ready: {startup_timings['ready']:.2f}s",
+        inline=False
+    )
+    
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="checkwarnings", description="[ADMIN] Check bad word warnings")
@@ -788,19 +1059,23 @@ async def slash_checkwarnings(interaction: discord.Interaction, member: discord.
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
+    threshold = word_filters.for_guild(interaction.guild.id).threshold
+    
     if member:
-        if member.id in bad_word_warnings and bad_word_warnings[member.id]["count"] > 0:
-            data = bad_word_warnings[member.id]
+        record = warning_ledger.get(member.id)
+        score = warning_ledger.score(member.id)
+        if record and (score >= 0.5 or record.recent()):
             embed = discord.Embed(
                 title=f"⚠️ Warnings for {member.name}",
-                description=f"Violations: {data['count']}/{BAD_WORD_THRESHOLD}",
+                description=f"Violations: {score:.1f}/{threshold}\n"
+                            f"Warnings toward timeout: {record.timeouts}/3 • Lifetime: {record.total}",
                 color=0xff9900
             )
             
-            for i, msg_data in enumerate(data["messages"][-5:], 1):
+            for i, violation in enumerate(record.recent(), 1):
                 embed.add_field(
-                    name=f"Violation {i}",
-                    value=f"```{msg_data['content'][:100]}```",
+                    name=f"Violation {i} - #{violation.channel}",
+                    value=f"```{violation.content}```",
                     inline=False
                 )
             
@@ -808,21 +1083,21 @@ async def slash_checkwarnings(interaction: discord.Interaction, member: discord.
         else:
             await interaction.response.send_message(f"{member.mention} has no warnings", ephemeral=True)
     else:
-        users_with_warnings = [(uid, d) for uid, d in bad_word_warnings.items() if d["count"] > 0]
+        users_with_warnings = warning_ledger.top(10)
         
         if users_with_warnings:
             embed = discord.Embed(
                 title="⚠️ All Warnings",
-                description=f"Threshold: {BAD_WORD_THRESHOLD}",
+                description=f"Threshold: {threshold}",
                 color=0xff9900
             )
             
-            for user_id, data in users_with_warnings[:10]:
+            for user_id, score in users_with_warnings:
                 member_obj = interaction.guild.get_member(user_id)
                 if member_obj:
                     embed.add_field(
                         name=member_obj.name,
-                        value=f"{data['count']}/{BAD_WORD_THRESHOLD}",
+                        value=f"{score:.1f}/{threshold}",
                         inline=True
                     )
             
@@ -837,109 +1112,217 @@ async def slash_clearwarnings(interaction: discord.Interaction, member: discord.
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
-    if member.id in bad_word_warnings:
-        bad_word_warnings[member.id]["count"] = 0
-        bad_word_warnings[member.id]["messages"] = []
+    if warning_ledger.get(member.id):
+        warning_ledger.reset_score(member.id)
+        warning_ledger.reset_timeout_strikes(member.id)  # Otherwise the next warning could go straight to a timeout
         await interaction.response.send_message(f"✅ Cleared for {member.mention}", ephemeral=True)
     else:
         await interaction.response.send_message(f"{member.mention} has no warnings", ephemeral=True)
 
-@bot.tree.command(name="setcompetition", description="[ADMIN] Set Kaggle competition ID and notify participants")
-@app_commands.describe(competition_id="Kaggle competition ID (e.g., titanic)")
-async def slash_setcompetition(interaction: discord.Interaction, competition_id: str):
+@bot.tree.command(name="filterword", description="[ADMIN] Add or remove a filtered word for this server")
+@app_commands.describe(action="Add or remove", word="Word or phrase")
+@app_commands.choices(action=[
+    app_commands.Choice(name="add", value="add"),
+    app_commands.Choice(name="remove", value="remove")
+])
+async def slash_filterword(interaction: discord.Interaction, action: app_commands.Choice[str], word: str):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+        return
+    
+    if action.value == "add":
+        word_filter = await word_filters.update(interaction.guild.id, add_words=[word])
+    else:
+        word_filter = await word_filters.update(interaction.guild.id, remove_words=[word])
+    
+    await interaction.response.send_message(
+        f"✅ **{word}** {'added to' if action.value == 'add' else 'removed from'} the filter\n"
+        f"This server now filters **{len(word_filter.words)}** words.",
+        ephemeral=True
+    )
+
+@bot.tree.command(name="filterchannel", description="[ADMIN] Skip or resume bad word detection in a channel")
+@app_commands.describe(channel="Channel to change", skip="True to skip detection (e.g. music channels)")
+async def slash_filterchannel(interaction: discord.Interaction, channel: discord.TextChannel, skip: bool):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+        return
+    
+    if not skip and channel.id in word_filters.default_whitelist:
+        await interaction.response.send_message(
+            f"❌ {channel.mention} is whitelisted in the bot's environment config (BAD_WORD_WHITELIST).",
+            ephemeral=True
+        )
+        return
+    
+    await word_filters.update(interaction.guild.id, whitelist={channel.id: skip})
+    status = "skipped" if skip else "checked again"
+    await interaction.response.send_message(f"✅ Bad words in {channel.mention} are now {status}.", ephemeral=True)
+
+@bot.tree.command(name="filterthreshold", description="[ADMIN] Set the violation score that triggers a warning")
+@app_commands.describe(threshold="Violations before a warning (default 15)")
+async def slash_filterthreshold(interaction: discord.Interaction, threshold: app_commands.Range[int, 1, 1000]):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+        return
+    
+    await word_filters.update(interaction.guild.id, threshold=threshold)
+    await interaction.response.send_message(f"✅ Warning threshold set to **{threshold}**.", ephemeral=True)
+
+@bot.tree.command(name="filterstats", description="[ADMIN] Show bad word, flood and spam filter statistics")
+async def slash_filterstats(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+        return
+    
+    stats = verdict_cache.stats()
+    word_filter = word_filters.for_guild(interaction.guild.id)
+    filter_stats = word_filters.stats()
+    embed = discord.Embed(
+        title="🛡️ Bad Word Filter",
+        description=f"This server: **{len(word_filter.words)}** words, "
+                    f"**{len(word_filter.whitelist)}** skipped channels, threshold **{word_filter.threshold}**\n"
+                    f"Compiled matchers: {filter_stats['matchers']} shared by {filter_stats['guilds']} customized server(s)",
+        color=0x3498db,
+        timestamp=datetime.now()
+    )
+    embed.add_field(name="Entries", value=f"{stats['size']}/{stats['max_size']}", inline=True)
+    embed.add_field(name="Hits", value=str(stats['hits']), inline=True)
+    embed.add_field(name="Misses", value=str(stats['misses']), inline=True)
+    embed.add_field(name="Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+    embed.add_field(name="Evictions", value=str(stats['evictions']), inline=True)
+    embed.add_field(name="Invalidations", value=str(stats['invalidations']), inline=True)
+    
+    queue_stats = moderation_queue.stats()
+    embed.add_field(
+        name="📥 Moderation Queue",
+        value=f"Depth: **{queue_stats['depth']}**/{queue_stats['max_pending']}\n"
+              f"Deleted: **{queue_stats['deleted']}** in {queue_stats['delete_calls']} API calls\n"
+              f"Warnings sent: **{queue_stats['actions_run']}** • Failures: {queue_stats['failures']}\n"
+              f"Latency p50/p95/max: {queue_stats['latency_p50'] * 1000:.0f}/"
+              f"{queue_stats['latency_p95'] * 1000:.0f}/{queue_stats['latency_max'] * 1000:.0f} ms",
+        inline=False
+    )
+    
+    flood_stats = flood_detector.stats()
+    embed.add_field(
+        name="🌊 Flood Detection",
+        value=f"Dropped: **{flood_stats['dropped']}** • Timeouts: **{flood_stats['escalations']}**\n"
+              f"Tracked users: {flood_stats['tracked_users']}",
+        inline=False
+    )
+    
+    spam_stats = spam_fingerprinter.stats()
+    embed.add_field(
+        name="🚨 Near-Duplicate Spam",
+        value=f"Clusters: **{spam_stats['clusters']}** • Messages removed: **{spam_stats['flagged']}**\n"
+              f"Indexed fingerprints: {spam_stats['indexed']}",
+        inline=False
+    )
+    
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="setcompetition", description="[ADMIN] Track a Kaggle competition and notify participants")
+@app_commands.describe(
+    competition_id="Kaggle competition ID (e.g., titanic)",
+    channel="Channel for this competition's live leaderboard and reminders (default: leaderboard channel)",
+    poll_message="Message ID or link of the contest poll to take participants from (default: latest poll for a new competition)"
+)
+@app_commands.autocomplete(competition_id=kaggle_competition_autocomplete)
+async def slash_setcompetition(interaction: discord.Interaction, competition_id: str, channel: discord.TextChannel = None,
+                               poll_message: str = None):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
-    global active_competition, competition_end_time
+    poll = None
+    if poll_message:
+        message_id = poll_message.strip().rstrip('/').rsplit('/', 1)[-1]
+        poll = polls.get(int(message_id)) if message_id.isdigit() else None
+        if poll is None:
+            await interaction.response.send_message(f"❌ No contest poll found for `{poll_message}`.", ephemeral=True)
+            return
     
     await interaction.response.defer()  # This might take time
     
+    competition_id = slug(competition_id)  # Accept a pasted competition URL too
     try:
-        # Set competition (simplified - just verify it's accessible)
-        active_competition = competition_id
-        
-        # Try to get competition info for deadline (optional)
-        deadline_str = "Check Kaggle for deadline"
-        try:
-            # This is optional - if it fails, we still set the competition
-            comp_list = kaggle_api.competitions_list(search=competition_id)
-            if comp_list:
-                for comp in comp_list:
-                    if comp.ref == competition_id:
-                        deadline = comp.deadline
-                        if deadline:
-                            deadline_str = deadline.strftime("%B %d, %Y at %I:%M %p UTC")
-                            competition_end_time = deadline
-                        break
-        except:
-            pass  # If we can't get deadline, that's okay
-        
-        # Get competition deadline if available (kept for compatibility)
-        deadline = deadline_str
-        # Get competition deadline if available (kept for compatibility)
-        deadline = deadline_str
-        if deadline and deadline != "Check Kaggle for deadline":
-            # Already formatted above
-            pass
+        # Tracked alongside any other competitions. A new one takes the latest poll's registrations;
+        # an existing one keeps its poll and participants unless a poll is given explicitly
+        existing = competitions.get(competition_id)
+        if poll is None and existing is None:
+            poll = polls.latest()
+        if poll is not None:
+            poll_message_id = poll.message_id
+            participants = {user_id: dict(data) for user_id, data in poll.participants.items()}
         else:
-            deadline_str = "Check Kaggle for deadline"
-            competition_end_time = None
+            poll_message_id = existing.poll_message if existing else None
+            participants = existing.participants if existing else {}
+        competition = Competition(
+            competition_id,
+            channel_id=channel.id if channel else (existing.channel_id if existing else None),
+            created_at=existing.created_at if existing else None,
+            poll_message=poll_message_id,
+            participants=participants,
+            live=existing.live if existing else None
+        )
+        # Deadline from the competition catalog (memory, or one shared API search for an unseen ref).
+        # If Kaggle is unreachable now, the catalog refresh fills it in later (see sync_competition_deadlines)
+        metadata = await competition_catalog.lookup(competition_id)
+        competition_end_time = competition_catalog.deadline(competition_id)
+        deadline_str = competition_end_time.strftime("%B %d, %Y at %I:%M %p UTC") if competition_end_time else "Check Kaggle for deadline"
         
-        # Send DMs to all registered participants
-        participants_notified = 0
-        participants_failed = 0
+        competition.end_time = competition_end_time
+        competitions.add(competition)
+        schedule_competition_reminders(competition)
+        
+        # DM embed is built once and copied per recipient (only the Kaggle ID field differs)
+        leaderboard_channel_id = competition.channel_id or LEADERBOARD_CHANNEL_ID
+        dm_embed = discord.Embed(
+            title="🏆 New Competition Announced!",
+            description=f"A new Kaggle competition has been set for our contest!",
+            color=0x00ff00,
+            timestamp=datetime.now()
+        )
+        dm_embed.add_field(
+            name="📌 Competition",
+            value=f"**{competition_id}**",
+            inline=False
+        )
+        dm_embed.add_field(
+            name="🔗 Competition Link",
+            value=f"[Click here to join!](https://www.kaggle.com/c/{competition_id})",
+            inline=False
+        )
+        dm_embed.add_field(
+            name="⏰ Deadline",
+            value=deadline_str,
+            inline=False
+        )
+        dm_embed.add_field(
+            name="📝 Your Kaggle ID",
+            value="",
+            inline=False
+        )
+        dm_embed.add_field(
+            name="🎯 Next Steps",
+            value="1. Join the competition on Kaggle\n"
+                  "2. Make your submissions\n"
+                  + (f"3. Check <#{leaderboard_channel_id}> after contest ends for rankings!" if leaderboard_channel_id
+                     else "3. Check the #leaderboard channel for rankings!"),
+            inline=False
+        )
+        dm_embed.set_footer(
+            text="AI Olympiad Community",
+            icon_url="https://www.kaggle.com/static/images/site-logo.png"
+        )
+        kaggle_id_field = 3
         
-        if contest_participants:
-            for user_id, user_data in contest_participants.items():
-                try:
-                    member = interaction.guild.get_member(user_id)
-                    if member:
-                        # Create beautiful DM with competition info
-                        dm_embed = discord.Embed(
-                            title="🏆 New Competition Announced!",
-                            description=f"A new Kaggle competition has been set for our contest!",
-                            color=0x00ff00,
-                            timestamp=datetime.now()
-                        )
-                        dm_embed.add_field(
-                            name="📌 Competition",
-                            value=f"**{competition_id}**",
-                            inline=False
-                        )
-                        dm_embed.add_field(
-                            name="🔗 Competition Link",
-                            value=f"[Click here to join!](https://www.kaggle.com/c/{competition_id})",
-                            inline=False
-                        )
-                        dm_embed.add_field(
-                            name="⏰ Deadline",
-                            value=deadline_str,
-                            inline=False
-                        )
-                        dm_embed.add_field(
-                            name="📝 Your Kaggle ID",
-                            value=f"**{user_data.get('kaggle_id', 'Not set')}**",
-                            inline=False
-                        )
-                        dm_embed.add_field(
-                            name="🎯 Next Steps",
-                            value="1. Join the competition on Kaggle\n"
-                                  "2. Make your submissions\n"
-                                  "3. Check <#" + str(LEADERBOARD_CHANNEL_ID) + "> after contest ends for rankings!" if LEADERBOARD_CHANNEL_ID else "3. Check the #leaderboard channel for rankings!",
-                            inline=False
-                        )
-                        dm_embed.set_footer(
-                            text="AI Olympiad Community",
-                            icon_url="https://www.kaggle.com/static/images/site-logo.png"
-                        )
-                        
-                        await member.send(embed=dm_embed)
-                        participants_notified += 1
-                        print(f"Notified {member.name} about competition")
-                except Exception as e:
-                    participants_failed += 1
-                    print(f"Failed to notify user {user_id}: {e}")
+        def build_dm(user_id):
+            embed = dm_embed.copy()
+            kaggle_id = competition.participants.get(user_id, {}).get('kaggle_id', 'Not set')
+            embed.set_field_at(kaggle_id_field, name="📝 Your Kaggle ID", value=f"**{kaggle_id}**", inline=False)
+            return {"embed": embed}
         
         # Send confirmation to admin
         embed = discord.Embed(
@@ -950,12 +1333,20 @@ async def slash_setcompetition(interaction: discord.Interaction, competition_id:
         )
         embed.add_field(name="🔗 URL", value=f"https://www.kaggle.com/c/{competition_id}", inline=False)
         embed.add_field(name="⏰ Deadline", value=deadline_str, inline=False)
+        if metadata:
+            details = [f"🏆 Reward: **{metadata['reward']}**" if metadata["reward"] else None,
+                       f"👥 Max team size: **{metadata['max_team_size']}**" if metadata["max_team_size"] else None,
+                       f"📤 Daily submissions: **{metadata['max_daily_submissions']}**" if metadata["max_daily_submissions"] else None]
+            if any(details):
+                embed.add_field(name="📋 Details", value="\n".join(d for d in details if d), inline=False)
+        if competition.channel_id:
+            embed.add_field(name="📺 Channel", value=f"<#{competition.channel_id}>", inline=False)
         
-        if contest_participants:
+        notify_field = len(embed.fields)
+        if competition.participants:
             embed.add_field(
-                name="📨 Notifications Sent",
-                value=f"✅ Notified: **{participants_notified}** participants\n"
-                      f"❌ Failed: **{participants_failed}** participants",
+                name="📨 Notifying Participants",
+                value=f"⏳ 0/{len(competition.participants)}",
                 inline=False
             )
         else:
@@ -965,10 +1356,33 @@ async def slash_setcompetition(interaction: discord.Interaction, competition_id:
                 inline=False
             )
         
-        embed.add_field(name="📊 Next Step", value="Use `/leaderboard` to fetch live scores", inline=False)
+        embed.add_field(
+            name="📊 Next Step",
+            value=f"Use `/leaderboard` to fetch live scores ({len(competitions)} competition(s) tracked)",
+            inline=False
+        )
         embed.set_footer(text="Competition tracking active")
         
-        await interaction.followup.send(embed=embed)
+        message = await interaction.followup.send(embed=embed, wait=True)
+        
+        # Fan the DMs out concurrently; progress streams into the confirmation message
+        if competition.participants:
+            async def show_progress(done, total, counts):
+                finished = done == total
+                embed.set_field_at(
+                    notify_field,
+                    name="📨 Notifications Sent" if finished else "📨 Notifying Participants",
+                    value=f"{'✅' if finished else '⏳'} {done}/{total} • Notified: **{counts['sent']}**\n"
+                          f"❌ Failed: **{counts['failed']}** • 🔕 DMs closed: **{counts['closed']}** • "
+                          f"👋 Left server: **{counts['skipped']}**",
+                    inline=False
+                )
+                await message.edit(embed=embed)
+            
+            recipients = [(user_id, interaction.guild.get_member(user_id)) for user_id in competition.participants]
+            result = await dm_fanout.send(recipients, build_dm, progress=show_progress)
+            print(f"Notified {result.sent}/{result.total} participants about {competition_id} in {result.elapsed:.1f}s "
+                  f"({result.closed} closed, {result.skipped} left, {result.failed} failed, {result.retries} retries)")
         
     except Exception as e:
         await interaction.followup.send(
@@ -983,121 +1397,42 @@ async def slash_setcompetition(interaction: discord.Interaction, competition_id:
         print(f"Error setting competition: {e}")
 
 @bot.tree.command(name="leaderboard", description="[ADMIN] Show live Kaggle leaderboard")
-async def slash_leaderboard(interaction: discord.Interaction):
+@app_commands.describe(
+    competition="Tracked competition (optional when only one is tracked)",
+    refresh="Re-download from Kaggle even if the cached copy is still fresh"
+)
+@app_commands.autocomplete(competition=competition_autocomplete)
+async def slash_leaderboard(interaction: discord.Interaction, competition: str = None, refresh: bool = False):
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message("❌ Admin only!", ephemeral=True)
         return
     
-    if not active_competition:
-        await interaction.response.send_message(
-            "❌ No active competition set!\nUse `/setcompetition <id>` first.",
-            ephemeral=True
-        )
+    tracked = competitions.resolve(competition)
+    if not tracked:
+        if not len(competitions):
+            message = "❌ No active competition set!\nUse `/setcompetition <id>` first."
+        elif competition:
+            message = f"❌ `{competition}` is not a tracked competition. Tracked: {', '.join(f'`{c.ref}`' for c in competitions)}"
+        else:
+            message = f"❌ Several competitions are tracked, pick one: {', '.join(f'`{c.ref}`' for c in competitions)}"
+        await interaction.response.send_message(message, ephemeral=True)
         return
     
     await interaction.response.defer()  # This can take time
     
     try:
-        # Download leaderboard to a temporary directory
-        import tempfile
-        import csv
-        import zipfile
-        
-        # Create temp directory
-        tmp_dir = tempfile.mkdtemp()
-        
-        # Download leaderboard (it downloads as a zip file)
-        kaggle_api.competition_leaderboard_download(active_competition, tmp_dir)
-        
-        # Find the CSV file in the zip
-        import os
-        zip_path = os.path.join(tmp_dir, f"{active_competition}.zip")
-        
-        participant_scores = []
-        
-        # Extract and read the CSV from the zip
-        leaderboard = []
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # List all CSV files in the zip
-            csv_files = [f for f in zip_ref.namelist() if f.endswith('.csv')]
-            
-            print(f"DEBUG: Found CSV files in zip: {csv_files}")
-            
-            if csv_files:
-                # Look for private leaderboard first, then public
-                private_file = next((f for f in csv_files if 'private' in f.lower()), None)
-                public_file = next((f for f in csv_files if 'public' in f.lower()), None)
-                
-                # Use the first available file (prefer private if exists)
-                csv_to_read = private_file or public_file or csv_files[0]
-                
-                print(f"DEBUG: Reading leaderboard from: {csv_to_read}")
-                
-                with zip_ref.open(csv_to_read) as csv_file:
-                    import io
-                    csv_content = io.TextIOWrapper(csv_file, encoding='utf-8')
-                    csv_reader = csv.DictReader(csv_content)
-                    leaderboard = list(csv_reader)
-        
-        # Clean up temp files
-        import shutil
-        shutil.rmtree(tmp_dir)
-        
-        # Debug: Print CSV columns and first entries
-        if leaderboard:
-            print(f"DEBUG: CSV Columns: {list(leaderboard[0].keys())}")
-            print(f"DEBUG: First 3 entries:")
-            for i, entry in enumerate(leaderboard[:3]):
-                print(f"  {i+1}. {entry}")
-        
-        print(f"DEBUG: Looking for participants: {[(uid, data.get('kaggle_id')) for uid, data in contest_participants.items()]}")
-        
-        # Filter participants who are registered
-        for user_id, user_data in contest_participants.items():
-            kaggle_id = user_data.get("kaggle_id", "").lower()
-            
-            # Search for this user in leaderboard by checking ALL columns
-            for entry in leaderboard:
-                # Check all fields for a match
-                found = False
-                for key, value in entry.items():
-                    if kaggle_id in str(value).lower():
-                        # Get all rank-related columns
-                        public_rank = 'N/A'
-                        private_rank = 'N/A'
-                        
-                        for rank_key in entry.keys():
-                            key_lower = rank_key.lower()
-                            if 'public' in key_lower and 'rank' in key_lower:
-                                public_rank = entry[rank_key]
-                            elif 'private' in key_lower and 'rank' in key_lower:
-                                private_rank = entry[rank_key]
-                            elif key_lower == 'rank' or 'rank' in key_lower:
-                                # Generic rank column (usually public)
-                                if public_rank == 'N/A':
-                                    public_rank = entry[rank_key]
-                        
-                        # Get Kaggle username from CSV
-                        kaggle_username = entry.get('TeamMemberUserNames', kaggle_id)
-                        
-                        participant_scores.append({
-                            "name": user_data.get("name", "Unknown"),
-                            "kaggle_id": entry.get('TeamName', kaggle_id),
-                            "kaggle_username": kaggle_username,
-                            "score": float(entry.get('Score', 0)),
-                            "public_rank": public_rank,
-                            "private_rank": private_rank,
-                            "user_id": user_id  # Store user_id for role assignment
-                        })
-                        print(f"DEBUG: Found match! '{kaggle_id}' found in {key}='{value}' (Public: {public_rank}, Private: {private_rank})")
-                        found = True
-                        break
-                if found:
-                    break
+        # Cached per competition; only downloads when stale (or on refresh) and parses off the loop
+        requested_at = time.time()
+        result = await leaderboard_cache.get(tracked.ref, tracked.participants, refresh=refresh)
+        participant_scores = list(result.scores)
+        interval = tracked.poll_interval(LEADERBOARD_POLL_DEFAULT)
+        if result.fetched_at >= requested_at:
+            fetch_scheduler.mark_fetched(tracked.ref, interval)  # Counts against the shared download budget
+        await contest_scores.record(result)
         
         if not participant_scores:
             # Show helpful debug info
-            registered_ids = [data.get("kaggle_id") for data in contest_participants.values()]
+            registered_ids = [data.get("kaggle_id") for data in tracked.participants.values()]
             await interaction.followup.send(
                 f"📊 No registered participants found on the leaderboard yet!\n\n"
                 f"**Registered Kaggle IDs:** {', '.join(registered_ids)}\n"
@@ -1107,132 +1442,419 @@ async def slash_leaderboard(interaction: discord.Interaction):
             return
         
         # Sort by public rank (lower is better)
-        participant_scores.sort(key=lambda x: int(x["public_rank"]) if str(x["public_rank"]).isdigit() else 999999)
+        participant_scores = sort_leaderboard_scores(participant_scores)
+        embed = build_leaderboard_embed(tracked.ref, participant_scores, result.fetched_at)
         
-        embed = discord.Embed(
-            title=f"🏆 Contest Leaderboard",
-            description=f"**Competition:** {active_competition}",
-            color=0xffd700,
-            timestamp=datetime.now()
-        )
+        # Winner role(s) follow the current top 3; previous holders lose them (no calls if nothing changed)
+        await award_winner_roles(interaction.guild, tracked.ref, participant_scores)
+        
+        # Refresh the pinned live standings in the competition's channel (edited in place, not reposted)
+        await update_live_leaderboard(tracked, result, interval)
         
-        # Add competition info at the top
+        await interaction.followup.send(embed=embed)
+        
+    except KaggleUnavailable as e:
+        await interaction.followup.send(
+            f"❌ Kaggle API is unavailable: {e}\nCheck KAGGLE_USERNAME/KAGGLE_KEY; `/serverstats` shows its status.",
+            ephemeral=True
+        )
+    except Exception as e:
+        await interaction.followup.send(
+            f"❌ Error fetching leaderboard: {str(e)}\n"
+            f"Make sure the competition ID is correct and participants have submitted.",
+            ephemeral=True
+        )
+        print(f"Leaderboard error: {e}")
+
+@bot.tree.command(name="competitions", description="[ADMIN] List tracked Kaggle competitions")
+async def slash_competitions(interaction: discord.Interaction):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+        return
+    
+    if not len(competitions):
+        await interaction.response.send_message("No competitions tracked. Use `/setcompetition <id>` to add one.", ephemeral=True)
+        return
+    
+    embed = discord.Embed(title="🏁 Tracked Competitions", color=0x20beff)
+    for competition in sorted(competitions, key=lambda c: c.end_time or datetime.max.replace(tzinfo=timezone.utc)):
+        deadline = f"<t:{int(competition.end_time.timestamp())}:R>" if competition.end_time else "No deadline"
+        channel_id = competition.channel_id or LEADERBOARD_CHANNEL_ID
+        age = leaderboard_cache.age(competition.ref)
         embed.add_field(
-            name="📌 Competition Info",
-            value=f"🔗 [View on Kaggle](https://www.kaggle.com/c/{active_competition})\n"
-                  f"👥 **{len(participant_scores)}** registered participants",
+            name=competition.ref,
+            value=f"⏰ {deadline} • 👥 {len(competition.participants)} participants\n"
+                  f"📺 {f'<#{channel_id}>' if channel_id else 'No channel'} • "
+                  f"🔄 every {max(1, competition.poll_interval(LEADERBOARD_POLL_DEFAULT) // 60)} min • "
+                  f"last fetch {format_age(age) if age is not None else 'never'}",
             inline=False
         )
-        embed.add_field(name="━━━━━━━━━━━━━━━━━━━━", value="", inline=False)  # Separator
-        
-        # Show top 10 in detail, rest as summary
-        top_count = min(10, len(participant_scores))
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="removecompetition", description="[ADMIN] Stop tracking a Kaggle competition")
+@app_commands.describe(competition="Tracked competition to remove")
+@app_commands.autocomplete(competition=competition_autocomplete)
+async def slash_removecompetition(interaction: discord.Interaction, competition: str):
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message("❌ Admin only!", ephemeral=True)
+        return
+    
+    tracked = competitions.resolve(competition)
+    if not tracked:
+        await interaction.response.send_message(f"❌ `{competition}` is not a tracked competition.", ephemeral=True)
+        return
+    
+    schedule_competition_reminders(tracked, cancel=True)
+    competitions.remove(tracked.ref)
+    await interaction.response.send_message(f"✅ Stopped tracking `{tracked.ref}` ({len(competitions)} left).")
+
+@bot.tree.command(name="progression", description="Show a participant's score and rank history in a competition")
+@app_commands.describe(
+    competition="Tracked competition (optional when only one is tracked)",
+    member="Participant to show (default: you)",
+    days="How far back to look"
+)
+@app_commands.autocomplete(competition=competition_autocomplete)
+async def slash_progression(interaction: discord.Interaction, competition: str = None, member: discord.Member = None,
+                            days: app_commands.Range[int, 1, 365] = 30):
+    tracked = competitions.resolve(competition)
+    if not tracked:
+        await interaction.response.send_message("❌ Pick a tracked competition (see `/competitions`).", ephemeral=True)
+        return
+    member = member or interaction.user
+    
+    await interaction.response.defer()
+    points = await contest_scores.progression(tracked.ref, member.id, start=time.time() - days * 86400)
+    if not points:
+        await interaction.followup.send(
+            f"📈 No leaderboard history for **{member.display_name}** in `{tracked.ref}` over the last {days} day(s).",
+            ephemeral=True
+        )
+        return
+    
+    first, last = points[0], points[-1]
+    ranked = [point[2] for point in points if point[2]]
+    embed = discord.Embed(
+        title=f"📈 {member.display_name} in {tracked.ref}",
+        description=f"{len(points)} snapshot(s) over the last {days} day(s)",
+        color=0x20beff
+    )
+    embed.add_field(name="💯 Score", value=f"{first[1]:.5f} → **{last[1]:.5f}**", inline=True)
+    embed.add_field(
+        name="🎯 Rank",
+        value=f"#{first[2] or '?'} → **#{last[2] or '?'}**" + (f"\nBest: #{min(ranked)}" if ranked else ""),
+        inline=True
+    )
+    # At most 15 evenly spaced points, always including the latest
+    step = max(1, -(-len(points) // 15))
+    sampled = points[::step]
+    if sampled[-1] is not last:
+        sampled.append(last)
+    embed.add_field(
+        name="🕒 History",
+        value="\n".join(
+            f"<t:{int(timestamp)}:d> <t:{int(timestamp)}:t> — #{public or '?'} ({score:.5f})"
+            for timestamp, score, public, _ in sampled
+        ),
+        inline=False
+    )
+    await interaction.followup.send(embed=embed)
+
+@bot.tree.command(name="movers", description="Show the biggest leaderboard climbers and fallers")
+@app_commands.describe(
+    competition="Tracked competition (optional when only one is tracked)",
+    hours="Compare against the standings this many hours ago"
+)
+@app_commands.autocomplete(competition=competition_autocomplete)
+async def slash_movers(interaction: discord.Interaction, competition: str = None,
+                       hours: app_commands.Range[int, 1, 720] = 24):
+    tracked = competitions.resolve(competition)
+    if not tracked:
+        await interaction.response.send_message("❌ Pick a tracked competition (see `/competitions`).", ephemeral=True)
+        return
+    
+    await interaction.response.defer()
+    moves = await contest_scores.movers(tracked.ref, time.time() - hours * 3600)
+    if not moves:
+        await interaction.followup.send(f"📊 No rank changes in `{tracked.ref}` over the last {hours} hour(s).", ephemeral=True)
+        return
+    
+    def describe(move):
+        user_id, change, old_rank, new_rank = move
+        name = tracked.participants.get(user_id, {}).get("name") or f"<@{user_id}>"
+        return f"{name}: #{old_rank} → **#{new_rank}** ({'▲' if change > 0 else '▼'}{abs(change)})"
+    
+    climbers = [move for move in moves if move[1] > 0][:5]
+    fallers = [move for move in reversed(moves) if move[1] < 0][:5]
+    embed = discord.Embed(title=f"🚀 Movers in {tracked.ref}", description=f"Last {hours} hour(s)", color=0x20beff)
+    if climbers:
+        embed.add_field(name="📈 Climbers", value="\n".join(describe(move) for move in climbers), inline=False)
+    if fallers:
+        embed.add_field(name="📉 Fallers", value="\n".join(describe(move) for move in fallers), inline=False)
+    await interaction.followup.send(embed=embed)
+
+# ===== WINNER ROLES =====
+
+def winner_role_plan(competition_ref, participant_scores):
+    """{role name: (color, wanted user ids)} for the configured WINNER_ROLE_MODE"""
+    # Fuzzy matches are unconfirmed, so they never win a role
+    winners = [player['user_id'] for player in participant_scores if player.get('matched') != 'fuzzy'][:WINNER_COUNT]
+    if WINNER_ROLE_MODE == 'rank':
+        rank_roles = [("🥇 1st Place", discord.Color.gold()), ("🥈 2nd Place", discord.Color.light_grey()),
+                      ("🥉 3rd Place", discord.Color.dark_orange())]
+        return {
+            name: (color, {winners[i]} if i < len(winners) else set())
+            for i, (name, color) in enumerate(rank_roles)
+        }
+    if WINNER_ROLE_MODE == 'competition':
+        return {f"🏆 {competition_ref} Winner"[:100]: (discord.Color.gold(), set(winners))}
+    return {"🏆 Contest Winner": (discord.Color.gold(), set(winners))}
+
+async def award_winner_roles(guild, competition_ref, participant_scores):
+    """Reconcile the winner role(s) with the current standings, creating missing roles"""
+    async def reconcile(name, color, wanted):
+        role = discord.utils.get(guild.roles, name=name)
+        if role is None:
+            if not wanted:
+                return
+            try:
+                role = await guild.create_role(name=name, color=color, reason="Auto-created for contest winners")
+                print(f"Created '{name}' role")
+            except Exception as e:
+                print(f"Error creating winner role: {e}")
+                return
+        changes = await role_reconciler.reconcile(guild, role, wanted, reason=f"Top {WINNER_COUNT} in {competition_ref}")
+        if changes.added or changes.removed or changes.failed:
+            print(f"Role '{name}': +{len(changes.added)} -{len(changes.removed)} ({len(changes.failed)} failed)")
+    
+    plan = winner_role_plan(competition_ref, participant_scores)
+    await asyncio.gather(*(reconcile(name, color, wanted) for name, (color, wanted) in plan.items()))
+
+# ===== LIVE LEADERBOARD =====
+
+def sort_leaderboard_scores(participant_scores):
+    """Order matched participants by public rank (lower is better, unranked last)"""
+    return sorted(participant_scores, key=lambda x: int(x["public_rank"]) if str(x["public_rank"]).isdigit() else 999999)
+
+def leaderboard_snapshot(participant_scores):
+    """What the live message shows, in a JSON-friendly form for diffing: {user_id: [rank, score]} (exact matches only)"""
+    return {
+        str(player["user_id"]): [player["public_rank"], player["score"]]
+        for player in participant_scores if player.get("matched") != "fuzzy"
+    }
+
+def format_delta(player, previous):
+    """Rank/score movement since the previous snapshot, e.g. ' ▲3 (+0.00120)' or ' 🆕'"""
+    if previous is None or player.get("matched") == "fuzzy":  # Fuzzy matches aren't in snapshots
+        return ""
+    before = previous.get(str(player["user_id"]))
+    if before is None:
+        return " 🆕"
+    delta = ""
+    old_rank, old_score = before
+    if str(old_rank).isdigit() and str(player["public_rank"]).isdigit():
+        moved = int(old_rank) - int(player["public_rank"])
+        if moved > 0:
+            delta += f" ▲{moved}"
+        elif moved < 0:
+            delta += f" ▼{-moved}"
+    if abs(player["score"] - old_score) >= 1e-9:
+        delta += f" ({player['score'] - old_score:+.5f})"
+    return delta
+
+def build_leaderboard_embed(competition, participant_scores, fetched_at, previous=None, live_interval=None):
+    """Leaderboard embed for sorted participant scores, with deltas when a previous snapshot is given"""
+    embed = discord.Embed(
+        title=f"🏆 Contest Leaderboard" + (" (Live)" if live_interval else ""),
+        description=f"**Competition:** {competition}",
+        color=0xffd700,
+        timestamp=datetime.fromtimestamp(fetched_at, timezone.utc) if live_interval else datetime.now()
+    )
+    
+    # Add competition info at the top
+    embed.add_field(
+        name="📌 Competition Info",
+        value=f"🔗 [View on Kaggle](https://www.kaggle.com/c/{competition})\n"
+              f"👥 **{len(participant_scores)}** registered participants",
+        inline=False
+    )
+    embed.add_field(name="━━━━━━━━━━━━━━━━━━━━", value="", inline=False)  # Separator
+    
+    # Show top 10 in detail, rest as summary
+    top_count = min(10, len(participant_scores))
+    
+    for i, player in enumerate(participant_scores[:top_count], 1):
+        # Fancy medals and emojis
+        if i == 1:
+            medal = "🥇"
+            rank_emoji = "👑"
+        elif i == 2:
+            medal = "🥈"
+            rank_emoji = "⭐"
+        elif i == 3:
+            medal = "🥉"
+            rank_emoji = "✨"
+        else:
+            medal = f"**{i}.**"
+            rank_emoji = "📊"
         
-        for i, player in enumerate(participant_scores[:top_count], 1):
-            # Fancy medals and emojis
-            if i == 1:
-                medal = "🥇"
-                rank_emoji = "👑"
-            elif i == 2:
-                medal = "🥈"
-                rank_emoji = "⭐"
-            elif i == 3:
-                medal = "🥉"
-                rank_emoji = "✨"
+        # Build rank display with emojis
+        rank_display = ""
+        if player['public_rank'] != 'N/A':
+            rank_display += f"🎯 Rank: **#{player['public_rank']}**"
+        if player['private_rank'] != 'N/A':
+            if rank_display:
+                rank_display += f"\n🔒 Private: **#{player['private_rank']}**"
             else:
-                medal = f"**{i}.**"
-                rank_emoji = "📊"
-            
-            # Build rank display with emojis
-            rank_display = ""
-            if player['public_rank'] != 'N/A':
-                rank_display += f"🎯 Rank: **#{player['public_rank']}**"
-            if player['private_rank'] != 'N/A':
-                if rank_display:
-                    rank_display += f"\n🔒 Private: **#{player['private_rank']}**"
-                else:
-                    rank_display += f"🔒 Private: **#{player['private_rank']}**"
-            if not rank_display:
-                rank_display = "🎯 Rank: **N/A**"
-            
-            # Kaggle profile link
-            kaggle_username = player.get('kaggle_username', '')
-            profile_link = f"\n👤 [{player['kaggle_id']}](https://www.kaggle.com/{kaggle_username})" if kaggle_username else f"\n👤 {player['kaggle_id']}"
-            
-            embed.add_field(
-                name=f"{medal} {rank_emoji} {player['name']}",
-                value=f"💯 Score: **{player['score']:.5f}**\n{rank_display}{profile_link}",
-                inline=False
-            )
+                rank_display += f"🔒 Private: **#{player['private_rank']}**"
+        if not rank_display:
+            rank_display = "🎯 Rank: **N/A**"
+        rank_display += format_delta(player, previous)
         
-        # If more than 10 participants, show remaining as compact list
-        if len(participant_scores) > 10:
-            embed.add_field(name="━━━━━━━━━━━━━━━━━━━━", value="", inline=False)
-            
-            remaining_text = "**📋 Other Participants:**\n"
-            for i, player in enumerate(participant_scores[10:20], 11):  # Show next 10
-                rank = player['public_rank'] if player['public_rank'] != 'N/A' else '?'
-                remaining_text += f"`{i}.` {player['name']} - Rank #{rank} ({player['score']:.3f})\n"
-            
-            if len(participant_scores) > 20:
-                remaining_text += f"\n*...and {len(participant_scores) - 20} more participants*"
-            
-            embed.add_field(name="", value=remaining_text, inline=False)
+        # Kaggle profile link
+        kaggle_username = player.get('kaggle_username', '')
+        profile_link = f"\n👤 [{player['kaggle_id']}](https://www.kaggle.com/{kaggle_username})" if kaggle_username else f"\n👤 {player['kaggle_id']}"
+        if player.get('matched') == 'fuzzy':
+            # Registered ID wasn't found exactly; this row is only the closest name
+            profile_link = f"\n👤 possible match ([{kaggle_username}](https://www.kaggle.com/{kaggle_username}))"
+        profile_stats, _ = kaggle_stats_cache.peek(kaggle_username)  # Cached only; misses are queued for the next embed
+        if profile_stats:
+            profile_link += f"\n{format_profile_stats(profile_stats)}"
         
-        # Add footer with timestamp
-        embed.set_footer(
-            text=f"🏆 Total Participants: {len(participant_scores)} • Updated",
-            icon_url="https://www.kaggle.com/static/images/site-logo.png"
+        embed.add_field(
+            name=f"{medal} {rank_emoji} {player['name']}",
+            value=f"💯 Score: **{player['score']:.5f}**\n{rank_display}{profile_link}",
+            inline=False
         )
+    
+    # If more than 10 participants, show remaining as compact list
+    if len(participant_scores) > 10:
+        embed.add_field(name="━━━━━━━━━━━━━━━━━━━━", value="", inline=False)
         
-        # Set thumbnail (Kaggle logo or trophy)
-        embed.set_thumbnail(url="https://www.kaggle.com/static/images/site-logo.png")
+        remaining_text = "**📋 Other Participants:**\n"
+        for i, player in enumerate(participant_scores[10:20], 11):  # Show next 10
+            rank = player['public_rank'] if player['public_rank'] != 'N/A' else '?'
+            remaining_text += f"`{i}.` {player['name']} - Rank #{rank} ({player['score']:.3f}){format_delta(player, previous)}\n"
         
-        # Assign 🏆 Contest Winner role to top 3
-        if participant_scores:
-            winner_role = discord.utils.get(interaction.guild.roles, name="🏆 Contest Winner")
-            
-            # Create role if it doesn't exist
-            if not winner_role:
-                try:
-                    winner_role = await interaction.guild.create_role(
-                        name="🏆 Contest Winner",
-                        color=discord.Color.gold(),
-                        reason="Auto-created for contest winners"
-                    )
-                    print(f"Created '🏆 Contest Winner' role")
-                except Exception as e:
-                    print(f"Error creating winner role: {e}")
-            
-            # Assign to top 3 participants
-            if winner_role:
-                for i, player in enumerate(participant_scores[:3]):
-                    try:
-                        member = interaction.guild.get_member(player['user_id'])
-                        if member and winner_role not in member.roles:
-                            await member.add_roles(winner_role, reason=f"Top {i+1} in contest")
-                            print(f"Assigned winner role to {player['name']}")
-                    except Exception as e:
-                        print(f"Error assigning role to {player['name']}: {e}")
-        
-        # Send to leaderboard channel if set
-        if LEADERBOARD_CHANNEL_ID:
-            leaderboard_channel = bot.get_channel(LEADERBOARD_CHANNEL_ID)
-            if leaderboard_channel:
-                await leaderboard_channel.send(embed=embed)
+        if len(participant_scores) > 20:
+            remaining_text += f"\n*...and {len(participant_scores) - 20} more participants*"
         
-        await interaction.followup.send(embed=embed)
-        
-    except Exception as e:
-        await interaction.followup.send(
-            f"❌ Error fetching leaderboard: {str(e)}\n"
-            f"Make sure the competition ID is correct and participants have submitted.",
-            ephemeral=True
-        )
-        print(f"Leaderboard error: {e}")
+        embed.add_field(name="", value=remaining_text, inline=False)
+    
+    # Add footer with timestamp
+    if live_interval:
+        footer = f"🏆 Total Participants: {len(participant_scores)} • Live, checked every {max(1, live_interval // 60)} min"
+    else:
+        footer = f"🏆 Total Participants: {len(participant_scores)} • Leaderboard fetched {format_age(time.time() - fetched_at)}"
+    embed.set_footer(text=footer, icon_url="https://www.kaggle.com/static/images/site-logo.png")
+    
+    # Set thumbnail (Kaggle logo or trophy)
+    embed.set_thumbnail(url="https://www.kaggle.com/static/images/site-logo.png")
+    return embed
+
+async def update_live_leaderboard(competition, result, interval=None):
+    """Edit a competition's pinned live standings message if the standings changed (no Discord calls otherwise)"""
+    channel_id = competition.channel_id or LEADERBOARD_CHANNEL_ID
+    channel = bot.get_channel(channel_id) if channel_id else None
+    if not channel or not result.scores:
+        return
+    participant_scores = sort_leaderboard_scores(result.scores)
+    snapshot = leaderboard_snapshot(participant_scores)
+    state = competition.live
+    if state and state["channel_id"] != channel.id:
+        state = None  # Channel changed: start a fresh live message
+    if state and state["snapshot"] == snapshot:
+        return
+    
+    embed = build_leaderboard_embed(
+        competition.ref, participant_scores, result.fetched_at,
+        previous=state["snapshot"] if state else None,
+        live_interval=interval or competition.poll_interval(LEADERBOARD_POLL_DEFAULT)
+    )
+    message = None
+    if state:
+        try:
+            message = await channel.get_partial_message(state["message_id"]).edit(embed=embed)
+        except discord.NotFound:
+            message = None  # Deleted by someone; post a new one
+    if message is None:
+        message = await channel.send(embed=embed)
+        try:
+            await message.pin(reason="Live contest leaderboard")
+        except discord.HTTPException as e:
+            print(f"Could not pin live leaderboard: {e}")
+    
+    competition.live = {
+        "channel_id": channel.id,
+        "message_id": message.id,
+        "snapshot": snapshot
+    }
+    if competition.ref in competitions:  # Not removed while we were fetching
+        competitions.save(competition)
+    print(f"Live leaderboard updated for {competition.ref} ({len(snapshot)} participants)")
 
 # ===== BACKGROUND TASKS (Keep bot active 24/7) =====
 
+@tasks.loop(seconds=60)
+async def leaderboard_poller():
+    """Keep every tracked competition's live standings current within the shared Kaggle budget"""
+    intervals = {
+        competition.ref: competition.poll_interval(LEADERBOARD_POLL_DEFAULT)
+        for competition in competitions
+        if competition.participants and (competition.channel_id or LEADERBOARD_CHANNEL_ID)
+    }
+    # Each competition is due on its own cadence (faster near its deadline); the scheduler
+    # spends the download budget on the most overdue ones first
+    for ref in fetch_scheduler.plan(intervals):
+        competition = competitions.get(ref)
+        try:
+            result = await leaderboard_cache.get(ref, competition.participants, refresh=True)
+            await contest_scores.record(result)
+            await update_live_leaderboard(competition, result, intervals[ref])
+        except Exception as e:
+            print(f"Live leaderboard poll failed for {ref}: {e}")
+
+@tasks.loop(minutes=10)
+async def refresh_competition_catalog():
+    """Keep competition metadata current and look up tracked competitions the catalog is missing"""
+    tracked = [competition.ref for competition in competitions]
+    try:
+        age = competition_catalog.age()
+        if age is None or age >= COMPETITION_CATALOG_TTL:
+            await competition_catalog.refresh(extra_refs=tracked)
+        else:
+            for ref in tracked:
+                if competition_catalog.get(ref) is None:
+                    await competition_catalog.lookup(ref)
+    except Exception as e:
+        print(f"Competition catalog refresh failed: {e}")
+    sync_competition_deadlines()
+
+def sync_competition_deadlines():
+    """Apply catalog deadlines to tracked competitions (late lookups, extended deadlines)"""
+    for competition in competitions:
+        deadline = competition_catalog.deadline(competition.ref)
+        if deadline and deadline != competition.end_time:
+            print(f"Deadline for {competition.ref}: {competition.end_time} -> {deadline}")
+            competition.end_time = deadline
+            competitions.save(competition)
+            schedule_competition_reminders(competition)
+
+@tasks.loop(seconds=PROFILE_REFRESH_SECONDS)
+async def refresh_kaggle_profiles():
+    """Refresh queued Kaggle profile stats, a small batch per tick to stay under the API rate limits"""
+    try:
+        await kaggle_stats_cache.refresh_batch()
+    except Exception as e:
+        print(f"Kaggle profile refresh failed: {e}")
+
+@tasks.loop(minutes=5)
+async def prune_poll_signups():
+    """Forget Kaggle ID forms that were opened but never submitted"""
+    evicted = polls.evict_pending(POLL_PENDING_TTL)
+    if evicted:
+        print(f"Evicted {evicted} abandoned poll sign-up(s)")
+
 @tasks.loop(hours=24)
 async def daily_stats_update():
     """Daily task: Post server stats to specific stats channel"""
@@ -1254,57 +1876,80 @@ async def daily_stats_update():
             
             await stats_channel.send(embed=embed)
 
-# ===== HELPER FUNCTIONS =====
-
-def save_kaggle_ids():
-    """Save Kaggle IDs to a permanent JSON file"""
+@tasks.loop(seconds=15)
+async def watch_word_filters():
+    """Pick up manual edits to word_filters.json without a restart"""
     try:
-        with open('kaggle_ids.json', 'w') as f:
-            json.dump(kaggle_ids, f, indent=2)
+        await word_filters.reload_if_changed()
     except Exception as e:
-        print(f"Error saving Kaggle IDs: {e}")
+        print(f"Error reloading word filters: {e}")
 
-def load_kaggle_ids():
-    """Load Kaggle IDs from JSON file"""
-    global kaggle_ids
-    try:
-        if os.path.exists('kaggle_ids.json'):
-            with open('kaggle_ids.json', 'r') as f:
-                content = f.read().strip()
-                if content:
-                    kaggle_ids = json.loads(content)
-                    # Convert string keys back to integers
-                    kaggle_ids = {int(k): v for k, v in kaggle_ids.items()}
-                    print(f"Loaded {len(kaggle_ids)} Kaggle IDs from file")
-    except Exception as e:
-        print(f"Error loading Kaggle IDs: {e}")
+# ===== HELPER FUNCTIONS =====
+
+def format_age(seconds):
+    """Human-friendly "x ago" for cache ages"""
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    return f"{seconds / 3600:.1f} h ago"
+
+def save_participant(poll, user_id):
+    """Persist a poll registration (write-behind) and mirror it into linked competitions"""
+    polls.save_participant(poll, user_id)
+    sync_competition_participant(poll, user_id)
+
+def update_participant_kaggle_id(user_id, kaggle_id):
+    """Carry a changed Kaggle ID into the user's registrations on open polls"""
+    for message_id in polls.active_ids:
+        poll = polls.get(message_id)
+        if user_id in poll.participants:
+            poll.participants[user_id]["kaggle_id"] = kaggle_id
+            save_participant(poll, user_id)
+
+def sync_competition_participant(poll, user_id):
+    """Mirror a poll registration change into the competitions fed by that poll"""
+    for competition in competitions:
+        if competition.poll_message != poll.message_id:
+            continue
+        if user_id in poll.participants:
+            competition.participants[user_id] = dict(poll.participants[user_id])
+        else:
+            competition.participants.pop(user_id, None)
+        competitions.save_participant(competition, user_id)
 
-def save_participants():
-    """Save contest participants to a JSON file"""
+def load_polls():
+    """Load contest polls"""
     try:
-        with open('contest_participants.json', 'w') as f:
-            json.dump(contest_participants, f, indent=2)
+        polls.load()
+        if polls.active_ids:
+            pending = sum(len(polls.get(message_id).pending) for message_id in polls.active_ids)
+            print(f"Restored {len(polls.active_ids)} active poll(s) ({pending} pending registrations)")
     except Exception as e:
-        print(f"Error saving participants: {e}")
+        print(f"Error loading polls: {e}")
 
-def load_participants():
-    """Load contest participants from JSON file"""
-    global contest_participants
+def load_competitions():
+    """Load tracked competitions and the metadata catalog"""
     try:
-        if os.path.exists('contest_participants.json'):
-            with open('contest_participants.json', 'r') as f:
-                content = f.read().strip()
-                if content:  # Only load if file has content
-                    contest_participants = json.loads(content)
-                    # Convert string keys back to integers
-                    contest_participants = {int(k): v for k, v in contest_participants.items()}
-                    print(f"Loaded {len(contest_participants)} contest participants from file")
+        competitions.load()
+        competition_catalog.load()
+        if len(competitions):
+            print(f"Tracking {len(competitions)} competition(s): {', '.join(c.ref for c in competitions)}")
     except Exception as e:
-        print(f"Error loading participants: {e}")
+        print(f"Error loading competitions: {e}")
 
-# Load existing data on startup
-load_kaggle_ids()
-load_participants()
+# Load existing data on startup (importing the old JSON files on first run)
+storage.migrate_json('kaggle_ids.json', 'contest_participants.json')
+load_polls()
+load_competitions()
+dm_fanout.load()
+warning_ledger.load()
+startup_timings["loaded"] = time.perf_counter() - STARTUP_BEGAN
 
 # Run the bot
-bot.run(token, log_handler=handler, log_level=logging.DEBUG)
+try:
+    bot.run(token, log_handler=handler, log_level=logging.DEBUG)
+finally:
+    kaggle_client.close()
+    warning_ledger.close()
+    storage.close()
@@ -0,0 +1,348 @@
+import asyncio
+import bisect
+import time
+from datetime import datetime, timedelta, timezone
+
+# Live leaderboard polling cadence per competition
+POLL_DEFAULT = 1800  # Far from (or without) a deadline
+POLL_WINDOWS = [(timedelta(hours=1), 120), (timedelta(hours=24), 600)]  # (time left, seconds)
+POLL_ENDED = 3600  # Keep checking slowly after the deadline for final/private standings
+
+class Competition:
+    """One tracked Kaggle competition with its own participants, deadline and channel"""
+
+    __slots__ = ('ref', 'channel_id', 'end_time', 'created_at', 'poll_message', 'participants', 'live')
+
+    def __init__(self, ref, channel_id=None, end_time=None, created_at=None, poll_message=None,
+                 participants=None, live=None):
+        self.ref = ref
+        self.channel_id = channel_id  # Leaderboard/reminder channel; None means the default channel
+        self.end_time = end_time  # Aware UTC datetime or None
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+        self.poll_message = poll_message  # Registrations on this poll keep flowing into participants
+        self.participants = participants if participants is not None else {}  # {user_id: {"name", "kaggle_id", ...}}
+        self.live = live  # Pinned standings message {"channel_id", "message_id", "snapshot"}
+
+    def poll_interval(self, default=POLL_DEFAULT, now=None):
+        """Seconds between leaderboard checks: faster as the deadline gets closer"""
+        if self.end_time:
+            remaining = self.end_time - (now or datetime.now(timezone.utc))
+            if remaining <= timedelta(0):
+                return POLL_ENDED
+            for window, seconds in POLL_WINDOWS:
+                if remaining <= window:
+                    return seconds
+        return default
+
+    def to_record(self):
+        return {
+            "channel_id": self.channel_id,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "created_at": self.created_at,
+            "poll_message": self.poll_message,
+            "live": self.live,  # Participants are stored one row each (see CompetitionRegistry.save_participant)
+        }
+
+    @classmethod
+    def from_record(cls, ref, record):
+        end_time = datetime.fromisoformat(record["end_time"]) if record.get("end_time") else None
+        return cls(ref, record.get("channel_id"), end_time, record.get("created_at"), record.get("poll_message"),
+                   record.get("participants") or {}, record.get("live"))
+
+class CompetitionRegistry:
+    """All tracked competitions, persisted through storage, with a sorted index for autocomplete"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._competitions = {}  # {ref: Competition}
+        self._sorted_refs = []  # Lowercased refs, kept sorted for prefix search
+
+    def load(self):
+        """Load competitions from storage (blocking; for startup)"""
+        for ref, record in self.storage.load_competitions().items():
+            self._competitions[ref] = Competition.from_record(ref, record)
+        self._sorted_refs = sorted(ref.lower() for ref in self._competitions)
+        return len(self._competitions)
+
+    def get(self, ref):
+        return self._competitions.get(ref)
+
+    def __contains__(self, ref):
+        return ref in self._competitions
+
+    def __iter__(self):
+        return iter(list(self._competitions.values()))
+
+    def __len__(self):
+        return len(self._competitions)
+
+    def add(self, competition):
+        """Track a competition, replacing one with the same ref (only changed participant rows are written)"""
+        previous = self._competitions.get(competition.ref)
+        if previous is None:
+            bisect.insort(self._sorted_refs, competition.ref.lower())
+        self._competitions[competition.ref] = competition
+        self.save(competition)
+        old = previous.participants if previous is not None else {}
+        for user_id in old.keys() - competition.participants.keys():
+            self.storage.delete_competition_participant(competition.ref, user_id)
+        for user_id, data in competition.participants.items():
+            if old.get(user_id) != data:
+                self.save_participant(competition, user_id)
+
+    def save(self, competition):
+        """Persist the competition itself; participants are saved per user"""
+        self.storage.upsert_competition(competition.ref, competition.to_record())
+
+    def save_participant(self, competition, user_id):
+        """Persist one participant, or their removal"""
+        data = competition.participants.get(user_id)
+        if data is None:
+            self.storage.delete_competition_participant(competition.ref, user_id)
+        else:
+            self.storage.upsert_competition_participant(competition.ref, user_id, data)
+
+    def remove(self, ref):
+        competition = self._competitions.pop(ref, None)
+        if competition is not None:
+            index = bisect.bisect_left(self._sorted_refs, ref.lower())
+            if index < len(self._sorted_refs) and self._sorted_refs[index] == ref.lower():
+                del self._sorted_refs[index]
+            for user_id in competition.participants:
+                self.storage.delete_competition_participant(ref, user_id)
+            self.storage.delete_competition(ref)
+        return competition
+
+    def resolve(self, ref):
+        """Find a competition by ref (case-insensitive); with no ref, the only one if there is exactly one"""
+        if not ref:
+            return next(iter(self._competitions.values())) if len(self._competitions) == 1 else None
+        return self._competitions.get(ref) or next(
+            (c for c in self._competitions.values() if c.ref.lower() == ref.lower()), None
+        )
+
+    def search(self, text, limit=25):
+        """Refs for autocomplete: prefix matches first (binary search), then substring matches"""
+        text = text.lower().strip()
+        start = bisect.bisect_left(self._sorted_refs, text)
+        matches = []
+        for ref in self._sorted_refs[start:]:
+            if not ref.startswith(text) or len(matches) >= limit:
+                break
+            matches.append(ref)
+        if len(matches) < limit and text:
+            matches += [ref for ref in self._sorted_refs if text in ref and not ref.startswith(text)][:limit - len(matches)]
+        by_lower = {c.ref.lower(): c.ref for c in self._competitions.values()}
+        return [by_lower[ref] for ref in matches]
+
+class FetchScheduler:
+    """Spreads leaderboard downloads for all competitions under one global rate budget
+
+    Each competition asks to be fetched every `interval` seconds (its poll_interval). A
+    token bucket holding `budget` downloads per `per_seconds` pays for fetches; when
+    tokens run short the most overdue competitions go first and the rest stay due for
+    the next tick, so one busy competition can't starve the others.
+    """
+
+    def __init__(self, budget=30, per_seconds=3600):
+        self.capacity = float(budget)
+        self.rate = budget / per_seconds
+        self.tokens = float(budget)
+        self.updated = time.monotonic()
+        self._next_due = {}  # {ref: monotonic time}
+        self.fetches = 0
+        self.deferred = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def plan(self, intervals, now=None):
+        """Given {ref: interval seconds}, return the refs to fetch now, most overdue first"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        for ref in list(self._next_due):
+            if ref not in intervals:
+                del self._next_due[ref]  # No longer tracked
+        due = sorted((self._next_due.get(ref, now), ref) for ref in intervals if self._next_due.get(ref, now) <= now)
+        chosen = []
+        for _, ref in due:
+            if self.tokens < 1:
+                self.deferred += 1
+                continue
+            self.tokens -= 1
+            self.fetches += 1
+            self._next_due[ref] = now + intervals[ref]
+            chosen.append(ref)
+        return chosen
+
+    def mark_fetched(self, ref, interval, now=None):
+        """Record a fetch made outside the scheduler (e.g. a manual /leaderboard) and charge the budget"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens = max(0.0, self.tokens - 1)
+        self._next_due[ref] = now + interval
+
+    def stats(self):
+        self._refill(time.monotonic())
+        return {"tokens": self.tokens, "capacity": self.capacity, "fetches": self.fetches, "deferred": self.deferred}
+
+class CompetitionCatalog:
+    """Kaggle competition metadata indexed by ref, kept in memory and in storage
+
+    refresh() walks the first pages of Kaggle's competition list in the background;
+    lookup() serves from memory and only searches the API for refs it has never seen
+    (one in-flight search per ref). Autocomplete and /setcompetition read from here,
+    so they don't wait on Kaggle.
+    """
+
+    def __init__(self, client, storage, pages=5):
+        self.client = client
+        self.storage = storage
+        self.pages = pages
+        self._by_ref = {}  # {lowercased ref: metadata}
+        self._sorted_refs = []  # Lowercased refs, kept sorted for prefix search
+        self._inflight = {}  # {lowercased ref: Task} for API searches
+        self.refreshed_at = None
+        self.refreshes = 0
+        self.searches = 0
+        self.hits = 0
+        self.errors = 0
+
+    def load(self):
+        """Restore the last refreshed catalog (blocking; for startup)"""
+        saved = self.storage.load_meta('competition_catalog') or {}
+        self.refreshed_at = saved.get("refreshed_at")
+        for metadata in saved.get("competitions", []):
+            self._index(metadata)
+        return len(self._by_ref)
+
+    def _save(self):
+        self.storage.set_meta('competition_catalog', {
+            "refreshed_at": self.refreshed_at,
+            "competitions": list(self._by_ref.values())
+        })
+
+    def _index(self, metadata):
+        key = metadata["ref"].lower()
+        if key not in self._by_ref:
+            bisect.insort(self._sorted_refs, key)
+        self._by_ref[key] = metadata
+        return metadata
+
+    def get(self, ref):
+        return self._by_ref.get(slug(ref).lower()) if ref else None
+
+    def deadline(self, ref):
+        """Deadline as an aware UTC datetime, or None if unknown"""
+        metadata = self.get(ref)
+        return datetime.fromisoformat(metadata["deadline"]) if metadata and metadata["deadline"] else None
+
+    def age(self):
+        return time.time() - self.refreshed_at if self.refreshed_at else None
+
+    async def refresh(self, extra_refs=()):
+        """Re-list the first pages of competitions, plus any extra refs not on them"""
+        for page in range(1, self.pages + 1):
+            items = await self.client.competitions_list(page=page)
+            for item in items:
+                if _field(item, 'ref'):
+                    self._index(_metadata(item))
+            if not items:
+                break
+        self.refreshes += 1
+        self.refreshed_at = time.time()
+        for ref in extra_refs:
+            if self._by_ref.get(slug(ref).lower(), {}).get("fetched_at", 0) < self.refreshed_at - 60:
+                await self._search(slug(ref).lower())  # Not on the listed pages (e.g. ended or private)
+        self._save()
+        return len(self._by_ref)
+
+    async def lookup(self, ref):
+        """Metadata for a ref: from memory, else one API search (shared by concurrent callers)"""
+        key = slug(ref).lower()
+        if key in self._by_ref:
+            self.hits += 1
+            return self._by_ref[key]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._search(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        found = await asyncio.shield(task)
+        if found:
+            self._save()
+        return found
+
+    async def _search(self, key):
+        self.searches += 1
+        try:
+            items = await self.client.competitions_list(search=key)
+        except Exception as e:
+            self.errors += 1
+            print(f"Competition lookup failed for {key}: {e}")
+            return None
+        found = None
+        for item in items:
+            if not _field(item, 'ref'):
+                continue
+            metadata = self._index(_metadata(item))
+            if metadata["ref"].lower() == key:
+                found = metadata
+        return found
+
+    def search(self, text, limit=25):
+        """Metadata for autocomplete: ref prefix matches first (binary search), then ref/title substrings"""
+        text = slug(text).lower().strip() if text else ""
+        start = bisect.bisect_left(self._sorted_refs, text)
+        matches = []
+        for ref in self._sorted_refs[start:]:
+            if not ref.startswith(text) or len(matches) >= limit:
+                break
+            matches.append(self._by_ref[ref])
+        if len(matches) < limit and text:
+            matches += [
+                metadata for ref, metadata in self._by_ref.items()
+                if not ref.startswith(text) and (text in ref or text in (metadata["title"] or "").lower())
+            ][:limit - len(matches)]
+        return matches
+
+    def stats(self):
+        return {
+            "competitions": len(self._by_ref),
+            "age": self.age(),
+            "refreshes": self.refreshes,
+            "hits": self.hits,
+            "searches": self.searches,
+            "errors": self.errors,
+        }
+
+def slug(ref):
+    """Competition slug from a ref or URL (newer Kaggle SDKs return full URLs as refs)"""
+    return ref.strip().rstrip('/').rsplit('/', 1)[-1]
+
+def _metadata(item):
+    deadline = _field(item, 'deadline')
+    if isinstance(deadline, str):
+        deadline = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
+    if deadline is not None and deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)  # Kaggle deadlines are UTC
+    return {
+        "ref": slug(str(_field(item, 'ref'))),
+        "title": _field(item, 'title'),
+        "deadline": deadline.isoformat() if deadline else None,
+        "reward": _field(item, 'reward'),
+        "category": _field(item, 'category'),
+        "max_team_size": _field(item, 'max_team_size', 'maxTeamSize'),
+        "max_daily_submissions": _field(item, 'max_daily_submissions', 'maxDailySubmissions'),
+        "team_count": _field(item, 'team_count', 'teamCount'),
+        "fetched_at": time.time(),
+    }
+
+def _field(item, *names):
+    # kaggle>=1.7 models use snake_case attributes, older releases camelCase
+    for name in names:
+        value = getattr(item, name, None)
+        if value is not None:
+            return value
+    return None
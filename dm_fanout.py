@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+# Discord error codes meaning the DM can never be delivered until the user changes something
+CLOSED_DM_CODES = (50007,)  # Cannot send messages to this user (DMs off, bot blocked, no shared server)
+
+FanoutResult = namedtuple('FanoutResult', 'total sent closed skipped failed retries elapsed')
+
+class DMFanout:
+    """Sends one message to many users concurrently without tripping Discord's rate limits
+
+    A semaphore bounds the sends in flight and a shared pacer spaces them to at most
+    `rate` per second. A 429 pauses every worker for its Retry-After; other transient
+    errors (5xx, network) are retried with jittered backoff. Users whose DMs are closed
+    are recorded in storage and skipped by later fan-outs until they DM the bot again.
+    Errors are classified by their status/code attributes, so this module stays
+    independent of discord.py.
+    """
+
+    def __init__(self, storage, concurrency=5, rate=5.0, retries=3, backoff=1.0, progress_interval=2.0):
+        self.storage = storage
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate
+        self.retries = retries
+        self.backoff = backoff
+        self.progress_interval = progress_interval
+        self.closed = {}  # {user_id: {"closed_at", "reason"}}
+        self._next_send = 0.0  # Monotonic time the next send may start (pacing + 429 pauses)
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    def load(self):
+        """Load the closed-DM record (blocking; for startup)"""
+        self.closed = self.storage.load_dm_closed()
+        return len(self.closed)
+
+    def reopen(self, user_id):
+        """Forget a closed DM (e.g. the user just messaged the bot)"""
+        if self.closed.pop(user_id, None) is not None:
+            self.storage.clear_dm_closed(user_id)
+
+    async def send(self, recipients, build, progress=None):
+        """Send `build(user_id)` -> {"content"/"embed": ...} to every (user_id, user) in recipients
+
+        `user` may be None (left the server), which counts as skipped. `progress`, if given,
+        is awaited with (done, total, counts) at most every progress_interval seconds and
+        once at the end. Returns a FanoutResult.
+        """
+        start = time.monotonic()
+        recipients = list(recipients)
+        counts = {"sent": 0, "closed": 0, "skipped": 0, "failed": 0, "retries": 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        last_report = [start]
+
+        async def deliver(user_id, user):
+            if user is None:
+                counts["skipped"] += 1
+            elif user_id in self.closed:
+                counts["closed"] += 1
+            else:
+                async with semaphore:
+                    counts[await self._deliver(user_id, user, build, counts)] += 1
+            if progress and time.monotonic() - last_report[0] >= self.progress_interval:
+                last_report[0] = float('inf')  # One update in flight at a time
+                await _report(progress, counts, len(recipients))
+                last_report[0] = time.monotonic()
+
+        await asyncio.gather(*(deliver(user_id, user) for user_id, user in recipients))
+        if progress:
+            await _report(progress, counts, len(recipients))
+        return FanoutResult(len(recipients), counts["sent"], counts["closed"], counts["skipped"],
+                            counts["failed"], counts["retries"], time.monotonic() - start)
+
+    async def _deliver(self, user_id, user, build, counts):
+        attempt = 0
+        while True:
+            await self._pace()
+            try:
+                await user.send(**build(user_id))
+                self.sent += 1
+                return "sent"
+            except Exception as e:
+                status, code = getattr(e, 'status', None), getattr(e, 'code', None)
+                if code in CLOSED_DM_CODES or status == 403:
+                    self._mark_closed(user_id, f"{status} {code}: {getattr(e, 'text', e)}")
+                    return "closed"
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    self.rate_limited += 1
+                    self._next_send = max(self._next_send, time.monotonic() + retry_after)  # Pauses every worker
+                    delay = 0.0
+                elif status is not None and status < 500:
+                    print(f"DM to {user_id} failed permanently: {e}")
+                    self.failed += 1
+                    return "failed"
+                else:
+                    delay = random.uniform(0, self.backoff * 2 ** attempt)
+                if attempt >= self.retries:
+                    print(f"DM to {user_id} failed after {attempt + 1} attempts: {e}")
+                    self.failed += 1
+                    return "failed"
+                attempt += 1
+                counts["retries"] += 1
+                await asyncio.sleep(delay)
+
+    async def _pace(self):
+        # Reserve the next send slot; concurrent workers queue up behind each other
+        now = time.monotonic()
+        slot = max(now, self._next_send)
+        self._next_send = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _mark_closed(self, user_id, reason):
+        record = {"closed_at": datetime.now(timezone.utc).isoformat(), "reason": reason}
+        self.closed[user_id] = record
+        self.storage.mark_dm_closed(user_id, record)
+
+    def stats(self):
+        return {"closed": len(self.closed), "sent": self.sent, "failed": self.failed, "rate_limited": self.rate_limited}
+
+async def _report(progress, counts, total):
+    done = counts["sent"] + counts["closed"] + counts["skipped"] + counts["failed"]
+    try:
+        await progress(done, total, dict(counts))
+    except Exception as e:
+        print(f"Fan-out progress update failed: {e}")
+
+def _retry_after(error):
+    """Seconds to wait for a rate-limit error, else None"""
+    retry_after = getattr(error, 'retry_after', None)  # discord.RateLimited
+    if retry_after is not None:
+        return float(retry_after)
+    if getattr(error, 'status', None) != 429:
+        return None
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', 1.0))
+    except (TypeError, ValueError):
+        return 1.0
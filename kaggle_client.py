@@ -0,0 +1,243 @@
+import asyncio
+import functools
+import random
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)  # Seconds; last bucket is +inf
+
+# Exception class names worth retrying when no HTTP status is attached (requests/urllib3 network errors)
+RETRYABLE_ERRORS = ('ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'ChunkedEncodingError',
+                    'ProtocolError', 'RemoteDisconnected')
+
+class KaggleTimeout(Exception):
+    """A Kaggle call did not finish within its timeout"""
+
+class KaggleUnavailable(Exception):
+    """The Kaggle SDK could not be imported or authenticated"""
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with cheap percentile estimates"""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (the max for the overflow bucket)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(LATENCY_BUCKETS[i], self.max) if i < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+class CallStats:
+    __slots__ = ('latency', 'errors', 'timeouts', 'retries', 'abandoned')
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.abandoned = 0  # Timed out or cancelled, but the thread is still running
+
+class KaggleClient:
+    """Async wrapper around KaggleApi
+
+    The Kaggle SDK is synchronous HTTP, so every call runs on a small dedicated thread
+    pool instead of the event loop. A semaphore caps how many calls are in flight, each
+    attempt has a timeout, and transient failures (network errors, 429, 5xx) are retried
+    with full-jitter exponential backoff. Cancelling the awaiting task abandons the call;
+    a queued call is dropped, a running one finishes in the background and is discarded.
+    A call keeps its semaphore slot until its thread is actually done, so abandoned calls
+    can't pile up more threads than the cap allows.
+
+    The SDK itself is created lazily by `factory` (import + authenticate) on the thread
+    pool, on first use or when warm() is called, so it never delays startup. If that
+    fails, calls raise KaggleUnavailable until `retry_after` seconds have passed.
+    """
+
+    def __init__(self, factory, max_workers=4, max_concurrency=4, timeout=30.0, retries=2, backoff=1.0,
+                 max_backoff=20.0, retry_after=60.0):
+        self.factory = factory
+        self.api = None
+        self.retry_after = retry_after
+        self.state = 'cold'  # cold -> connecting -> ready | failed
+        self.error = None
+        self.init_seconds = None
+        self._init_task = None
+        self._retry_at = 0.0
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kaggle')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._stats = {}  # {call name: CallStats}
+        self.in_flight = 0  # Calls occupying a thread, abandoned ones included
+
+    def warm(self):
+        """Start importing/authenticating the SDK in the background (no-op once started)"""
+        if self._init_task is None or (self.state == 'failed' and time.monotonic() >= self._retry_at):
+            self.state = 'connecting'
+            self._init_task = asyncio.get_running_loop().create_task(self._initialize())
+            self._init_task.add_done_callback(lambda task: task.cancelled() or task.exception())  # Logged in _initialize
+        return self._init_task
+
+    async def _initialize(self):
+        start = time.perf_counter()
+        try:
+            self.api = await asyncio.get_running_loop().run_in_executor(self._executor, self.factory)
+        except Exception as e:
+            self.state = 'failed'
+            self.error = f"{type(e).__name__}: {e}"
+            self._retry_at = time.monotonic() + self.retry_after
+            print(f"Kaggle API unavailable ({self.error}); retrying on use after {self.retry_after:g}s")
+            raise KaggleUnavailable(self.error) from e
+        finally:
+            self.init_seconds = time.perf_counter() - start
+        self.state = 'ready'
+        self.error = None
+        print(f"Kaggle API ready in {self.init_seconds:.2f}s")
+        return self.api
+
+    async def ensure_ready(self):
+        """Return the authenticated SDK, initializing it on first use"""
+        if self.api is not None:
+            return self.api
+        if self.state == 'failed' and time.monotonic() < self._retry_at:
+            raise KaggleUnavailable(self.error)
+        return await asyncio.shield(self.warm())
+
+    def health(self):
+        return {"state": self.state, "error": self.error, "init_seconds": self.init_seconds,
+                "in_flight": self.in_flight, "abandoned": sum(s.abandoned for s in self._stats.values())}
+
+    async def call(self, method, *args, timeout=None, retries=None, **kwargs):
+        """Run a blocking SDK method off the event loop with timeout, retries and metrics"""
+        api = await self.ensure_ready()
+        func = getattr(api, method)
+        timeout = timeout or self.timeout
+        retries = self.retries if retries is None else retries
+        stats = self._stats.setdefault(method, CallStats())
+        attempt = 0
+        while True:
+            try:
+                await self._semaphore.acquire()  # Released by _attempt once the thread finishes
+                return await self._attempt(stats, functools.partial(func, *args, **kwargs), timeout)
+            except Exception as e:
+                if isinstance(e, KaggleTimeout):
+                    stats.timeouts += 1
+                else:
+                    stats.errors += 1
+                delay = self.retry_delay(attempt, e, retries)
+                if delay is None:
+                    raise
+                attempt += 1
+                stats.retries += 1
+                print(f"Kaggle {method} failed ({e}), retry {attempt}/{retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def retry_delay(self, attempt, error, retries=None):
+        """Full-jitter backoff before retry number attempt + 1, or None when error shouldn't be retried"""
+        if attempt >= (self.retries if retries is None else retries) or not _is_retryable(error):
+            return None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def _attempt(self, stats, func, timeout):
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(func)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self.in_flight += 1
+        abandoned = False
+
+        def finished():
+            self.in_flight -= 1
+            if abandoned:
+                stats.abandoned -= 1
+            self._semaphore.release()
+
+        def on_done(_):
+            # Runs on the worker thread (or here, for a cancelled queued call)
+            try:
+                loop.call_soon_threadsafe(finished)
+            except RuntimeError:
+                pass  # Loop already closed (shutdown)
+
+        future.add_done_callback(on_done)
+        wrapped = asyncio.wrap_future(future)
+        start = time.perf_counter()
+        try:
+            done, _ = await asyncio.wait((wrapped,), timeout=timeout)
+            if not done:
+                raise KaggleTimeout(f"no response after {timeout:g}s")
+            return wrapped.result()
+        finally:
+            stats.latency.observe(time.perf_counter() - start)
+            if not wrapped.done():
+                # Drops it if still queued; a running thread is left to finish and keeps its slot
+                if not future.cancel() and not future.done():
+                    abandoned = True
+                    stats.abandoned += 1
+                wrapped.cancel()
+
+    # ----- API calls used by the bot -----
+
+    async def competitions_list(self, search=None, page=1):
+        """List competitions (one page); returns the items whatever the SDK version's response shape"""
+        response = await self.call('competitions_list', search=search, page=page)
+        return list(getattr(response, 'competitions', response) or [])
+
+    async def leaderboard_download(self, competition, path, timeout=120.0, retries=None):
+        return await self.call('competition_leaderboard_download', competition, path, timeout=timeout, retries=retries)
+
+    async def kernels_list(self, user, page_size=100):
+        return await self.call('kernels_list', user=user, page_size=page_size)
+
+    async def dataset_list(self, user):
+        return await self.call('dataset_list', user=user)
+
+    def stats(self):
+        """Return {call name: {calls, errors, timeouts, retries, abandoned, p50, p95, max}}"""
+        return {
+            name: {
+                "calls": s.latency.count,
+                "errors": s.errors,
+                "timeouts": s.timeouts,
+                "retries": s.retries,
+                "abandoned": s.abandoned,
+                "p50": s.latency.percentile(0.5),
+                "p95": s.latency.percentile(0.95),
+                "max": s.latency.max,
+            }
+            for name, s in self._stats.items()
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+def _is_retryable(error):
+    if isinstance(error, KaggleTimeout):
+        return True
+    status = getattr(error, 'status', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in RETRYABLE_ERRORS
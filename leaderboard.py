@@ -0,0 +1,400 @@
+import asyncio
+import csv
+import difflib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import namedtuple
+from operator import itemgetter
+
+_MEMBER_SPLIT = re.compile(r'[,;]')
+FUZZY_CUTOFF = 0.85  # difflib ratio needed for a fuzzy match
+FUZZY_LENGTH_SLACK = 2  # Only compare against handles within this many characters of the ID
+
+# Compact projection of one leaderboard row: only the columns the bot uses
+Entry = namedtuple('Entry', 'team members score public_rank private_rank')
+
+# ===== COLUMN DETECTION =====
+
+def detect_columns(header):
+    """Map the leaderboard CSV header to the columns we use, once per file
+
+    Returns {"team", "members", "score", "public_rank", "private_rank"}; any may be None.
+    A generic "Rank" column counts as the public rank when there is no explicit one.
+    """
+    columns = {"team": None, "members": None, "score": None, "public_rank": None, "private_rank": None}
+    generic_rank = None
+    for name in header:
+        key = name.lower().replace(' ', '')
+        if key == 'teamname':
+            columns["team"] = name
+        elif key == 'teammemberusernames':
+            columns["members"] = name
+        elif key == 'score' or (columns["score"] is None and 'score' in key):
+            columns["score"] = name
+        elif 'rank' in key:
+            if 'private' in key:
+                columns["private_rank"] = name
+            elif 'public' in key:
+                columns["public_rank"] = name
+            elif generic_rank is None:
+                generic_rank = name
+    if columns["public_rank"] is None:
+        columns["public_rank"] = generic_rank
+    return columns
+
+def normalize_handle(value):
+    """Canonical form of a Kaggle username / team name for exact lookups"""
+    value = str(value).strip().casefold()
+    if 'kaggle.com/' in value:
+        value = value.rsplit('kaggle.com/', 1)[1]
+    return value.strip('@/ ')
+
+# ===== STREAMING INGESTION =====
+
+def pick_leaderboard_csv(names):
+    """Choose the CSV inside a leaderboard zip: private first, then public, then any"""
+    csv_files = [name for name in names if name.endswith('.csv')]
+    private_file = next((name for name in csv_files if 'private' in name.lower()), None)
+    public_file = next((name for name in csv_files if 'public' in name.lower()), None)
+    return private_file or public_file or (csv_files[0] if csv_files else None)
+
+def iter_entries(zip_path):
+    """Stream the leaderboard CSV straight out of the zip as Entry tuples
+
+    Nothing is extracted to disk and no per-row dicts are built; columns are resolved
+    once from the header and each row is projected down to the five fields we use.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as archive:
+        csv_name = pick_leaderboard_csv(archive.namelist())
+        if csv_name is None:
+            return
+        with archive.open(csv_name) as raw:
+            reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''))
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = detect_columns(header)
+            # Missing columns read the None appended to every record (index -1)
+            project = itemgetter(*(header.index(columns[field]) if columns[field] else -1 for field in Entry._fields))
+            width = len(header)
+            make = Entry._make
+            for record in reader:
+                if len(record) < width:
+                    record += [''] * (width - len(record))  # Ragged row
+                record.append(None)
+                yield make(project(record))
+
+def entry_handles(entry):
+    """Yield (normalized handle, username or None) for each name an entry can match on"""
+    members = entry.members
+    if members:
+        if ',' in members or ';' in members:
+            for username in _MEMBER_SPLIT.split(members):
+                handle = normalize_handle(username)
+                if handle:
+                    yield handle, username.strip()
+        else:
+            yield normalize_handle(members), members.strip()  # Solo team, the common case
+    if entry.team:
+        yield normalize_handle(entry.team), None
+
+# ===== MATCHING ENGINE =====
+
+class ParticipantIndex:
+    """Hash index over our registered participants, matched against a streamed leaderboard
+
+    Rows are checked against the index as they stream past and only rows that belong
+    to a participant are kept, so memory tracks the participant count rather than the
+    competition size. Each row costs a couple of dict lookups. IDs that miss every row
+    get a second, fuzzy pass that only compares against handles of similar length
+    sharing their first or last two characters; its matches are marked "fuzzy" so
+    callers can show them as unconfirmed.
+    """
+
+    def __init__(self, participants):
+        self.participants = participants
+        self._by_handle = {}  # {normalized Kaggle ID: [user_id]}
+        for user_id, user_data in participants.items():
+            handle = normalize_handle(user_data.get("kaggle_id") or "")
+            if handle:
+                self._by_handle.setdefault(handle, []).append(user_id)
+        self.matches = {}  # {user_id: (Entry, username or None, "exact"/"fuzzy")}
+        self.rows_scanned = 0
+
+    def scan(self, entries):
+        """Exact pass: keep the rows whose member or team name is a registered ID"""
+        by_handle, matches = self._by_handle, self.matches
+        for entry in entries:
+            self.rows_scanned += 1
+            for handle, username in entry_handles(entry):
+                user_ids = by_handle.get(handle)
+                if not user_ids:
+                    continue
+                for user_id in user_ids:
+                    previous = matches.get(user_id)
+                    # A member username beats a team name that happens to be the same
+                    if previous is None or (previous[1] is None and username is not None):
+                        matches[user_id] = (entry, username, "exact")
+
+    def missing(self):
+        """Normalized handles with no exact match, {handle: [user_id]}"""
+        return {
+            handle: user_ids for handle, user_ids in self._by_handle.items()
+            if not any(user_id in self.matches for user_id in user_ids)
+        }
+
+    def scan_fuzzy(self, entries):
+        """Fuzzy pass for IDs that missed; an ID only takes a row that is its sole candidate
+
+        Rows already claimed by an exact match are skipped, and an ID with several rows at
+        or above the cutoff (or a row that is the sole candidate of several IDs) stays a
+        miss rather than guessing.
+        """
+        # A close match almost always keeps either its first or its last two characters,
+        # so each row handle is only compared against misses sharing one of them
+        buckets = {}  # {("^", prefix) or ("$", suffix): [(handle, SequenceMatcher)]}
+        for handle in self.missing():
+            candidate = (handle, difflib.SequenceMatcher(b=handle, autojunk=False))
+            buckets.setdefault(("^", handle[:2]), []).append(candidate)
+            buckets.setdefault(("$", handle[-2:]), []).append(candidate)
+        if not buckets:
+            return
+        by_handle = self._by_handle
+        found = {}  # {missing handle: {row number: (Entry, username)}}
+        for row, entry in enumerate(entries):
+            handles = list(entry_handles(entry))
+            if any(row_handle in by_handle for row_handle, _ in handles):
+                continue  # Belongs to a registered ID already
+            for row_handle, username in handles:
+                candidates = buckets.get(("^", row_handle[:2]), [])
+                suffix_candidates = buckets.get(("$", row_handle[-2:]))
+                if suffix_candidates:
+                    candidates = candidates + suffix_candidates
+                for handle, matcher in candidates:
+                    if abs(len(handle) - len(row_handle)) > FUZZY_LENGTH_SLACK:
+                        continue
+                    matcher.set_seq1(row_handle)
+                    if matcher.real_quick_ratio() < FUZZY_CUTOFF or matcher.quick_ratio() < FUZZY_CUTOFF:
+                        continue
+                    if matcher.ratio() >= FUZZY_CUTOFF:
+                        rows = found.setdefault(handle, {})
+                        # A member username beats the team name on the same row
+                        if row not in rows or rows[row][1] is None:
+                            rows[row] = (entry, username)
+        unique = {handle: next(iter(rows.items())) for handle, rows in found.items() if len(rows) == 1}
+        row_claims = {}
+        for row, _ in unique.values():
+            row_claims[row] = row_claims.get(row, 0) + 1
+        for handle, (row, (entry, username)) in unique.items():
+            if row_claims[row] == 1:
+                for user_id in by_handle[handle]:
+                    self.matches[user_id] = (entry, username, "fuzzy")
+
+    def results(self):
+        """Return (scores, misses) in the shape the leaderboard embed expects"""
+        scores, misses = [], []
+        for user_id, user_data in self.participants.items():
+            kaggle_id = user_data.get("kaggle_id") or ""
+            found = self.matches.get(user_id)
+            if found is None:
+                misses.append(kaggle_id)
+                continue
+            entry, username, how = found
+            scores.append({
+                "name": user_data.get("name", "Unknown"),
+                "kaggle_id": entry.team or kaggle_id,
+                # A fuzzy row is shown by its own name, never as the registered ID
+                "kaggle_username": username or (entry.team if how == "fuzzy" else kaggle_id),
+                "score": _to_float(entry.score),
+                "public_rank": entry.public_rank or 'N/A',
+                "private_rank": entry.private_rank or 'N/A',
+                "user_id": user_id,
+                "matched": how,
+            })
+        return scores, misses
+
+def match_leaderboard(zip_path, participants, fuzzy=True):
+    """Stream a downloaded leaderboard zip and resolve participants (blocking; run off the loop)
+
+    Returns (scores, misses, rows_scanned). The zip is only read a second time when
+    some IDs need the fuzzy pass.
+    """
+    index = ParticipantIndex(participants)
+    index.scan(iter_entries(zip_path))
+    rows = index.rows_scanned
+    if fuzzy and index.missing():
+        index.scan_fuzzy(iter_entries(zip_path))
+    scores, misses = index.results()
+    return scores, misses, rows
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+# ===== LEADERBOARD CACHE =====
+
+LeaderboardResult = namedtuple('LeaderboardResult', 'competition scores misses rows content_hash fetched_at')
+
+class CachedLeaderboard:
+    __slots__ = ('zip_path', 'content_hash', 'fetched_at', 'participants_key', 'result')
+
+    def __init__(self, zip_path, content_hash, fetched_at):
+        self.zip_path = zip_path
+        self.content_hash = content_hash
+        self.fetched_at = fetched_at
+        self.participants_key = None
+        self.result = None
+
+class LeaderboardCache:
+    """Per-competition leaderboard cache in front of the Kaggle download
+
+    Downloads are kept in `cache_dir` (with an index.json of content hashes and fetch
+    times, so the cache survives restarts) and reused for `ttl` seconds. The matched
+    result for the current participant set is held in memory; a re-download whose
+    hash is unchanged keeps it instead of re-parsing. Concurrent requests for the
+    same competition and participants share one in-flight load.
+    """
+
+    def __init__(self, client, cache_dir='leaderboard_cache', ttl=300):
+        self.client = client
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._entries = {}  # {competition: CachedLeaderboard}
+        self._inflight = {}  # {(competition, participants key): Task}
+        self._index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = _read_index(self._index_path)  # {competition: {"hash", "fetched_at"}}
+        self.hits = 0
+        self.shared = 0
+        self.downloads = 0
+        self.unchanged = 0
+        self.parses = 0
+
+    async def get(self, competition, participants, refresh=False):
+        """Return a LeaderboardResult, downloading only when stale or when refresh is set"""
+        participants = dict(participants)  # Snapshot; parsing runs on a worker thread
+        key = (competition, _participants_key(participants))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(competition, participants, key[1], refresh))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # Shield so one caller giving up doesn't cancel the load for the others
+        return await asyncio.shield(task)
+
+    async def _load(self, competition, participants, participants_key, refresh):
+        entry = self._entries.get(competition) or self._restore(competition)
+        if refresh or entry is None or time.time() - entry.fetched_at >= self.ttl:
+            entry = await self._download(competition, entry)
+        else:
+            self.hits += 1
+        if entry.result is None or entry.participants_key != participants_key:
+            scores, misses, rows = await asyncio.to_thread(match_leaderboard, entry.zip_path, participants)
+            self.parses += 1
+            entry.result = LeaderboardResult(competition, scores, misses, rows, entry.content_hash, entry.fetched_at)
+            entry.participants_key = participants_key
+        elif entry.result.fetched_at != entry.fetched_at:
+            entry.result = entry.result._replace(fetched_at=entry.fetched_at)  # Re-validated, same content
+        return entry.result
+
+    async def _download(self, competition, previous):
+        # Retried here rather than in the client: a timed-out attempt's thread may still be
+        # writing into its directory, so every attempt downloads into a fresh one
+        attempt = 0
+        while True:
+            download_dir = tempfile.mkdtemp(prefix='.download-', dir=self.cache_dir)
+            try:
+                await self.client.leaderboard_download(competition, download_dir, retries=0)
+                return await self._store(competition, previous, os.path.join(download_dir, f"{competition}.zip"))
+            except Exception as e:
+                delay = self.client.retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                attempt += 1
+                print(f"Leaderboard download for {competition} failed ({e}), retry {attempt} in {delay:.1f}s")
+            finally:
+                shutil.rmtree(download_dir, ignore_errors=True)
+            await asyncio.sleep(delay)
+
+    async def _store(self, competition, previous, new_zip):
+        """Cache a finished download, keeping the previous entry when the content is unchanged"""
+        if not await asyncio.to_thread(zipfile.is_zipfile, new_zip):
+            raise zipfile.BadZipFile(f"{competition} leaderboard download is not a zip file")
+        content_hash = await asyncio.to_thread(_file_hash, new_zip)
+        self.downloads += 1
+        if previous is not None and previous.content_hash == content_hash:
+            self.unchanged += 1
+            entry = previous
+            entry.fetched_at = time.time()
+        else:
+            zip_path = os.path.join(self.cache_dir, f"{_safe_name(competition)}.zip")
+            os.replace(new_zip, zip_path)
+            entry = CachedLeaderboard(zip_path, content_hash, time.time())
+        self._entries[competition] = entry
+        self._index[competition] = {"hash": content_hash, "fetched_at": entry.fetched_at}
+        await asyncio.to_thread(_write_index, self._index_path, dict(self._index))
+        return entry
+
+    def _restore(self, competition):
+        """Pick up a download left in the cache directory by a previous run"""
+        record = self._index.get(competition)
+        zip_path = os.path.join(self.cache_dir, f"{_safe_name(competition)}.zip")
+        if not record or not os.path.exists(zip_path):
+            return None
+        entry = CachedLeaderboard(zip_path, record["hash"], record["fetched_at"])
+        self._entries[competition] = entry
+        return entry
+
+    def age(self, competition):
+        """Seconds since the cached leaderboard was fetched, or None"""
+        entry = self._entries.get(competition)
+        return time.time() - entry.fetched_at if entry else None
+
+    def stats(self):
+        return {
+            "competitions": len(self._entries),
+            "hits": self.hits,
+            "shared": self.shared,
+            "downloads": self.downloads,
+            "unchanged": self.unchanged,
+            "parses": self.parses,
+        }
+
+def _participants_key(participants):
+    return hash(frozenset(
+        (user_id, data.get("kaggle_id"), data.get("name")) for user_id, data in participants.items()
+    ))
+
+def _safe_name(competition):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', competition)
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_index(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_index(path, index):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,1040 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+
+# Bad words list (customize as needed)
+BAD_WORDS = [
+    # Profanity (strong language)
+    'shit', 'fuck', 'bitch', 'bastard', 'piss',
+    'cock', 'dick', 'pussy', 'cunt', 'twat', 'bollocks', 'wanker', 'asshole',
+    'motherfucker', 'fuckface', 'shithead', 'dickhead', 'dumbass', 'jackass',
+    'bullshit', 'horseshit', 'bitchass', 'dipshit', 'shitty', 'fucking',
+    'fucked', 'fucker', 'fucks', 'arse', 'arsehole',
+    'son of a bitch', 'piece of shit', 'full of shit', 'eat shit', 'holy shit',
+
+    # Slurs and hate speech (racial/ethnic)
+    'nigger', 'nigga', 'chink', 'gook', 'spic', 'kike', 'wetback', 'beaner',
+    'towelhead', 'raghead', 'cracker', 'honky', 'paki', 'jap', 'injun',
+
+    # Sexual/inappropriate
+    'porn', 'hentai', 'rape', 'whore', 'slut', 'hoe',
+    'milf', 'dildo', 'boobs', 'tits', 'titties', 'penis', 'vagina',
+
+    # Homophobic/transphobic
+    'fag', 'faggot', 'dyke', 'tranny', 'shemale',
+
+    # Ableist
+    'retard', 'retarded', 'downy', 'spaz', 'cripple', 'midget',
+
+    # Other offensive or harmful
+    'nazi', 'hitler', 'pedo', 'pedophile', 'kill yourself', 'kys',
+    'nsfw'
+]
+
+# ===== TEXT NORMALIZATION =====
+
+# Common character substitutions (leetspeak)
+LEET_MAP = {
+    '@': 'a', '4': 'a',
+    '3': 'e',
+    '1': 'i', '!': 'i',
+    '0': 'o',
+    '$': 's', '5': 's',
+    '7': 't',
+    '8': 'b'
+}
+
+# Lookalike letters from other scripts that render like Latin ones
+HOMOGLYPH_MAP = {
+    # Greek capitals whose lowercase forms look like different Latin letters
+    'Η': 'h', 'Μ': 'm', 'Ν': 'n', 'Υ': 'y', 'Ζ': 'z',
+    # Cyrillic
+    'а': 'a', 'в': 'b', 'е': 'e', 'ё': 'e', 'һ': 'h', 'н': 'h', 'і': 'i', 'ї': 'i',
+    'ј': 'j', 'к': 'k', 'м': 'm', 'о': 'o', 'р': 'p', 'ԛ': 'q', 'с': 'c', 'ѕ': 's',
+    'т': 't', 'у': 'y', 'ү': 'y', 'х': 'x', 'ԁ': 'd', 'ԝ': 'w', 'ɡ': 'g',
+    # Greek
+    'α': 'a', 'β': 'b', 'ε': 'e', 'η': 'n', 'ι': 'i', 'κ': 'k', 'μ': 'u', 'ν': 'v',
+    'ο': 'o', 'ρ': 'p', 'τ': 't', 'υ': 'u', 'χ': 'x', 'ς': 's',
+    # Armenian
+    'ա': 'w', 'հ': 'h', 'լ': 'l', 'ո': 'n', 'ռ': 'n', 'ս': 'u', 'ց': 'g', 'ք': 'p',
+    'զ': 'q', 'օ': 'o',
+    # Latin letters that don't decompose to ASCII
+    'ß': 'ss', 'ı': 'i', 'ł': 'l', 'ø': 'o', 'đ': 'd', 'ħ': 'h', 'æ': 'ae', 'œ': 'oe',
+}
+
+def _fold_char(char):
+    """Fold one character down to a-z letters, a space, or nothing"""
+    folded = []
+    # NFKD splits accents off (é -> e + U+0301) and folds fullwidth/compatibility forms (ｆ -> f)
+    for part in unicodedata.normalize('NFKD', char):
+        part = HOMOGLYPH_MAP.get(part, part).lower()
+        part = HOMOGLYPH_MAP.get(part, part)
+        part = LEET_MAP.get(part, part)
+        if part.isascii() and part.isalpha():
+            folded.append(part)
+        elif part.isspace():
+            folded.append(' ')
+    return ''.join(folded) or None  # None makes str.translate drop the character
+
+class _FoldTable(dict):
+    """str.translate table that folds characters outside the prebuilt ranges on first sight"""
+
+    def __missing__(self, codepoint):
+        value = self[codepoint] = _fold_char(chr(codepoint))
+        return value
+
+# Prebuild the ranges chat actually uses: Latin, general punctuation, Greek, Cyrillic,
+# Armenian and fullwidth forms. Anything else (emoji, CJK...) is folded lazily and cached.
+_FOLD_TABLE = _FoldTable()
+for _start, _end in ((0x0000, 0x0250), (0x0370, 0x0590), (0x2000, 0x2070), (0xFF00, 0xFFF0)):
+    for _codepoint in range(_start, _end):
+        _FOLD_TABLE[_codepoint] = _fold_char(chr(_codepoint))
+
+_SPACE_RUN = re.compile(' {2,}')
+
+def normalize_text(text):
+    """Remove special characters and normalize text for bad word detection"""
+    # One pass does lowercasing, leetspeak, accent/fullwidth/homoglyph folding
+    # and strips everything that isn't a letter or whitespace
+    normalized = text.translate(_FOLD_TABLE)
+    # Remove extra spaces
+    if '  ' in normalized:
+        normalized = _SPACE_RUN.sub(' ', normalized)
+    return normalized.strip(' ')
+
+# ===== MATCHER ENGINE =====
+
+def _trie_pattern(words):
+    """Build a regex body from a prefix trie so shared prefixes are only scanned once"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True  # End of a term
+
+    def walk(node):
+        is_end = '' in node
+        branches = [re.escape(char) + walk(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if is_end:
+            # Shorter term also ends here, so the rest is optional
+            body = '(?:' + body + ')?'
+        return body
+
+    return walk(trie)
+
+_matcher_serials = itertools.count(1)
+
+class BadWordMatcher:
+    """One compiled pattern for a whole word list, scanned in a single pass"""
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self.serial = next(_matcher_serials)  # Unique per compiled matcher, used in cache keys
+        terms = sorted({word.lower() for word in self.words if word})
+        if terms:
+            # \b on both sides keeps whole-word semantics ("class" never matches "ass"),
+            # and multi-word phrases match because normalized text uses single spaces
+            self._pattern = re.compile(r'\b(?:' + _trie_pattern(terms) + r')\b')
+        else:
+            self._pattern = None
+
+    def search(self, normalized):
+        """Return the first bad word found in already-normalized text, or None"""
+        if self._pattern is None:
+            return None
+        match = self._pattern.search(normalized)
+        return match.group(0) if match else None
+
+_MATCHER_CACHE_SIZE = 8
+_matcher_cache = OrderedDict()  # {normalized word tuple: BadWordMatcher}, least recently used first
+
+def _matcher_key(words):
+    """Order- and duplicate-insensitive key for a word list"""
+    return tuple(sorted(set(words)))
+
+def get_matcher(words):
+    """Return the compiled matcher for a word list, compiling it on first use"""
+    key = _matcher_key(words)
+    matcher = _matcher_cache.get(key)
+    if matcher is not None:
+        _matcher_cache.move_to_end(key)
+        return matcher
+    matcher = _matcher_cache[key] = BadWordMatcher(key)
+    if len(_matcher_cache) > _MATCHER_CACHE_SIZE:
+        _matcher_cache.popitem(last=False)
+    return matcher
+
+# ===== VERDICT CACHE =====
+
+_MISSING = object()
+
+class VerdictCache:
+    """Bounded LRU of bad word verdicts keyed by matcher and a hash of the raw message content"""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # {(matcher serial, content digest): matched word or None}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, text, matcher=None):
+        """Return the bad word found in text (or None), reusing earlier verdicts for identical text
+
+        Verdicts are stored per matcher, so a changed word list (a new matcher) never
+        sees verdicts computed with the old one.
+        """
+        if matcher is None:
+            matcher = get_matcher(BAD_WORDS)
+        key = (matcher.serial, hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+        verdict = self._entries.get(key, _MISSING)
+        if verdict is not _MISSING:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+        self.misses += 1
+        verdict = matcher.search(normalize_text(text))
+        self._entries[key] = verdict
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return verdict
+
+    def discard_matcher(self, matcher):
+        """Drop verdicts computed with a matcher that is no longer in use"""
+        stale = [key for key in self._entries if key[0] == matcher.serial]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += 1
+
+    def clear(self):
+        """Drop all cached verdicts"""
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self):
+        """Return counters for admin display"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# ===== PER-GUILD WORD FILTERS =====
+
+def _clean_terms(words):
+    """Lowercase, trim and dedupe terms, keeping their order"""
+    seen = {}
+    for word in words:
+        word = ' '.join(str(word).lower().split())
+        if word:
+            seen.setdefault(word, None)
+    return list(seen)
+
+class GuildFilter:
+    """Effective filter settings for one guild; replaced as a whole, never mutated"""
+    __slots__ = ('words', 'whitelist', 'threshold', 'matcher')
+
+    def __init__(self, words, whitelist, threshold, matcher):
+        self.words = words
+        self.whitelist = whitelist
+        self.threshold = threshold
+        self.matcher = matcher
+
+class MatcherRegistry:
+    """Compiled matchers shared by every guild with the same word list, reference counted"""
+
+    def __init__(self):
+        self._matchers = {}  # {sorted word tuple: [matcher, refcount]}
+
+    @staticmethod
+    def key(words):
+        return _matcher_key(words)
+
+    def get(self, key):
+        entry = self._matchers.get(key)
+        return entry[0] if entry else None
+
+    def acquire(self, key, matcher=None):
+        """Take a reference to the matcher for key (registering `matcher` if it is new)"""
+        entry = self._matchers.get(key)
+        if entry is None:
+            entry = self._matchers[key] = [matcher, 0]
+        entry[1] += 1
+        return entry[0]
+
+    def release(self, matcher):
+        """Drop a reference; returns True when the matcher is no longer used anywhere"""
+        key = self.key(matcher.words)
+        entry = self._matchers.get(key)
+        if entry is None or entry[0] is not matcher:
+            return False
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._matchers[key]
+            return True
+        return False
+
+    def __len__(self):
+        return len(self._matchers)
+
+class WordFilterManager:
+    """Per-guild bad word lists, whitelisted channels and thresholds, editable at runtime
+
+    Guild settings are stored as overrides of the defaults in a JSON file that is also
+    watched for manual edits. New word lists are compiled in a worker thread and then
+    swapped in with plain assignments, so on_message never waits on a compile and
+    always sees either the old or the new filter, never a mix.
+    """
+
+    def __init__(self, path, default_words, default_whitelist=(), default_threshold=15, on_retire=None):
+        self.path = path
+        self.default_words = _clean_terms(default_words)
+        self.default_whitelist = frozenset(default_whitelist)
+        self.default_threshold = default_threshold
+        self.on_retire = on_retire  # Called with each matcher that falls out of use
+        self.registry = MatcherRegistry()
+        self._overrides = {}  # {guild_id: {"add_words": [...], "remove_words": [...], "whitelist_channels": [...], "threshold": n}}
+        self._filters = {}  # {guild_id: GuildFilter}
+        self._mtime = None
+        self._lock = asyncio.Lock()  # Serializes reloads/edits (never taken by on_message)
+        key = MatcherRegistry.key(self.default_words)
+        self.default = GuildFilter(
+            tuple(self.default_words), self.default_whitelist, default_threshold,
+            self.registry.acquire(key, get_matcher(key))
+        )
+
+    def for_guild(self, guild_id):
+        """Current filter for a guild (the defaults if it has no overrides)"""
+        return self._filters.get(guild_id, self.default)
+
+    def overrides(self, guild_id):
+        return self._overrides.get(guild_id, {})
+
+    def _effective(self, override):
+        removed = set(_clean_terms(override.get("remove_words", [])))
+        words = [w for w in self.default_words if w not in removed]
+        words = tuple(_clean_terms(words + override.get("add_words", [])))
+        whitelist = self.default_whitelist | {int(c) for c in override.get("whitelist_channels", [])}
+        threshold = override.get("threshold") or self.default_threshold
+        return words, whitelist, threshold
+
+    async def _apply(self, overrides):
+        """Compile whatever is missing off the event loop, then swap every guild's filter at once"""
+        planned = {guild_id: self._effective(override) for guild_id, override in overrides.items() if override}
+        compiled = {}
+        for words, _, _ in planned.values():
+            key = MatcherRegistry.key(words)
+            if key not in compiled and self.registry.get(key) is None:
+                compiled[key] = await asyncio.to_thread(BadWordMatcher, key)
+
+        # No awaits from here on: the swap is atomic as far as other handlers can tell
+        old_filters = self._filters
+        new_filters = {}
+        for guild_id, (words, whitelist, threshold) in planned.items():
+            key = MatcherRegistry.key(words)
+            matcher = self.registry.acquire(key, compiled.get(key))
+            new_filters[guild_id] = GuildFilter(words, frozenset(whitelist), threshold, matcher)
+        self._overrides = {guild_id: override for guild_id, override in overrides.items() if override}
+        self._filters = new_filters
+        for old in old_filters.values():
+            if self.registry.release(old.matcher) and self.on_retire:
+                self.on_retire(old.matcher)
+
+    def _read_file(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {int(guild_id): override for guild_id, override in data.get("guilds", {}).items()}
+
+    def _write_file(self):
+        data = {"guilds": {str(guild_id): override for guild_id, override in self._overrides.items()}}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    async def reload_if_changed(self):
+        """Pick up manual edits to the config file; returns True if anything was reloaded"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False  # No file yet, defaults everywhere
+        if mtime == self._mtime:
+            return False
+        async with self._lock:
+            try:
+                overrides = await asyncio.to_thread(self._read_file)
+            except Exception as e:
+                print(f"Error reading word filter config: {e}")
+                self._mtime = mtime  # Don't retry a broken file every tick
+                return False
+            await self._apply(overrides)
+            self._mtime = mtime
+        print(f"Loaded word filter overrides for {len(self._overrides)} guild(s)")
+        return True
+
+    async def update(self, guild_id, add_words=(), remove_words=(), whitelist=None, threshold=None):
+        """Edit one guild's overrides, persist them and swap in the new filter
+
+        `whitelist` is a {channel_id: bool} mapping of channels to add or remove.
+        """
+        async with self._lock:
+            override = {key: list(value) if isinstance(value, list) else value
+                        for key, value in self._overrides.get(guild_id, {}).items()}
+            added = _clean_terms(override.get("add_words", []))
+            removed = _clean_terms(override.get("remove_words", []))
+            for word in _clean_terms(add_words):
+                if word in removed:
+                    removed.remove(word)
+                if word not in self.default_words and word not in added:
+                    added.append(word)
+            for word in _clean_terms(remove_words):
+                if word in added:
+                    added.remove(word)
+                if word in self.default_words and word not in removed:
+                    removed.append(word)
+            override["add_words"] = added
+            override["remove_words"] = removed
+
+            channels = set(override.get("whitelist_channels", []))
+            for channel_id, enabled in (whitelist or {}).items():
+                if enabled:
+                    channels.add(channel_id)
+                else:
+                    channels.discard(channel_id)
+            override["whitelist_channels"] = sorted(channels)
+            if threshold is not None:
+                override["threshold"] = threshold
+
+            override = {key: value for key, value in override.items() if value}
+            overrides = dict(self._overrides)
+            overrides[guild_id] = override
+            await self._apply(overrides)
+            await asyncio.to_thread(self._write_file)
+        return self.for_guild(guild_id)
+
+    def stats(self):
+        """Return counters for admin display"""
+        return {"guilds": len(self._filters), "matchers": len(self.registry)}
+
+# ===== MODERATION ACTION QUEUE =====
+
+BULK_DELETE_LIMIT = 100  # Discord accepts at most 100 messages per bulk delete
+BULK_DELETE_MAX_AGE = timedelta(days=13, hours=23)  # Bulk delete rejects messages older than 14 days
+
+class ModerationQueue:
+    """Bounded queue of moderation actions worked off the event handlers
+
+    Deletions always go before notifications (DMs, embeds, timeouts), and pending
+    deletions for the same channel are coalesced into one bulk delete call.
+    """
+
+    def __init__(self, max_pending=1000, workers=2):
+        self.max_pending = max_pending
+        self.workers = workers
+        self._pending_deletes = {}  # {channel_id: [(enqueued_at, message), ...]} in arrival order
+        self._pending_actions = deque()  # [(enqueued_at, coroutine function, args), ...]
+        self._busy_channels = set()  # Channels a worker is currently bulk deleting in
+        self._slots = None  # Semaphore limiting queued actions (backpressure), created on start
+        self._wakeup = None
+        self._tasks = []
+        self._latencies = deque(maxlen=500)  # Recent enqueue -> done latencies in seconds
+        self.deleted = 0
+        self.delete_calls = 0
+        self.actions_run = 0
+        self.failures = 0
+
+    def start(self):
+        """Start the worker tasks (safe to call again, e.g. on reconnect)"""
+        if self._tasks and not all(task.done() for task in self._tasks):
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    @property
+    def depth(self):
+        """Number of actions waiting to be worked"""
+        return sum(len(batch) for batch in self._pending_deletes.values()) + len(self._pending_actions)
+
+    async def delete(self, message):
+        """Queue a message for deletion (waits only if the queue is full)"""
+        if not self._tasks:
+            self.start()
+        await self._slots.acquire()
+        self._pending_deletes.setdefault(message.channel.id, []).append((time.monotonic(), message))
+        self._wakeup.set()
+
+    async def submit(self, func, *args):
+        """Queue a lower-priority coroutine call such as a warning DM"""
+        if not self._tasks:
+            self.start()
+        await self._slots.acquire()
+        self._pending_actions.append((time.monotonic(), func, args))
+        self._wakeup.set()
+
+    def _next_channel(self):
+        for channel_id in self._pending_deletes:
+            if channel_id not in self._busy_channels:
+                return channel_id
+        return None
+
+    async def _worker(self):
+        while True:
+            try:
+                channel_id = self._next_channel()
+                if channel_id is not None:
+                    await self._run_deletes(channel_id)
+                elif self._pending_actions:
+                    await self._run_action(*self._pending_actions.popleft())
+                else:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+            except Exception as e:
+                print(f"Moderation worker error: {e}")
+
+    async def _run_deletes(self, channel_id):
+        pending = self._pending_deletes.pop(channel_id)
+        batch, rest = pending[:BULK_DELETE_LIMIT], pending[BULK_DELETE_LIMIT:]
+        if rest:
+            # Put the overflow back at the end so other channels get a turn
+            self._pending_deletes[channel_id] = rest
+        self._busy_channels.add(channel_id)
+        try:
+            cutoff = datetime.now(timezone.utc) - BULK_DELETE_MAX_AGE
+            recent = [message for _, message in batch if message.created_at > cutoff]
+            old = [message for _, message in batch if message.created_at <= cutoff]
+            if len(recent) > 1:
+                try:
+                    await recent[0].channel.delete_messages(recent, reason="Bad word filter")
+                    self.delete_calls += 1
+                    self.deleted += len(recent)
+                except Exception as e:
+                    print(f"Bulk delete failed in channel {channel_id}, deleting one by one: {e}")
+                    old.extend(recent)
+            else:
+                old.extend(recent)
+            for message in old:
+                try:
+                    await message.delete()
+                    self.deleted += 1
+                except Exception as e:
+                    self.failures += 1
+                    print(f"Error deleting message {message.id}: {e}")
+                self.delete_calls += 1
+        finally:
+            self._busy_channels.discard(channel_id)
+            now = time.monotonic()
+            for enqueued_at, _ in batch:
+                self._latencies.append(now - enqueued_at)
+                self._slots.release()
+
+    async def _run_action(self, enqueued_at, func, args):
+        try:
+            await func(*args)
+            self.actions_run += 1
+        except Exception as e:
+            self.failures += 1
+            print(f"Error running moderation action {func.__name__}: {e}")
+        finally:
+            self._latencies.append(time.monotonic() - enqueued_at)
+            self._slots.release()
+
+    def stats(self):
+        """Return queue metrics for admin display"""
+        latencies = sorted(self._latencies)
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+        return {
+            "depth": self.depth,
+            "max_pending": self.max_pending,
+            "deleted": self.deleted,
+            "delete_calls": self.delete_calls,
+            "actions_run": self.actions_run,
+            "failures": self.failures,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+# ===== FLOOD DETECTION =====
+
+FLOOD_OK = 'ok'
+FLOOD_USER = 'user'  # Author is over their rate
+FLOOD_CHANNEL = 'channel'  # Channel as a whole is over its rate (raid)
+FLOOD_ESCALATE = 'escalate'  # Author kept flooding after being throttled
+
+class TokenBucketLimiter:
+    """Per-key token buckets allowing `capacity` messages per `per_seconds`, O(1) per check"""
+
+    def __init__(self, capacity, per_seconds, max_keys=10000):
+        self.capacity = capacity
+        self.rate = capacity / per_seconds  # Tokens regained per second
+        self.max_keys = max_keys
+        self._buckets = {}  # {key: [tokens, last_refill]}
+
+    def allow(self, key, now=None):
+        """Take one token for key; False means the key is over its rate"""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            self._buckets[key] = [self.capacity - 1, now]
+            return True
+
+        tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _prune(self, now):
+        # A bucket idle long enough to refill completely is the same as no bucket
+        idle = self.capacity / self.rate
+        self._buckets = {key: b for key, b in self._buckets.items() if now - b[1] < idle}
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()  # Still full of active keys, start over rather than grow
+
+class FloodDetector:
+    """Rate limits messages per author and per channel, escalating repeat offenders"""
+
+    def __init__(self, user_limit=(4, 3.0), channel_limit=(30, 5.0), strikes_to_escalate=3, strike_window=30.0):
+        self.users = TokenBucketLimiter(*user_limit)
+        self.channels = TokenBucketLimiter(*channel_limit)
+        self.strikes_to_escalate = strikes_to_escalate
+        self.strike_window = strike_window
+        self._strikes = {}  # {author_id: [count, first_strike_at]}
+        self.dropped = 0
+        self.escalations = 0
+
+    def check(self, author_id, channel_id, now=None):
+        """Classify one message as FLOOD_OK, FLOOD_USER, FLOOD_CHANNEL or FLOOD_ESCALATE"""
+        now = time.monotonic() if now is None else now
+        if not self.users.allow(author_id, now):
+            self.dropped += 1
+            strike = self._strikes.get(author_id)
+            if strike is None or now - strike[1] > self.strike_window:
+                strike = self._strikes[author_id] = [0, now]
+            strike[0] += 1
+            if strike[0] >= self.strikes_to_escalate:
+                del self._strikes[author_id]
+                self.escalations += 1
+                return FLOOD_ESCALATE
+            return FLOOD_USER
+        if not self.channels.allow(channel_id, now):
+            self.dropped += 1
+            return FLOOD_CHANNEL
+        return FLOOD_OK
+
+    def stats(self):
+        """Return counters for admin display"""
+        return {"dropped": self.dropped, "escalations": self.escalations, "tracked_users": len(self.users)}
+
+# ===== NEAR-DUPLICATE SPAM DETECTION =====
+
+_HASH_MASK = (1 << 64) - 1
+
+def shingles(words, max_words=256):
+    """Word unigrams and bigrams of a normalized message's words"""
+    words = words[:max_words]
+    features = set(words)
+    features.update(zip(words, words[1:]))
+    return features
+
+def minhash_signature(features, slots=16):
+    """One-permutation MinHash signature of a feature set
+
+    Each feature hash is routed to a slot by its low bits and the slot keeps the
+    minimum of the high bits, so one pass stands in for `slots` separate hash
+    functions. Empty slots borrow from the next filled one (rotation densification).
+    """
+    signature = [None] * slots
+    for feature in features:
+        h = hash(feature) & _HASH_MASK
+        slot = h % slots
+        value = h >> 32
+        current = signature[slot]
+        if current is None or value < current:
+            signature[slot] = value
+    if None in signature:
+        for slot in range(slots):
+            if signature[slot] is None:
+                for offset in range(1, slots):
+                    borrowed = signature[(slot + offset) % slots]
+                    if borrowed is not None:
+                        signature[slot] = borrowed + offset * 0x9E3779B9  # Keep borrowed copies distinct
+                        break
+    return tuple(signature)
+
+class SpamFingerprinter:
+    """Time-bucketed MinHash/LSH index that flags near-identical messages posted by several authors
+
+    Signatures are split into bands; messages sharing any band exactly become candidates,
+    and candidates count as duplicates when their estimated Jaccard similarity clears
+    `min_similarity`. Each lookup is a handful of dict hits, and old time buckets are
+    dropped whole to stay under `max_entries`.
+    """
+
+    def __init__(self, window=60.0, bucket_seconds=10.0, min_similarity=0.6, min_authors=3,
+                 min_words=6, max_entries=5000, max_candidates=100, bands=8, rows=2):
+        self.window = window
+        self.bucket_seconds = bucket_seconds
+        self.min_similarity = min_similarity
+        self.min_authors = min_authors
+        self.min_words = min_words
+        self.max_entries = max_entries
+        self.max_candidates = max_candidates
+        self.bands = bands
+        self.rows = rows
+        self._min_matches = min_similarity * bands * rows
+        self._buckets = deque()  # [[bucket_id, {band key: [entry, ...]}, entry_count], ...]
+        self._entries = 0
+        self.clusters = 0
+        self.flagged = 0
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band,) + signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    def _expire(self, now):
+        oldest = int((now - self.window) // self.bucket_seconds)
+        while self._buckets and self._buckets[0][0] < oldest:
+            self._entries -= self._buckets.popleft()[2]
+
+    def check(self, normalized, author_id, item, now=None):
+        """Index one message; returns the items to remove if it belongs to a spam cluster, else []
+
+        `item` is whatever the caller wants back (e.g. the discord.Message).
+        """
+        words = normalized.split()
+        if len(words) < self.min_words:
+            return []  # Short chatter ("gg", "good morning everyone") is legitimately repeated
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        signature = minhash_signature(shingles(words), self.bands * self.rows)
+        keys = self._band_keys(signature)
+
+        matches = {}
+        seen = set()
+        for _, index, _ in self._buckets:
+            for key in keys:
+                for entry in index.get(key, ()):
+                    if id(entry) in seen:
+                        continue
+                    seen.add(id(entry))
+                    same = sum(1 for x, y in zip(entry[0], signature) if x == y)
+                    if same >= self._min_matches:
+                        matches[id(entry)] = entry
+                        if entry[3]:
+                            break  # Part of a known cluster, nothing more to learn
+                    if len(seen) >= self.max_candidates:
+                        break  # Bound the work per message even when the index is saturated
+                else:
+                    continue
+                break
+            else:
+                continue
+            break
+
+        entry = [signature, author_id, item, False]  # [signature, author, item, flagged]
+        self._add(entry, keys, now)
+
+        if not matches:
+            return []
+        already_flagged = any(match[3] for match in matches.values())
+        authors = {match[1] for match in matches.values()}
+        authors.add(author_id)
+        if not already_flagged and len(authors) < self.min_authors:
+            return []
+
+        if not already_flagged:
+            self.clusters += 1
+        flagged = [match for match in matches.values() if not match[3]] + [entry]
+        for match in flagged:
+            match[3] = True
+        self.flagged += len(flagged)
+        return [match[2] for match in flagged]
+
+    def _add(self, entry, keys, now):
+        bucket_id = int(now // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] != bucket_id:
+            self._buckets.append([bucket_id, {}, 0])
+        # Hard memory cap: drop whole old buckets first
+        while self._entries >= self.max_entries and len(self._buckets) > 1:
+            self._entries -= self._buckets.popleft()[2]
+        bucket = self._buckets[-1]
+        if bucket[2] >= self.max_entries:
+            return  # Current bucket alone is at the cap; stop indexing until it rolls over
+        for key in keys:
+            bucket[1].setdefault(key, []).append(entry)
+        bucket[2] += 1
+        self._entries += 1
+
+    def stats(self):
+        """Return counters for admin display"""
+        return {"indexed": self._entries, "clusters": self.clusters, "flagged": self.flagged}
+
+# ===== WARNING LEDGER =====
+
+class Violation:
+    """One flagged message, with its content truncated"""
+    __slots__ = ('content', 'channel', 'timestamp')
+
+    def __init__(self, content, channel, timestamp):
+        self.content = content
+        self.channel = channel
+        self.timestamp = timestamp
+
+class UserWarnings:
+    """Decaying violation score plus a fixed-size ring buffer of recent violations"""
+    __slots__ = ('score', 'updated_at', 'timeouts', 'total', '_recent', '_next')
+
+    def __init__(self, history_size):
+        self.score = 0.0
+        self.updated_at = 0.0
+        self.timeouts = 0  # Warnings issued since the last timeout
+        self.total = 0  # Lifetime violations
+        self._recent = [None] * history_size
+        self._next = 0
+
+    def push(self, violation):
+        self._recent[self._next] = violation
+        self._next = (self._next + 1) % len(self._recent)
+
+    def recent(self):
+        """Violations in the buffer, oldest first"""
+        ordered = self._recent[self._next:] + self._recent[:self._next]
+        return [violation for violation in ordered if violation is not None]
+
+    def clear_recent(self):
+        self._recent = [None] * len(self._recent)
+        self._next = 0
+
+class WarningLedger:
+    """Per-user warning records that survive restarts
+
+    Scores decay with a half-life, computed lazily from each record's last update, so
+    nothing has to sweep the ledger. Every change appends that user's record to a JSONL
+    file from a worker thread (write-behind, like Storage); loading keeps the last line
+    per user and the file is compacted when it grows.
+    """
+
+    def __init__(self, path, half_life_hours=24.0, history_size=5, max_content=100):
+        self.path = path
+        self.half_life = half_life_hours * 3600
+        self.history_size = history_size
+        self.max_content = max_content
+        self._users = {}  # {user_id: UserWarnings}
+        self._active = set()  # Users whose score may still be above zero
+        self._log = None
+        self._log_lines = 0
+        self._dirty = {}  # {user_id: serialized record} waiting to be appended
+        self._flush_task = None
+
+    def _decayed(self, record, now):
+        if record.score and now > record.updated_at:
+            return record.score * 0.5 ** ((now - record.updated_at) / self.half_life)
+        return record.score
+
+    def score(self, user_id, now=None):
+        """Current (decayed) violation score for a user"""
+        record = self._users.get(user_id)
+        return self._decayed(record, time.time() if now is None else now) if record else 0.0
+
+    def get(self, user_id):
+        """Return the user's record or None"""
+        return self._users.get(user_id)
+
+    def add_violation(self, user_id, content, channel, now=None):
+        """Record one violation and return the user's new score"""
+        now = time.time() if now is None else now
+        record = self._users.get(user_id)
+        if record is None:
+            record = self._users[user_id] = UserWarnings(self.history_size)
+        record.score = self._decayed(record, now) + 1
+        record.updated_at = now
+        record.total += 1
+        record.push(Violation(content[:self.max_content], channel, now))
+        self._active.add(user_id)
+        self._persist(user_id)
+        return record.score
+
+    def reset_score(self, user_id):
+        """Start the score and recent history over (after a warning or a manual clear)"""
+        record = self._users.get(user_id)
+        if record is None:
+            return
+        record.score = 0.0
+        record.updated_at = time.time()
+        record.clear_recent()
+        self._active.discard(user_id)
+        self._persist(user_id)
+
+    def add_timeout_strike(self, user_id):
+        """Count one issued warning toward a timeout and return the running count"""
+        record = self._users.get(user_id)
+        if record is None:
+            record = self._users[user_id] = UserWarnings(self.history_size)
+        record.timeouts += 1
+        self._persist(user_id)
+        return record.timeouts
+
+    def reset_timeout_strikes(self, user_id):
+        record = self._users.get(user_id)
+        if record is not None:
+            record.timeouts = 0
+            self._persist(user_id)
+
+    def top(self, limit=10, min_score=0.5, now=None):
+        """Highest current scores as [(user_id, score)], looking only at active users"""
+        now = time.time() if now is None else now
+        scored = []
+        for user_id in list(self._active):
+            score = self._decayed(self._users[user_id], now)
+            if score < min_score:
+                self._active.discard(user_id)  # Decayed away, stop looking at it
+            else:
+                scored.append((user_id, score))
+        return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+    # ----- persistence -----
+
+    def _to_json(self, user_id, record):
+        return {
+            "user_id": user_id,
+            "score": round(record.score, 4),
+            "updated_at": record.updated_at,
+            "timeouts": record.timeouts,
+            "total": record.total,
+            "recent": [[v.content, v.channel, v.timestamp] for v in record.recent()],
+        }
+
+    def _persist(self, user_id):
+        # Write-behind: serialize now, append from a worker thread so on_message never touches the disk
+        self._dirty[user_id] = json.dumps(self._to_json(user_id, self._users[user_id]))
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No event loop (startup/shutdown): write through
+            self._write(self._take_lines())
+
+    def _take_lines(self):
+        lines, self._dirty = list(self._dirty.values()), {}
+        return lines
+
+    async def _flush_later(self):
+        # Keep going while violations arrive during a write
+        while self._dirty:
+            await self.flush()
+
+    async def flush(self):
+        """Append every changed record, compacting the file instead when it has grown too long"""
+        lines = self._take_lines()
+        if not lines:
+            return
+        compacted = None
+        if self._log_lines + len(lines) > 1000 and self._log_lines + len(lines) > 4 * len(self._users):
+            compacted = self._compacted_lines()  # Snapshot on the loop; already includes the changed records
+        try:
+            self._log_lines = await asyncio.to_thread(self._write, lines, compacted)
+        except Exception as e:
+            print(f"Error saving warning ledger: {e}")
+
+    def _write(self, lines, compacted=None):
+        """Append lines, or replace the file with compacted lines; returns the file's line count (blocking)"""
+        if compacted is not None:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(line + '\n' for line in compacted)
+            os.replace(tmp_path, self.path)
+            return len(compacted)
+        if self._log is None:
+            self._log = open(self.path, 'a', encoding='utf-8')
+        self._log.writelines(line + '\n' for line in lines)
+        self._log.flush()
+        return self._log_lines + len(lines)
+
+    def load(self):
+        """Replay the ledger file, keeping the latest record per user (unreadable lines are skipped)"""
+        if not os.path.exists(self.path):
+            return
+        lines = 0
+        skipped = 0
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        data = json.loads(line)
+                        record = UserWarnings(self.history_size)
+                        record.score = float(data.get("score", 0.0))
+                        record.updated_at = float(data.get("updated_at", 0.0))
+                        record.timeouts = int(data.get("timeouts", 0))
+                        record.total = int(data.get("total", 0))
+                        for content, channel, timestamp in data.get("recent", [])[-self.history_size:]:
+                            record.push(Violation(content, channel, timestamp))
+                        user_id = int(data["user_id"])
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        skipped += 1  # Torn last line after a crash, or a corrupted record
+                        continue
+                    lines += 1
+                    self._users[user_id] = record
+        except Exception as e:
+            print(f"Error reading warning ledger, keeping the {len(self._users)} records read before it: {e}")
+        if skipped:
+            print(f"Skipped {skipped} unreadable line(s) in {self.path}")
+        self._active = {user_id for user_id, record in self._users.items() if record.score > 0}
+        self._log_lines = lines + skipped
+        print(f"Loaded warning records for {len(self._users)} users")
+
+    def _compacted_lines(self):
+        """Drop records with nothing left in them and serialize one line per remaining user"""
+        now = time.time()
+        for user_id in [uid for uid, r in self._users.items() if r.timeouts == 0 and self._decayed(r, now) < 0.01]:
+            del self._users[user_id]
+            self._active.discard(user_id)
+        return [json.dumps(self._to_json(user_id, record)) for user_id, record in self._users.items()]
+
+    def close(self):
+        """Write any records still waiting and close the file (blocking; for shutdown)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        if self._dirty:
+            self._log_lines = self._write(self._take_lines())
+        if self._log is not None:
+            self._log.close()
+            self._log = None
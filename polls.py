@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+
+class Poll:
+    """One contest registration poll: its message, deadline, registrations and in-progress sign-ups"""
+
+    __slots__ = ('message_id', 'channel_id', 'guild_id', 'question', 'expires_at', 'created_at', 'closed_at',
+                 'participants', 'pending')
+
+    def __init__(self, message_id, channel_id=None, guild_id=None, question=None, expires_at=None,
+                 created_at=None, closed_at=None, participants=None, pending=None):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.question = question
+        self.expires_at = expires_at  # Aware UTC datetime or None (never expires)
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+        self.closed_at = closed_at  # Set once the expiry job has announced the close
+        self.participants = participants if participants is not None else {}  # {user_id: {"name", "kaggle_id", ...}}
+        self.pending = pending if pending is not None else {}  # {user_id: {"timestamp"}}: Kaggle ID form opened, not submitted
+
+    def is_open(self, now=None):
+        """True while the poll still takes registrations"""
+        if self.closed_at:
+            return False
+        return self.expires_at is None or (now or datetime.now(timezone.utc)) < self.expires_at
+
+    def to_record(self):
+        return {
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "question": self.question,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "created_at": self.created_at,
+            "closed_at": self.closed_at,
+            # Copied down to the rows; serialized later on the storage thread while handlers keep editing.
+            # Registrations are stored one row each (see PollRegistry.save_participant)
+            "pending": {user_id: dict(data) for user_id, data in self.pending.items()},
+        }
+
+    @classmethod
+    def from_record(cls, message_id, record):
+        expires_at = datetime.fromisoformat(record["expires_at"]) if record.get("expires_at") else None
+        return cls(message_id, record.get("channel_id"), record.get("guild_id"), record.get("question"), expires_at,
+                   record.get("created_at"), record.get("closed_at"), record.get("participants") or {},
+                   record.get("pending") or {})
+
+class PollRegistry:
+    """Every contest poll, persisted through storage
+
+    `active_ids` holds the message ids of polls that haven't been closed yet. The
+    Join/Leave buttons share one persistent view across every poll message, so clicks
+    are matched to their poll with a lookup in that set, without touching the message.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._polls = {}  # {message_id: Poll}, oldest first
+        self.active_ids = set()
+
+    def load(self):
+        """Load polls from storage (blocking; for startup)"""
+        records = self.storage.load_polls()
+        for message_id, record in sorted(records.items(), key=lambda item: item[1].get("created_at") or ""):
+            self._track(Poll.from_record(message_id, record))
+        return len(self._polls)
+
+    def get(self, message_id):
+        return self._polls.get(message_id)
+
+    def __contains__(self, message_id):
+        return message_id in self._polls
+
+    def __iter__(self):
+        return iter(list(self._polls.values()))
+
+    def __len__(self):
+        return len(self._polls)
+
+    def latest(self):
+        """The most recently created poll, or None"""
+        return next(reversed(self._polls.values()), None)
+
+    def add(self, poll):
+        self._track(poll)
+        self.save(poll)
+        for user_id in poll.participants:
+            self.save_participant(poll, user_id)
+
+    def _track(self, poll):
+        self._polls[poll.message_id] = poll
+        if not poll.closed_at:
+            self.active_ids.add(poll.message_id)
+
+    def save(self, poll):
+        """Persist the poll itself (deadline, state, sign-ups in progress); registrations are saved per user"""
+        self.storage.upsert_poll(poll.message_id, poll.to_record())
+
+    def save_participant(self, poll, user_id):
+        """Persist one user's registration, or its removal"""
+        data = poll.participants.get(user_id)
+        if data is None:
+            self.storage.delete_poll_participant(poll.message_id, user_id)
+        else:
+            self.storage.upsert_poll_participant(poll.message_id, user_id, data)
+
+    def close(self, poll):
+        """Stop taking registrations; sign-ups still in progress are dropped"""
+        poll.closed_at = datetime.now(timezone.utc).isoformat()
+        poll.pending.clear()
+        self.active_ids.discard(poll.message_id)
+        self.save(poll)
+
+    def remove(self, message_id):
+        poll = self._polls.pop(message_id, None)
+        if poll is not None:
+            self.active_ids.discard(message_id)
+            for user_id in poll.participants:
+                self.storage.delete_poll_participant(message_id, user_id)
+            self.storage.delete_poll(message_id)
+        return poll
+
+    def evict_pending(self, max_age, now=None):
+        """Drop sign-ups started more than max_age seconds ago and never finished; returns how many"""
+        now = now or datetime.now(timezone.utc)
+        evicted = 0
+        for message_id in list(self.active_ids):
+            poll = self._polls[message_id]
+            stale = [user_id for user_id, data in poll.pending.items()
+                     if _started(data) is None or (now - _started(data)).total_seconds() >= max_age]
+            for user_id in stale:
+                del poll.pending[user_id]
+            if stale:
+                evicted += len(stale)
+                self.save(poll)
+        return evicted
+
+    def stats(self):
+        active = [self._polls[message_id] for message_id in self.active_ids]
+        return {
+            "polls": len(self._polls),
+            "active": len(active),
+            "participants": sum(len(poll.participants) for poll in active),
+            "pending": sum(len(poll.pending) for poll in active),
+        }
+
+def _started(pending_data):
+    try:
+        return datetime.fromisoformat(pending_data["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+PAGE_SIZE = 100  # Public notebooks counted per profile (one API page)
+
+class ProfileEntry:
+    __slots__ = ('stats', 'fetched_at', 'retry_at')
+
+    def __init__(self, stats, fetched_at, retry_at=0.0):
+        self.stats = stats  # None until the first successful fetch
+        self.fetched_at = fetched_at
+        self.retry_at = retry_at  # After a failed refresh, don't queue again before this
+
+class ProfileStatsCache:
+    """Kaggle profile stats behind a bounded LRU with per-entry TTL
+
+    Lookups never call the API: peek() returns whatever is cached (possibly stale)
+    and queues a refresh when the entry is missing or past its TTL
+    (stale-while-revalidate). refresh_batch(), driven by a background loop, fetches
+    at most `batch_size` queued profiles per call, which rate-limits the API traffic.
+    Failed refreshes keep the stale stats and back off for `error_ttl` seconds.
+    """
+
+    def __init__(self, client, max_entries=1000, ttl=6 * 3600, batch_size=5, error_ttl=900):
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.error_ttl = error_ttl
+        self._entries = OrderedDict()  # {username: ProfileEntry}, least recently used first
+        self._queue = OrderedDict()  # Usernames waiting for a refresh, in order
+        self._waiters = {}  # {username: [Future]} for callers that want the result when it lands
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.errors = 0
+        self.evicted = 0
+
+    def peek(self, username, now=None):
+        """Return (stats or None, age in seconds or None) without calling the API"""
+        key = _key(username)
+        if not key:
+            return None, None
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self._enqueue(key)
+            return None, None
+        self._entries.move_to_end(key)
+        age = now - entry.fetched_at if entry.stats is not None else None
+        if entry.stats is None or age >= self.ttl:
+            self.stale += 1
+            if now >= entry.retry_at:
+                self._enqueue(key)
+        else:
+            self.hits += 1
+        return entry.stats, age
+
+    def prefetch(self, usernames):
+        """Queue refreshes for any of these profiles that are missing or stale"""
+        for username in usernames:
+            self.peek(username)
+
+    def wait(self, username):
+        """Future resolved with the stats once this profile's queued refresh finishes (moved to the front)"""
+        key = _key(username)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        self._queue[key] = None
+        self._queue.move_to_end(key, last=False)
+        return future
+
+    def _enqueue(self, key):
+        self._queue.setdefault(key, None)
+
+    async def refresh_batch(self):
+        """Fetch up to batch_size queued profiles concurrently; returns how many were refreshed"""
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            batch.append(self._queue.popitem(last=False)[0])
+        if not batch:
+            return 0
+        results = await asyncio.gather(*(self._fetch(key) for key in batch), return_exceptions=True)
+        now = time.time()
+        for key, result in zip(batch, results):
+            entry = self._entries.get(key)
+            if isinstance(result, Exception):
+                self.errors += 1
+                print(f"Kaggle profile refresh failed for {key}: {result}")
+                if entry is None:
+                    entry = self._store(key, ProfileEntry(None, now))
+                entry.retry_at = now + self.error_ttl
+            else:
+                self.refreshed += 1
+                entry = self._store(key, ProfileEntry(result, now))
+            for future in self._waiters.pop(key, []):
+                if not future.done():
+                    future.set_result(entry.stats)
+        return len(batch)
+
+    async def _fetch(self, key):
+        kernels, datasets = await asyncio.gather(
+            self.client.kernels_list(key, page_size=PAGE_SIZE),
+            self.client.dataset_list(key)
+        )
+        kernels, datasets = kernels or [], datasets or []
+        return {
+            "notebooks": len(kernels),
+            "notebooks_capped": len(kernels) >= PAGE_SIZE,
+            "notebook_votes": sum(_field(kernel, 'total_votes', 'totalVotes') for kernel in kernels),
+            "datasets": len(datasets),
+            "dataset_votes": sum(_field(dataset, 'vote_count', 'voteCount') for dataset in datasets),
+            "dataset_downloads": sum(_field(dataset, 'download_count', 'downloadCount') for dataset in datasets),
+        }
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._queue.pop(evicted, None)
+            self.evicted += 1
+        return entry
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "queued": len(self._queue),
+            "hits": self.hits,
+            "stale": self.stale,
+            "misses": self.misses,
+            "refreshed": self.refreshed,
+            "errors": self.errors,
+            "evicted": self.evicted,
+        }
+
+def _key(username):
+    return (username or "").strip().lower()
+
+def _field(item, *names):
+    # kaggle>=1.7 models use snake_case attributes, older releases camelCase
+    for name in names:
+        value = getattr(item, name, None)
+        if value is not None:
+            return value
+    return 0
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from collections import namedtuple
+
+RoleChanges = namedtuple('RoleChanges', 'role added removed failed')
+
+class RoleReconciler:
+    """Makes a role's holders match a desired set with the fewest Discord calls
+
+    reconcile() diffs the wanted member ids against the role's cached members and only
+    issues add/remove calls for the difference, so running it again with the same
+    holders costs nothing. Calls run concurrently, at most `concurrency` at a time and
+    paced to `rate` per second overall (role edits share a per-guild rate limit).
+    """
+
+    def __init__(self, concurrency=3, rate=2.0):
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._next_call = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.noops = 0
+
+    async def reconcile(self, guild, role, wanted_ids, reason=None):
+        """Add/remove `role` so exactly the members in wanted_ids hold it; returns RoleChanges"""
+        wanted_ids = set(wanted_ids)
+        current_ids = {member.id for member in role.members}
+        to_add = [guild.get_member(user_id) for user_id in wanted_ids - current_ids]
+        to_add = [member for member in to_add if member is not None]  # Left the server
+        to_remove = [member for member in role.members if member.id not in wanted_ids]
+        if not to_add and not to_remove:
+            self.noops += 1
+            return RoleChanges(role.name, [], [], [])
+
+        results = await asyncio.gather(
+            *(self._apply(member.add_roles, member, role, reason) for member in to_add),
+            *(self._apply(member.remove_roles, member, role, reason) for member in to_remove)
+        )
+        added = [member for member, ok in zip(to_add, results[:len(to_add)]) if ok]
+        removed = [member for member, ok in zip(to_remove, results[len(to_add):]) if ok]
+        failed = [member for member, ok in zip(to_add + to_remove, results) if not ok]
+        return RoleChanges(role.name, added, removed, failed)
+
+    async def _apply(self, method, member, role, reason):
+        async with self._semaphore:
+            await self._pace()
+            self.calls += 1
+            try:
+                await method(role, reason=reason)
+                return True
+            except Exception as e:
+                self.failures += 1
+                print(f"Role update failed for {member} ({role.name}): {e}")
+                return False
+
+    async def _pace(self):
+        now = time.monotonic()
+        slot = max(now, self._next_call)
+        self._next_call = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def stats(self):
+        return {"calls": self.calls, "failures": self.failures, "noops": self.noops}
@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime
+
+MAX_SLEEP = 300  # Re-check the heap at least this often (tolerates wall-clock jumps)
+RETRY_DELAYS = (60, 300, 1800)  # Seconds before re-running a failed job; dropped after the last one
+
+class Job:
+    __slots__ = ('key', 'kind', 'run_at', 'payload', 'attempts')
+
+    def __init__(self, key, kind, run_at, payload):
+        self.key = key
+        self.kind = kind
+        self.run_at = run_at
+        self.payload = payload
+        self.attempts = 0  # Failed runs so far (not persisted: a restart starts the count over)
+
+class Scheduler:
+    """Durable job scheduler: a heap of deadlines serviced by one task, persisted in storage
+
+    Jobs are identified by a caller-chosen key, so scheduling the same key again
+    replaces the old job (one poll expiry, one reminder per competition...).
+    Handlers are registered per kind and receive the job's JSON payload.
+    Jobs that came due while the bot was down run right after start().
+    A job stays in storage until its handler succeeds, so a crash mid-job runs it again
+    on the next start and a failing handler is retried (RETRY_DELAYS); handlers must
+    therefore be safe to run twice.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._handlers = {}
+        self._jobs = {}  # {key: Job}
+        self._heap = []  # [(run_at, seq, Job)]; replaced/cancelled jobs are skipped lazily
+        self._seq = itertools.count()
+        self._sleeper = None  # Future the loop sleeps on; resolved early by a new earliest job
+        self._task = None
+        self.ran = 0
+        self.failed = 0
+        self.caught_up = 0
+        self.max_lateness = 0.0
+
+    def job(self, kind):
+        """Decorator registering the coroutine handler for a job kind"""
+        def decorator(func):
+            self._handlers[kind] = func
+            return func
+        return decorator
+
+    async def start(self):
+        """Reload persisted jobs and start the loop (safe to call on every on_ready)"""
+        if self._task is not None and not self._task.done():
+            return
+        now = time.time()
+        for key, kind, run_at, payload in await self.storage.load_jobs():
+            if key not in self._jobs:  # Scheduled before start() wins over the stored copy
+                self._push(Job(key, kind, run_at, payload))
+                if run_at <= now:
+                    self.caught_up += 1
+        if self.caught_up:
+            print(f"Scheduler: catching up on {self.caught_up} overdue jobs")
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def schedule(self, key, kind, when, payload=None):
+        """Run handler `kind` with `payload` at `when` (datetime or epoch seconds)"""
+        run_at = when.timestamp() if isinstance(when, datetime) else float(when)
+        job = Job(key, kind, run_at, payload)
+        self.storage.upsert_job(key, kind, run_at, payload)
+        self._push(job)
+        if self._heap[0][2] is job:
+            self._wake()  # New earliest deadline
+        return job
+
+    def cancel(self, key):
+        """Drop a scheduled job; returns True if it existed"""
+        if self._jobs.pop(key, None) is None:
+            return False
+        self.storage.delete_job(key)
+        self._compact()
+        return True
+
+    def get(self, key):
+        return self._jobs.get(key)
+
+    def _push(self, job):
+        self._jobs[job.key] = job
+        heapq.heappush(self._heap, (job.run_at, next(self._seq), job))
+
+    def _wake(self):
+        if self._sleeper is not None and not self._sleeper.done():
+            self._sleeper.set_result(None)
+
+    def _compact(self):
+        # Rebuild once stale entries dominate, so heavy rescheduling can't grow the heap unbounded
+        if len(self._heap) > 2 * len(self._jobs) + 16:
+            self._heap = [entry for entry in self._heap if self._jobs.get(entry[2].key) is entry[2]]
+            heapq.heapify(self._heap)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job = heapq.heappop(self._heap)
+                if self._jobs.get(job.key) is not job:
+                    continue  # Cancelled or rescheduled
+                done = await self._execute(job, now)
+                if self._jobs.get(job.key) is not job:
+                    continue  # Cancelled or replaced while it ran; the new state is already stored
+                if done or job.attempts > len(RETRY_DELAYS):
+                    del self._jobs[job.key]
+                    self.storage.delete_job(job.key)
+                else:
+                    job.run_at = time.time() + RETRY_DELAYS[job.attempts - 1]
+                    self.storage.upsert_job(job.key, job.kind, job.run_at, job.payload)
+                    heapq.heappush(self._heap, (job.run_at, next(self._seq), job))
+            delay = min(self._heap[0][0] - time.time(), MAX_SLEEP) if self._heap else MAX_SLEEP
+            self._sleeper = loop.create_future()
+            timer = loop.call_later(max(delay, 0), self._wake)
+            try:
+                await self._sleeper
+            finally:
+                timer.cancel()
+
+    async def _execute(self, job, now):
+        """Run a job's handler; True if it finished (or can never run), False to retry"""
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            print(f"Scheduler: no handler for job kind '{job.kind}' ({job.key}), dropping")
+            self.failed += 1
+            return True
+        self.max_lateness = max(self.max_lateness, now - job.run_at)
+        try:
+            await handler(job.payload)
+            self.ran += 1
+            return True
+        except Exception as e:
+            self.failed += 1
+            job.attempts += 1
+            retry = f", retrying in {RETRY_DELAYS[job.attempts - 1]}s" if job.attempts <= len(RETRY_DELAYS) else ", giving up"
+            print(f"Scheduler: job {job.key} failed: {e}{retry}")
+            return False
+
+    def stats(self):
+        next_run = min((job.run_at for job in self._jobs.values()), default=None)
+        return {
+            "scheduled": len(self._jobs),
+            "next_in": max(0.0, next_run - time.time()) if next_run is not None else None,
+            "ran": self.ran,
+            "failed": self.failed,
+            "caught_up": self.caught_up,
+            "max_lateness": self.max_lateness,
+        }
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Row columns, one append-only file each: typecode per column
+ROW_COLUMNS = (("user", 'I'), ("score", 'd'), ("public", 'I'), ("private", 'I'))  # Ranks: 0 = unranked
+CHUNK_SNAPSHOTS = 256  # Snapshots read per batch by range scans
+
+class CompetitionHistory:
+    """Columnar score history for one competition
+
+    Rows (user index, score, public rank, private rank) go to one file per column.
+    A small snapshot index (timestamp, end row) stays in memory, so a time range maps
+    to a contiguous row slice by binary search and only that slice is read from disk.
+    The snapshot index is written last, which makes it the commit point: rows past
+    its end (a crash mid-append) are truncated on open.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.times = array('d')  # Snapshot timestamps (epoch seconds), ascending
+        self.ends = array('Q')  # Snapshot i covers rows [ends[i-1], ends[i])
+        self.users = []  # User index -> Discord user id
+        self.user_index = {}
+        self._load()
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _load(self):
+        for column, typecode in (("times", 'd'), ("ends", 'Q')):
+            values = getattr(self, column)
+            try:
+                with open(self._file(column), 'rb') as f:
+                    data = f.read()
+                values.frombytes(data[:len(data) - len(data) % values.itemsize])
+            except FileNotFoundError:
+                pass
+        count = min(len(self.times), len(self.ends))
+        del self.times[count:], self.ends[count:]
+        try:
+            with open(os.path.join(self.path, "users.json"), 'r') as f:
+                self.users = json.load(f)
+        except (OSError, ValueError):
+            self.users = []
+        self.user_index = {user_id: i for i, user_id in enumerate(self.users)}
+        # Drop anything written after the last committed snapshot
+        rows = self.ends[-1] if self.ends else 0
+        for name, typecode in ROW_COLUMNS:
+            with open(self._file(name), 'ab') as f:
+                f.truncate(rows * array(typecode).itemsize)
+        for column in ("times", "ends"):
+            with open(self._file(column), 'ab') as f:
+                f.truncate(count * getattr(self, column).itemsize)
+
+    def append(self, fetched_at, scores):
+        """Append one snapshot; returns False if it repeats the previous one (blocking)"""
+        if self.times and fetched_at <= self.times[-1]:
+            return False  # Same cached download served again
+        new_users = []
+        for player in scores:
+            if player["user_id"] not in self.user_index:
+                self.user_index[player["user_id"]] = len(self.users)
+                self.users.append(player["user_id"])
+                new_users.append(player["user_id"])
+        ordered = sorted(scores, key=lambda player: self.user_index[player["user_id"]])
+        columns = {
+            "user": array('I', (self.user_index[player["user_id"]] for player in ordered)),
+            "score": array('d', (player["score"] for player in ordered)),
+            "public": array('I', (_rank(player["public_rank"]) for player in ordered)),
+            "private": array('I', (_rank(player["private_rank"]) for player in ordered)),
+        }
+        if self.times and not new_users and self._same_as_last(columns):
+            return False  # Standings unchanged since the last snapshot
+        end = (self.ends[-1] if self.ends else 0) + len(ordered)
+        try:
+            if new_users:
+                _write_json(os.path.join(self.path, "users.json"), self.users)
+            for name, _ in ROW_COLUMNS:
+                with open(self._file(name), 'ab') as f:
+                    columns[name].tofile(f)
+            # Commit point: ends before times, so a torn write leaves the two out of step and is trimmed on load
+            with open(self._file("ends"), 'ab') as f:
+                array('Q', [end]).tofile(f)
+            with open(self._file("times"), 'ab') as f:
+                array('d', [fetched_at]).tofile(f)
+        except OSError:
+            self.times, self.ends = array('d'), array('Q')
+            self._load()  # Roll the files back to the last committed snapshot
+            raise
+        self.ends.append(end)
+        self.times.append(fetched_at)
+        return True
+
+    def _same_as_last(self, columns):
+        last = self._read_rows(self._start(len(self.times) - 1), self.ends[-1])
+        return all(last[name] == columns[name] for name, _ in ROW_COLUMNS)
+
+    def _start(self, snapshot):
+        return self.ends[snapshot - 1] if snapshot > 0 else 0
+
+    def _read_rows(self, start, end, names=None):
+        """Read rows [start, end) of the given columns, seeking past everything else"""
+        rows = {}
+        for name, typecode in ROW_COLUMNS:
+            if names and name not in names:
+                continue
+            values = array(typecode)
+            with open(self._file(name), 'rb') as f:
+                f.seek(start * values.itemsize)
+                values.fromfile(f, end - start)
+            rows[name] = values
+        return rows
+
+    def span(self, start=None, end=None):
+        """Snapshot numbers [lo, hi) with start <= timestamp <= end"""
+        lo = bisect_left(self.times, start) if start is not None else 0
+        hi = bisect_right(self.times, end) if end is not None else len(self.times)
+        return lo, hi
+
+    def snapshots(self, lo, hi, names=None):
+        """Yield (timestamp, rows) for snapshots [lo, hi), reading CHUNK_SNAPSHOTS at a time"""
+        for chunk_lo in range(lo, hi, CHUNK_SNAPSHOTS):
+            chunk_hi = min(hi, chunk_lo + CHUNK_SNAPSHOTS)
+            base = self._start(chunk_lo)
+            rows = self._read_rows(base, self.ends[chunk_hi - 1], names)
+            for snapshot in range(chunk_lo, chunk_hi):
+                start, end = self._start(snapshot) - base, self.ends[snapshot] - base
+                yield self.times[snapshot], {name: values[start:end] for name, values in rows.items()}
+
+    def progression(self, user_id, start=None, end=None):
+        """[(timestamp, score, public rank, private rank)] for one participant"""
+        index = self.user_index.get(user_id)
+        if index is None:
+            return []
+        points = []
+        for timestamp, rows in self.snapshots(*self.span(start, end)):
+            users = rows["user"]
+            # Rows are ordered by user index, so each snapshot is a binary search
+            position = bisect_left(users, index)
+            if position < len(users) and users[position] == index:
+                points.append((timestamp, rows["score"][position],
+                               rows["public"][position] or None, rows["private"][position] or None))
+        return points
+
+    def standings_at(self, snapshot):
+        """{user_id: (score, public rank)} at one snapshot"""
+        (_, rows), = self.snapshots(snapshot, snapshot + 1, ("user", "score", "public"))
+        return {
+            self.users[user]: (score, public or None)
+            for user, score, public in zip(rows["user"], rows["score"], rows["public"])
+        }
+
+    def movers(self, since, now=None):
+        """[(user_id, rank change, old rank, new rank)] between the standings at `since` and the latest,
+        biggest climbers first (positive change = moved up)"""
+        if not self.times:
+            return []
+        latest = bisect_right(self.times, now) - 1 if now is not None else len(self.times) - 1
+        baseline = max(0, bisect_right(self.times, since) - 1)  # Standings as they were when the window opened
+        if latest <= baseline:
+            return []
+        before, after = self.standings_at(baseline), self.standings_at(latest)
+        moves = []
+        for user_id, (_, new_rank) in after.items():
+            old_rank = before.get(user_id, (None, None))[1]
+            if old_rank and new_rank and old_rank != new_rank:
+                moves.append((user_id, old_rank - new_rank, old_rank, new_rank))
+        moves.sort(key=lambda move: -move[1])
+        return moves
+
+class ScoreHistory:
+    """Append-only score history for every competition, kept under one directory
+
+    Blocking file I/O runs in worker threads; a lock per competition keeps appends
+    in order. Queries only read the row slices for the requested time range.
+    """
+
+    def __init__(self, history_dir='score_history'):
+        self.history_dir = history_dir
+        self._competitions = {}  # {ref: CompetitionHistory}, opened lazily
+        self._locks = {}
+        self.appended = 0
+        self.skipped = 0
+
+    async def _open(self, competition):
+        history = self._competitions.get(competition)
+        if history is None:
+            path = os.path.join(self.history_dir, _safe_name(competition))
+            history = await asyncio.to_thread(CompetitionHistory, path)
+            history = self._competitions.setdefault(competition, history)
+        return history
+
+    async def record(self, result):
+        """Append a LeaderboardResult's scores as one snapshot (repeats of the same download are skipped)
+
+        Fuzzy matches are left out: the row may belong to someone else.
+        """
+        scores = [score for score in result.scores if score.get("matched") != "fuzzy"]
+        if not scores:
+            return False
+        lock = self._locks.setdefault(result.competition, asyncio.Lock())
+        async with lock:
+            history = await self._open(result.competition)
+            added = await asyncio.to_thread(history.append, result.fetched_at, scores)
+        if added:
+            self.appended += 1
+        else:
+            self.skipped += 1
+        return added
+
+    async def progression(self, competition, user_id, start=None, end=None):
+        history = await self._open(competition)
+        return await asyncio.to_thread(history.progression, user_id, start, end)
+
+    async def movers(self, competition, since, now=None):
+        history = await self._open(competition)
+        return await asyncio.to_thread(history.movers, since, now)
+
+    def stats(self):
+        return {
+            "competitions": len(self._competitions),
+            "snapshots": sum(len(history.times) for history in self._competitions.values()),
+            "rows": sum(history.ends[-1] for history in self._competitions.values() if history.ends),
+            "appended": self.appended,
+            "skipped": self.skipped,
+        }
+
+def _rank(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+def _safe_name(competition):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', competition)
+
+def _write_json(path, value):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
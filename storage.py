@@ -0,0 +1,491 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kaggle_ids (
+    user_id       INTEGER PRIMARY KEY,
+    name          TEXT,
+    kaggle_id     TEXT NOT NULL,
+    registered_at TEXT,
+    updated_at    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS competitions (
+    ref          TEXT PRIMARY KEY,
+    channel_id   INTEGER,
+    end_time     TEXT,
+    created_at   TEXT,
+    poll_message INTEGER,
+    live         TEXT
+);
+
+CREATE TABLE IF NOT EXISTS competition_participants (
+    competition   TEXT NOT NULL,
+    user_id       INTEGER NOT NULL,
+    name          TEXT,
+    kaggle_id     TEXT,
+    registered_at TEXT,
+    PRIMARY KEY (competition, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS polls (
+    message_id   INTEGER PRIMARY KEY,
+    channel_id   INTEGER,
+    guild_id     INTEGER,
+    question     TEXT,
+    expires_at   TEXT,
+    created_at   TEXT,
+    closed_at    TEXT,
+    pending      TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS poll_participants (
+    poll_id       INTEGER NOT NULL,
+    user_id       INTEGER NOT NULL,
+    name          TEXT,
+    kaggle_id     TEXT,
+    registered_at TEXT,
+    PRIMARY KEY (poll_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS dm_closed (
+    user_id   INTEGER PRIMARY KEY,
+    closed_at TEXT,
+    reason    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    key     TEXT PRIMARY KEY,
+    kind    TEXT NOT NULL,
+    run_at  REAL NOT NULL,
+    payload TEXT
+);
+"""
+
+UPSERT_KAGGLE_ID = """
+INSERT INTO kaggle_ids (user_id, name, kaggle_id, registered_at, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    name = excluded.name, kaggle_id = excluded.kaggle_id, updated_at = excluded.updated_at
+"""
+
+UPSERT_META = "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+
+UPSERT_COMPETITION = """
+INSERT INTO competitions (ref, channel_id, end_time, created_at, poll_message, live)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(ref) DO UPDATE SET
+    channel_id = excluded.channel_id, end_time = excluded.end_time, poll_message = excluded.poll_message,
+    live = excluded.live
+"""
+
+UPSERT_COMPETITION_PARTICIPANT = """
+INSERT INTO competition_participants (competition, user_id, name, kaggle_id, registered_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(competition, user_id) DO UPDATE SET
+    name = excluded.name, kaggle_id = excluded.kaggle_id, registered_at = excluded.registered_at
+"""
+
+UPSERT_POLL = """
+INSERT INTO polls (message_id, channel_id, guild_id, question, expires_at, created_at, closed_at, pending)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(message_id) DO UPDATE SET
+    expires_at = excluded.expires_at, closed_at = excluded.closed_at, pending = excluded.pending
+"""
+
+UPSERT_POLL_PARTICIPANT = """
+INSERT INTO poll_participants (poll_id, user_id, name, kaggle_id, registered_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(poll_id, user_id) DO UPDATE SET
+    name = excluded.name, kaggle_id = excluded.kaggle_id, registered_at = excluded.registered_at
+"""
+
+UPSERT_DM_CLOSED = """
+INSERT INTO dm_closed (user_id, closed_at, reason) VALUES (?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET closed_at = excluded.closed_at, reason = excluded.reason
+"""
+
+UPSERT_JOB = """
+INSERT INTO scheduled_jobs (key, kind, run_at, payload) VALUES (?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    kind = excluded.kind, run_at = excluded.run_at, payload = excluded.payload
+"""
+
+KAGGLE_IDS = 'kaggle_ids'
+META = 'meta'
+COMPETITIONS = 'competitions'
+COMPETITION_PARTICIPANTS = 'competition_participants'
+POLLS = 'polls'
+POLL_PARTICIPANTS = 'poll_participants'
+DM_CLOSED = 'dm_closed'
+JOBS = 'scheduled_jobs'
+
+KAGGLE_ID_CACHE_SIZE = 4096  # Recently used Kaggle ID records kept for peek_kaggle_id
+
+LEGACY_POLL_ID = 0  # Poll row holding registrations imported from contest_participants.json
+
+class Storage:
+    """Repository for persistent bot data, backed by SQLite in WAL mode
+
+    All database work runs on one dedicated thread, so handlers never block on disk.
+    Row mutations are write-behind: they only mark the row dirty, and a background
+    task folds everything dirty into one transaction at most every `flush_interval`
+    seconds (200 poll reactions in a minute become a few commits, not 200). Reads
+    check the dirty rows first, so callers always see their own writes.
+    """
+
+    def __init__(self, path, flush_interval=2.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='storage')
+        self._conn = None
+        self._pending = {}  # {(table, key): record, or None for a delete}
+        self._kaggle_ids = OrderedDict()  # {user_id: record}, recently read or written, least recent first
+        self._flush_task = None
+        self.mutations = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self._submit(self._connect).result()
+
+    # ----- plumbing -----
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # Durable across app crashes, fsync at checkpoints
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _submit(self, fn, *args):
+        return self._executor.submit(fn, *args)
+
+    def _run_query(self, sql, params):
+        return self._conn.execute(sql, params).fetchall()
+
+    async def _query(self, sql, params=()):
+        return await asyncio.wrap_future(self._submit(self._run_query, sql, params))
+
+    # ----- write-behind -----
+
+    def _mark(self, table, key, record):
+        self._pending[(table, key)] = record
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        self.mutations += 1
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No event loop (startup/shutdown): write through
+            self._submit(self._apply_batch, self._take_batch()).result()
+
+    async def _flush_later(self):
+        # Keep going while mutations arrive during a flush; exit once everything is written
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not self._pending:
+                return
+
+    def _take_batch(self):
+        items = list(self._pending.items())
+        self._pending = {}
+        return items
+
+    def _apply_batch(self, items):
+        """Write one batch of dirty rows in a single transaction (storage thread)"""
+        start = time.perf_counter()
+        with self._conn:
+            for (table, key), record in items:
+                key_columns, upsert, to_row = _TABLES[table]
+                if record is None:
+                    where = " AND ".join(f"{column} = ?" for column in key_columns)
+                    self._conn.execute(f"DELETE FROM {table} WHERE {where}", key if len(key_columns) > 1 else (key,))
+                else:
+                    self._conn.execute(upsert, to_row(key, record))
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.rows_written += len(items)
+        self.flush_seconds_total += elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    async def flush(self):
+        """Write every dirty row now"""
+        items = self._take_batch()
+        if not items:
+            return
+        try:
+            await asyncio.wrap_future(self._submit(self._apply_batch, items))
+        except Exception as e:
+            print(f"Error writing to database, will retry: {e}")
+            # Put the batch back unless something newer replaced it meanwhile
+            for item_key, record in items:
+                self._pending.setdefault(item_key, record)
+
+    def stats(self):
+        """Return write-behind metrics for admin display"""
+        return {
+            "pending": len(self._pending),
+            "mutations": self.mutations,
+            "rows_written": self.rows_written,
+            "writes_saved": max(0, self.mutations - len(self._pending) - self.rows_written),
+            "flushes": self.flushes,
+            "flush_avg_ms": self.flush_seconds_total / self.flushes * 1000 if self.flushes else 0.0,
+            "flush_max_ms": self.flush_seconds_max * 1000,
+        }
+
+    def close(self):
+        """Force a final flush of dirty rows and close the database"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        def _close():
+            items = self._take_batch()
+            if items:
+                self._apply_batch(items)
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        self._submit(_close).result()
+        self._executor.shutdown(wait=True)
+
+    # ----- Kaggle IDs -----
+
+    def upsert_kaggle_id(self, user_id, record):
+        self._remember_kaggle_id(user_id, record)
+        self._mark(KAGGLE_IDS, user_id, dict(record))
+
+    def _remember_kaggle_id(self, user_id, record):
+        self._kaggle_ids[user_id] = dict(record)
+        self._kaggle_ids.move_to_end(user_id)
+        if len(self._kaggle_ids) > KAGGLE_ID_CACHE_SIZE:
+            self._kaggle_ids.popitem(last=False)
+
+    def peek_kaggle_id(self, user_id):
+        """Return a user's Kaggle ID record if it is already in memory, else None (never touches the database)"""
+        record = self._kaggle_ids.get(user_id)
+        return dict(record) if record is not None else None
+
+    async def get_kaggle_id(self, user_id):
+        """Return {"name", "kaggle_id", "registered_at", "updated_at"} for a user, or None"""
+        key = (KAGGLE_IDS, user_id)
+        if key in self._pending:
+            record = self._pending[key]
+            return dict(record) if record is not None else None
+        rows = await self._query("SELECT * FROM kaggle_ids WHERE user_id = ?", (user_id,))
+        if key in self._pending:  # Written while we were reading
+            record = self._pending[key]
+            return dict(record) if record is not None else None
+        if not rows:
+            return None
+        record = _kaggle_record(rows[0])
+        if user_id not in self._kaggle_ids:  # A cached record came from a write, so it's never older
+            self._remember_kaggle_id(user_id, record)
+        return record
+
+    # ----- metadata -----
+
+    def set_meta(self, key, value):
+        self._mark(META, key, json.dumps(value))
+
+    def load_meta(self, key, default=None):
+        """Return a stored metadata value, or default (blocking; for startup)"""
+        rows = self._submit(self._run_query, "SELECT value FROM meta WHERE key = ?", (key,)).result()
+        return json.loads(rows[0]["value"]) if rows else default
+
+    # ----- competitions -----
+
+    def upsert_competition(self, ref, record):
+        self._mark(COMPETITIONS, ref, dict(record))
+
+    def delete_competition(self, ref):
+        self._mark(COMPETITIONS, ref, None)
+
+    def upsert_competition_participant(self, ref, user_id, record):
+        self._mark(COMPETITION_PARTICIPANTS, (ref, user_id), dict(record))
+
+    def delete_competition_participant(self, ref, user_id):
+        self._mark(COMPETITION_PARTICIPANTS, (ref, user_id), None)
+
+    def load_competitions(self):
+        """Return {ref: record} for every tracked competition, participants included (blocking; for startup)"""
+        rows = self._submit(self._run_query, "SELECT * FROM competitions", ()).result()
+        records = {row["ref"]: _competition_record(row) for row in rows}
+        for row in self._submit(self._run_query, "SELECT * FROM competition_participants", ()).result():
+            if row["competition"] in records:
+                records[row["competition"]]["participants"][row["user_id"]] = _participant_record(row)
+        return records
+
+    # ----- polls -----
+
+    def upsert_poll(self, message_id, record):
+        self._mark(POLLS, message_id, dict(record))
+
+    def delete_poll(self, message_id):
+        self._mark(POLLS, message_id, None)
+
+    def upsert_poll_participant(self, message_id, user_id, record):
+        self._mark(POLL_PARTICIPANTS, (message_id, user_id), dict(record))
+
+    def delete_poll_participant(self, message_id, user_id):
+        self._mark(POLL_PARTICIPANTS, (message_id, user_id), None)
+
+    def load_polls(self):
+        """Return {message_id: record} for every contest poll, participants included (blocking; for startup)"""
+        rows = self._submit(self._run_query, "SELECT * FROM polls", ()).result()
+        records = {row["message_id"]: _poll_record(row) for row in rows}
+        for row in self._submit(self._run_query, "SELECT * FROM poll_participants", ()).result():
+            if row["poll_id"] in records:
+                records[row["poll_id"]]["participants"][row["user_id"]] = _participant_record(row)
+        return records
+
+    # ----- closed DMs -----
+
+    def mark_dm_closed(self, user_id, record):
+        self._mark(DM_CLOSED, user_id, dict(record))
+
+    def clear_dm_closed(self, user_id):
+        self._mark(DM_CLOSED, user_id, None)
+
+    def load_dm_closed(self):
+        """Return {user_id: {"closed_at", "reason"}} for users whose DMs are closed (blocking; for startup)"""
+        rows = self._submit(self._run_query, "SELECT * FROM dm_closed", ()).result()
+        return {row["user_id"]: {"closed_at": row["closed_at"], "reason": row["reason"]} for row in rows}
+
+    # ----- scheduled jobs -----
+
+    def upsert_job(self, key, kind, run_at, payload):
+        self._mark(JOBS, key, {"kind": kind, "run_at": run_at, "payload": payload})
+
+    def delete_job(self, key):
+        self._mark(JOBS, key, None)
+
+    async def load_jobs(self):
+        """Return every scheduled job as [(key, kind, run_at, payload)]"""
+        await self.flush()
+        rows = await self._query("SELECT * FROM scheduled_jobs ORDER BY run_at")
+        return [(row["key"], row["kind"], row["run_at"], json.loads(row["payload"] or "null")) for row in rows]
+
+    # ----- migration -----
+
+    def migrate_json(self, kaggle_ids_path='kaggle_ids.json', participants_path='contest_participants.json'):
+        """One-time import of the old JSON files (blocking; call before the bot starts)"""
+        return self._submit(self._migrate_json, kaggle_ids_path, participants_path).result()
+
+    def _migrate_json(self, kaggle_ids_path, participants_path):
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return 0
+        migrated = 0
+        with self._conn:
+            for user_id, record in _read_json(kaggle_ids_path).items():
+                if not record.get("kaggle_id"):
+                    continue
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO kaggle_ids (user_id, name, kaggle_id, registered_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (int(user_id), record.get("name"), record["kaggle_id"],
+                     record.get("registered_at"), record.get("updated_at"))
+                )
+                migrated += 1
+            participants = _read_json(participants_path)
+            if participants:
+                # The JSON layout never stored the poll message, so the registrations become
+                # one closed poll under a placeholder id (it still counts as the latest poll)
+                now = datetime.now(timezone.utc).isoformat()
+                self._conn.execute(UPSERT_POLL, _poll_row(LEGACY_POLL_ID, {
+                    "question": "Imported registrations", "created_at": now, "closed_at": now,
+                }))
+                for user_id, record in participants.items():
+                    self._conn.execute(UPSERT_POLL_PARTICIPANT, _participant_row((LEGACY_POLL_ID, int(user_id)), record))
+                    migrated += 1
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', 'true')")
+        if migrated:
+            print(f"Migrated {migrated} records from JSON files into {self.path}")
+        return migrated
+
+def _read_json(path):
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                content = f.read().strip()
+                if content:
+                    return json.loads(content)
+    except Exception as e:
+        print(f"Error reading {path} for migration: {e}")
+    return {}
+
+def _kaggle_record(row):
+    record = {"name": row["name"], "kaggle_id": row["kaggle_id"], "registered_at": row["registered_at"]}
+    if row["updated_at"]:
+        record["updated_at"] = row["updated_at"]
+    return record
+
+def _competition_record(row):
+    return {
+        "channel_id": row["channel_id"],
+        "end_time": row["end_time"],
+        "created_at": row["created_at"],
+        "poll_message": row["poll_message"],
+        "participants": {},  # Filled from competition_participants
+        "live": json.loads(row["live"]) if row["live"] else None,
+    }
+
+def _competition_row(ref, record):
+    return (ref, record.get("channel_id"), record.get("end_time"), record.get("created_at"),
+            record.get("poll_message"), json.dumps(record["live"]) if record.get("live") else None)
+
+def _participant_record(row):
+    return {"name": row["name"], "kaggle_id": row["kaggle_id"], "registered_at": row["registered_at"]}
+
+def _participant_row(key, record):
+    # key is (poll message id or competition ref, user id)
+    return (*key, record.get("name"), record.get("kaggle_id"), record.get("registered_at"))
+
+def _poll_record(row):
+    return {
+        "channel_id": row["channel_id"],
+        "guild_id": row["guild_id"],
+        "question": row["question"],
+        "expires_at": row["expires_at"],
+        "created_at": row["created_at"],
+        "closed_at": row["closed_at"],
+        "participants": {},  # Filled from poll_participants
+        # JSON object keys are strings; sign-ups are keyed by Discord user id
+        "pending": {int(user_id): data for user_id, data in json.loads(row["pending"]).items()},
+    }
+
+def _poll_row(message_id, record):
+    return (message_id, record.get("channel_id"), record.get("guild_id"), record.get("question"),
+            record.get("expires_at"), record.get("created_at"), record.get("closed_at"),
+            json.dumps(record.get("pending") or {}))
+
+def _kaggle_row(user_id, record):
+    return (user_id, record.get("name"), record["kaggle_id"], record.get("registered_at"), record.get("updated_at"))
+
+def _job_row(key, record):
+    return (key, record["kind"], record["run_at"], json.dumps(record["payload"]))
+
+# table -> (key columns, upsert statement, record -> row parameters); a multi-column key is a tuple
+_TABLES = {
+    KAGGLE_IDS: (("user_id",), UPSERT_KAGGLE_ID, _kaggle_row),
+    META: (("key",), UPSERT_META, lambda key, value: (key, value)),
+    COMPETITIONS: (("ref",), UPSERT_COMPETITION, _competition_row),
+    COMPETITION_PARTICIPANTS: (("competition", "user_id"), UPSERT_COMPETITION_PARTICIPANT, _participant_row),
+    POLLS: (("message_id",), UPSERT_POLL, _poll_row),
+    POLL_PARTICIPANTS: (("poll_id", "user_id"), UPSERT_POLL_PARTICIPANT, _participant_row),
+    DM_CLOSED: (("user_id",), UPSERT_DM_CLOSED, lambda user_id, record: (user_id, record.get("closed_at"), record.get("reason"))),
+    JOBS: (("key",), UPSERT_JOB, _job_row),
+}